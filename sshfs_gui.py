@@ -1,24 +1,4068 @@
 """
 SSHFS GUI - A complete graphical interface for SSHFS with public key authentication support
+
+Run without arguments for the GUI, or with a command (mount, unmount, status,
+list, ...) for a fast scripted interface that never loads tkinter.
 """
 
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-import subprocess
-import os
-import json
-import threading
-from pathlib import Path
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import subprocess
+import os
+import sys
+import json
+import queue
+import signal
+import re
+import shutil
+import glob
+import shlex
+import stat
+import bisect
+import functools
+import getpass
+import select
+import tempfile
+from datetime import datetime
+import argparse
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Tk (and the slower modules below) are imported on first use, so the
+# command line interface starts without paying for them
+tk = ttk = filedialog = messagebox = scrolledtext = None
+
+
+def load_tkinter():
+    """Import tkinter for the GUI"""
+    global tk, ttk, filedialog, messagebox, scrolledtext
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+
+# Configuration file for saving server profiles
+CONFIG_FILE = Path.home() / ".sshfs_gui_config.json"
+CONFIG_VERSION = 2
+SSH_CONFIG_FILE = Path.home() / ".ssh" / "config"
+BENCHMARK_FILE = Path.home() / ".sshfs_gui_benchmarks.json"
+
+# Runtime state (sockets, logs, timings)
+STATE_DIR = Path.home() / ".cache" / "sshfs_gui"
+STARTUP_LOG = STATE_DIR / "startup.jsonl"
+STARTUP_LOG_LINES = 1000
+
+# Timing spans of every operation, one JSON object per line
+TRACE_FILE = STATE_DIR / "trace.jsonl"
+TRACE_FILE_BYTES = 10 * 1024 * 1024
+TRACE_VIEW_SPANS = 5000
+TRACE_VIEW_ROOTS = 300
+TRACE_FIELDS = ("trace", "span", "parent", "name", "start", "ms", "status")
+
+# ssh -v lines that end each phase of a connection, in order
+SSH_PHASES = [
+    ("dns", ("Connecting to ",)),
+    ("connect", ("Connection established",)),
+    ("banner", ("Remote protocol version",)),
+    ("kex", ("SSH2_MSG_NEWKEYS received",)),
+    ("auth", ("Authenticated to ", "Authentication succeeded")),
+]
+
+# Background operation settings
+MAX_WORKERS = 4
+EVENT_POLL_MS = 50
+MOUNT_TIMEOUT = 10
+TEST_TIMEOUT = 15
+BATCH_CONCURRENCY = 8
+
+# Multi-connection striping
+MAX_CONNECTIONS = 16
+MAX_CONNS_VERSION = (3, 7, 0)
+STRIPE_SUFFIX = ".stripe"
+STRIPE_CHUNK = 8 * 1024 * 1024
+
+# Kernel mount table
+MOUNTINFO = "/proc/self/mountinfo"
+SSHFS_FSTYPE = "fuse.sshfs"
+MOUNT_TABLE_INTERVAL = 2
+
+# Mount health monitoring
+HEALTH_INTERVAL = 3
+HEALTH_TIMEOUT = 2
+REMOUNT_BACKOFF = 2
+REMOUNT_BACKOFF_MAX = 120
+
+# Log pipeline
+LOG_DIR = STATE_DIR / "logs"
+LOG_FILE = LOG_DIR / "sshfs_gui.log"
+LOG_FILE_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+LOG_FILE_BATCH = 500
+LOG_BUFFER_LINES = 20000
+LOG_VIEW_LINES = 2000
+LOG_FLUSH_MS = 100
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+APP_SOURCE = "app"
+ALL_SOURCES = "All"
+SSHFS_DEBUG_OPTIONS = ("debug", "sshfs_debug")
+
+# Per-mount I/O metrics
+METRICS_INTERVAL = 2
+METRICS_HISTORY = 300
+METRICS_RTT_INTERVAL = 10
+METRICS_FILE = STATE_DIR / "metrics.prom"
+FUSE_CONNECTIONS = "/sys/fs/fuse/connections"
+
+# On-disk read cache
+READ_CACHE_DIR = STATE_DIR / "readcache"
+READ_CACHE_MB = 1024
+READ_CACHE_WORKERS = 8
+READ_CACHE_SAVE_INTERVAL = 5
+
+# Bulk transfers
+TRANSFER_DIR = STATE_DIR / "transfers"
+TRANSFER_WORKERS = 4
+TRANSFER_BATCH_FILES = 200
+TRANSFER_BATCH_MB = 64
+TRANSFER_LARGE_MB = 16
+TRANSFER_RATE_WINDOW = 5
+
+# Fleet reachability probe
+PROBE_CONCURRENCY = 64
+PROBE_TIMEOUT = 5
+PROBE_AUTH_TIMEOUT = 10
+
+# Profile list
+PROFILE_LIST_CHUNK = 200
+PROFILE_FILTER_DELAY_MS = 150
+
+# Remote directory browser
+LISTING_TTL = 60
+LISTING_CACHE_SIZE = 200
+LISTING_PAGE = 500
+
+# Benchmark workload
+BENCH_FILE_MB = 64
+BENCH_SMALL_FILES = 200
+BENCH_HISTORY = 50
+BENCH_METRICS = [
+    ("seq_write_mbps", "Sequential write (MB/s)"),
+    ("seq_read_mbps", "Sequential read (MB/s)"),
+    ("create_ops", "Small file create (ops/s)"),
+    ("stat_ops", "Small file stat (ops/s)"),
+    ("delete_ops", "Small file delete (ops/s)"),
+    ("listdir_ms", "Directory listing (ms)"),
+    ("metadata_rtt_ms", "Metadata round trip (ms)"),
+]
+
+# Idle auto-unmount; a health probe (one statvfs) costs sshfs a few syscalls
+IDLE_CHECK_INTERVAL = 30
+IDLE_PROBE_SYSCALLS = 8
+
+# Shared ssh connections; masters exit after this many idle seconds. The
+# directory also holds the askpass helper and the supervisor socket, so it
+# must be private: $XDG_RUNTIME_DIR already is, a /tmp one is checked on use
+_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", "")
+if _RUNTIME_DIR and os.path.isdir(_RUNTIME_DIR):
+    CONTROL_DIR = Path(_RUNTIME_DIR) / "sshfs-gui"
+else:
+    CONTROL_DIR = Path("/tmp" if os.path.isdir("/tmp") else tempfile.gettempdir()) / f"sshfs-gui-{os.getuid()}"
+CONTROL_PERSIST = 300
+
+# Password profiles authenticate through this SSH_ASKPASS helper
+ASKPASS_SCRIPT = CONTROL_DIR / "askpass"
+ASKPASS_VARIABLE = "SSHFS_GUI_PASSWORD"
+
+# Supervisor daemon; a mount that stays up this long restarts its backoff
+SUPERVISOR_SOCKET = CONTROL_DIR / "supervisor.sock"
+SUPERVISOR_STABLE = 60
+SUPERVISOR_POLL = 5
+# Stopping a mount can take two unmount attempts and a wait for sshfs to exit
+SUPERVISOR_STOP_TIMEOUT = 2 * MOUNT_TIMEOUT + 5
+SYSTEMD_USER_DIR = Path.home() / ".config" / "systemd" / "user"
+SYSTEMD_PREFIX = "sshfs-gui-"
+
+# Named sshfs option sets; True means a bare flag such as "-o kernel_cache"
+DEFAULT_TUNING = "Default"
+TUNING_PROFILES = {
+    DEFAULT_TUNING: {},
+    "LAN bulk throughput": {
+        "cache": "yes",
+        "kernel_cache": True,
+        "cache_timeout": 60,
+        "attr_timeout": 60,
+        "entry_timeout": 60,
+        "max_read": 1048576,
+        "Ciphers": "aes128-gcm@openssh.com",
+        "Compression": "no",
+        "max_conns": 4,
+    },
+    "WAN high latency": {
+        "cache": "yes",
+        "kernel_cache": True,
+        "cache_timeout": 300,
+        "attr_timeout": 300,
+        "entry_timeout": 300,
+        "max_read": 65536,
+        "Ciphers": "chacha20-poly1305@openssh.com",
+        "Compression": "yes",
+        "max_conns": 2,
+    },
+    "Many small files": {
+        "cache": "yes",
+        "kernel_cache": True,
+        "cache_timeout": 600,
+        "attr_timeout": 600,
+        "entry_timeout": 600,
+        "max_read": 65536,
+        "Ciphers": "aes128-gcm@openssh.com",
+        "Compression": "no",
+        "max_conns": 8,
+    },
+}
+
+
+class SSHFSError(Exception):
+    """Raised when an sshfs, ssh or unmount command fails"""
+
+
+class OperationCancelled(Exception):
+    """Raised inside a worker when its operation has been cancelled"""
+
+
+class Tracer:
+    """Timing spans written to a JSON-lines trace file
+
+    span() times a block. Spans opened inside another one on the same thread
+    become its children and share its trace id; work handed to another
+    thread passes parent= explicitly. Each finished span is one line:
+    {"trace", "span", "parent", "name", "start", "ms", "status", ...}, plus
+    any attributes given. The file is rotated to <name>.1 past max_bytes.
+    Tracing never fails an operation: write errors are ignored.
+    """
+
+    def __init__(self, path=TRACE_FILE, max_bytes=TRACE_FILE_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def current(self):
+        """The innermost open span on this thread, or None"""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def _new(self, name, parent, start, attributes):
+        parent = parent or self.current()
+        record = {"trace": parent["trace"] if parent else os.urandom(8).hex(),
+                  "span": os.urandom(8).hex(), "parent": parent["span"] if parent else None,
+                  "name": name, "start": start, "status": "ok"}
+        record.update(attributes)
+        return record
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """Time the enclosed block; yields the record so callers can add attributes"""
+        record = self._new(name, parent, time.time(), attributes)
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except OperationCancelled:
+            record["status"] = "cancelled"
+            raise
+        except BaseException as e:
+            record["status"] = "error"
+            record["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            record["ms"] = round((time.perf_counter() - started) * 1000, 3)
+            stack.pop()
+            self.write(record)
+
+    def record(self, name, ms, start, parent=None, **attributes):
+        """Write a span measured some other way, e.g. a phase read from ssh -v output"""
+        record = self._new(name, parent, start, attributes)
+        record["ms"] = round(ms, 3)
+        self.write(record)
+
+    def write(self, record):
+        if not self.enabled:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a")
+                self._file.write(line)
+                self._file.flush()
+                if self._file.tell() > self.max_bytes:
+                    self._file.close()
+                    self._file = None
+                    os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            except OSError:
+                self._file = None
+
+
+tracer = Tracer()
+
+
+def traced(name):
+    """Decorator that records every call of a function as a span"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def read_trace(path=TRACE_FILE, limit=TRACE_VIEW_SPANS):
+    """The last `limit` spans of a trace file, oldest first"""
+    try:
+        with open(path, "r") as f:
+            lines = deque(f, maxlen=limit)
+    except OSError:
+        return []
+    spans = []
+    for line in lines:
+        try:
+            spans.append(json.loads(line))
+        except ValueError:
+            continue
+    return spans
+
+
+def split_phases(stamped_lines, phases, end, rest="session"):
+    """Turn timestamped output lines into (phase, offset, ms) tuples
+
+    stamped_lines are (seconds since start, line) pairs. Each phase runs
+    from the end of the one before it to the first line containing one of
+    its markers; phases whose markers never appear are left out, and
+    whatever follows the last one found, up to `end`, is `rest`.
+    """
+    result = []
+    previous = 0.0
+    index = 0
+    for seconds, line in stamped_lines:
+        for i in range(index, len(phases)):
+            name, markers = phases[i]
+            if any(marker in line for marker in markers):
+                result.append((name, previous, (seconds - previous) * 1000))
+                previous = seconds
+                index = i + 1
+                break
+    if end is not None and end > previous:
+        result.append((rest, previous, (end - previous) * 1000))
+    return result
+
+
+def tuning_options(name):
+    """Return the sshfs -o values for a tuning profile name"""
+    options = []
+    for option, value in TUNING_PROFILES.get(name, {}).items():
+        options.append(option if value is True else f"{option}={value}")
+    return options
+
+
+_sshfs_version = None
+
+
+def sshfs_version():
+    """Installed sshfs version as a tuple, () if unknown; cached per process"""
+    global _sshfs_version
+    if _sshfs_version is None:
+        try:
+            process = subprocess.run(["sshfs", "--version"], stdin=subprocess.DEVNULL,
+                                     capture_output=True, text=True, timeout=5)
+            output = process.stdout + process.stderr
+        except (OSError, subprocess.TimeoutExpired):
+            output = ""
+        match = re.search(r"SSHFS version (\d+)\.(\d+)(?:\.(\d+))?", output)
+        _sshfs_version = tuple(int(part or 0) for part in match.groups()) if match else ()
+    return _sshfs_version
+
+
+def supports_max_conns():
+    """Whether sshfs can spread one mount over several connections itself"""
+    return sshfs_version() >= MAX_CONNS_VERSION
+
+
+def profile_connections(config):
+    """Number of SSH connections a profile asks for, 1 to MAX_CONNECTIONS"""
+    try:
+        return min(max(int(config.get("connections") or 1), 1), MAX_CONNECTIONS)
+    except (TypeError, ValueError):
+        return 1
+
+
+def profile_idle_minutes(config):
+    """Minutes without I/O after which a profile is unmounted, 0 for never"""
+    try:
+        return max(int(config.get("idle_minutes") or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def stripe_dirs(config):
+    """Mount points of the extra sshfs instances a striped profile needs
+
+    Empty when the profile uses one connection or sshfs supports max_conns.
+    """
+    connections = profile_connections(config)
+    if connections == 1 or supports_max_conns():
+        return []
+    local_dir = mount_key(config.get("local_dir", ""))
+    return [f"{local_dir}{STRIPE_SUFFIX}{k}" for k in range(1, connections)]
+
+
+@traced("build_sshfs_command")
+def build_sshfs_command(config, ssh_options=(), local_dir=None):
+    """Build the SSHFS command for a configuration dict"""
+    server = config.get("server", "").strip()
+    port = config.get("port", "").strip() or "22"
+    username = config.get("username", "").strip()
+    remote_dir = config.get("remote_dir", "").strip() or "/"
+    local_dir = local_dir or config.get("local_dir", "").strip()
+
+    # Base command
+    remote_path = f"{username}@{server}:{remote_dir}"
+    cmd = ["sshfs", remote_path, local_dir]
+
+    # Add port
+    cmd.extend(["-p", port])
+
+    # Add authentication options
+    if config.get("auth_method") == "key":
+        key_file = config.get("key_file", "").strip()
+        cmd.extend(["-o", f"IdentityFile={key_file}"])
+        cmd.extend(["-o", "PasswordAuthentication=no"])
+    elif config.get("auth_method") == "password":
+        # sshfs reads the password from stdin and answers ssh's prompt itself,
+        # including when it reconnects
+        cmd.extend(["-o", "password_stdin"])
+
+    # Add common options
+    cmd.extend(["-o", "reconnect"])
+    cmd.extend(["-o", "ServerAliveInterval=15"])
+    cmd.extend(["-o", "ServerAliveCountMax=3"])
+
+    # Reuse a pooled ssh connection
+    cmd.extend(ssh_options)
+
+    # Add performance tuning profile. Older sshfs refuses to mount with
+    # max_conns, and a profile's own connection count takes precedence
+    connections = profile_connections(config)
+    max_conns = supports_max_conns()
+    for opt in tuning_options(config.get("tuning_profile", DEFAULT_TUNING)):
+        if not opt.startswith("max_conns=") or (max_conns and connections == 1):
+            cmd.extend(["-o", opt])
+    if connections > 1 and max_conns:
+        cmd.extend(["-o", f"max_conns={connections}"])
+
+    # Add allow_other option if selected
+    if config.get("allow_other"):
+        cmd.extend(["-o", "allow_other"])
+
+    # Add additional options
+    additional_opts = config.get("additional_options", "").strip()
+    if additional_opts:
+        for opt in additional_opts.split():
+            cmd.extend(["-o", opt])
+
+    return cmd
+
+
+def build_ssh_command(config, ssh_options=(), remote_command=None):
+    """Build a non-interactive ssh command for a configuration dict"""
+    server = config.get("server", "").strip()
+    port = config.get("port", "").strip() or "22"
+    username = config.get("username", "").strip()
+
+    cmd = ["ssh", "-p", port, "-o", "ConnectTimeout=10"]
+
+    # Never prompt on a terminal; a known password is answered by SSH_ASKPASS
+    if config.get("auth_method") == "password" and session_credentials.password(config):
+        cmd.extend(["-o", "BatchMode=no", "-o", "NumberOfPasswordPrompts=1",
+                    "-o", "PreferredAuthentications=keyboard-interactive,password"])
+    else:
+        cmd.extend(["-o", "BatchMode=yes"])
+
+    if config.get("auth_method") == "key":
+        key_file = config.get("key_file", "").strip()
+        if key_file and os.path.exists(key_file):
+            cmd.extend(["-i", key_file])
+
+    cmd.extend(ssh_options)
+    cmd.append(f"{username}@{server}")
+    if remote_command:
+        cmd.append(remote_command)
+    return cmd
+
+
+def build_sftp_command(config, ssh_options=()):
+    """Build an sftp command that reads batch commands from stdin"""
+    ssh = build_ssh_command(config, ssh_options)
+    # Same options as ssh, but sftp spells the port flag -P. They go before
+    # -b, which adds its own BatchMode=yes that would otherwise win
+    return ["sftp", "-P", ssh[2]] + ssh[3:-1] + ["-b", "-", ssh[-1]]
+
+
+def build_test_command(config, ssh_options=()):
+    """Build the ssh command used to test a connection"""
+    return build_ssh_command(config, ssh_options, "echo 'Connection successful'")
+
+
+class CredentialCache:
+    """Passwords entered this session, keyed by user@host:port
+
+    They are kept in memory only and never written to the profile store, so
+    a password typed once serves every later mount, test or transfer
+    against the same host until the program exits.
+    """
+
+    def __init__(self):
+        self._passwords = {}
+        self._lock = threading.Lock()
+
+    def remember(self, config):
+        """Keep the password carried by config, if any"""
+        password = config.get("password")
+        if password and config.get("auth_method") == "password":
+            with self._lock:
+                self._passwords[ControlMasterPool.key(config)] = password
+
+    def password(self, config):
+        """The password to use for config: its own, else one cached this session"""
+        if config.get("password"):
+            return config["password"]
+        with self._lock:
+            return self._passwords.get(ControlMasterPool.key(config), "")
+
+
+session_credentials = CredentialCache()
+
+
+def is_private_dir(path):
+    """Whether path is a real directory (not a symlink) owned by us with mode 0700"""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def ensure_private_dir(path):
+    """Create path if needed and make sure nobody else can have planted it
+
+    A directory under a shared /tmp can be created by another user before
+    we get there, so an existing one must be a real directory (not a
+    symlink) owned by us with no group or other permissions.
+    """
+    path = Path(path)
+    try:
+        path.mkdir(mode=0o700, parents=True)
+    except FileExistsError:
+        pass
+    if not is_private_dir(path):
+        raise SSHFSError(f"{path} is not a private directory owned by you (mode 0700); "
+                         "remove it and try again")
+    return path
+
+
+def ensure_askpass():
+    """Write the SSH_ASKPASS helper into the private control directory and return its path
+
+    The helper answers ssh's password prompt from the environment of the ssh
+    process that runs it and refuses any other question (host keys and the
+    like), so nothing is ever piped into a terminal prompt.
+    """
+    script = (
+        "#!/bin/sh\n"
+        "# Written by sshfs-gui: answers ssh password prompts only\n"
+        "case \"$1\" in\n"
+        f"    *assword*) printf '%s\\n' \"${ASKPASS_VARIABLE}\" ;;\n"
+        "    *) exit 1 ;;\n"
+        "esac\n"
+    )
+    ensure_private_dir(ASKPASS_SCRIPT.parent)
+    try:
+        if ASKPASS_SCRIPT.read_text() == script:
+            return str(ASKPASS_SCRIPT)
+    except OSError:
+        pass
+    tmp = ASKPASS_SCRIPT.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o700)
+    with os.fdopen(fd, "w") as f:
+        f.write(script)
+    os.replace(tmp, ASKPASS_SCRIPT)
+    return str(ASKPASS_SCRIPT)
+
+
+def ssh_environment(config):
+    """Environment for ssh and sftp commands run for config
+
+    Password profiles get the SSH_ASKPASS helper and the password, so ssh
+    authenticates in one handshake without a terminal. Returns None (inherit
+    our own environment) for key profiles or when no password is known.
+    """
+    if config.get("auth_method") != "password":
+        return None
+    password = session_credentials.password(config)
+    if not password:
+        return None
+    env = dict(os.environ)
+    env.update({"SSH_ASKPASS": ensure_askpass(), "SSH_ASKPASS_REQUIRE": "force",
+                ASKPASS_VARIABLE: password})
+    return env
+
+
+class ControlMasterPool:
+    """Persistent ssh ControlMaster connections keyed by user@host:port
+
+    The first operation against a host starts a master in the background;
+    tests, mounts, listings and health checks then multiplex over it instead
+    of doing their own TCP connect, key exchange and authentication. Masters
+    are started with ControlPersist, so ssh closes them itself once they
+    have had no sessions for ``idle_timeout`` seconds.
+    """
+
+    def __init__(self, control_dir=CONTROL_DIR, idle_timeout=CONTROL_PERSIST):
+        self.control_dir = Path(control_dir)
+        self.idle_timeout = idle_timeout
+        self.masters = {}
+        self.handshakes = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @staticmethod
+    def key(config):
+        username = config.get("username", "").strip()
+        server = config.get("server", "").strip()
+        port = config.get("port", "").strip() or "22"
+        return f"{username}@{server}:{port}"
+
+    def socket_path(self, key):
+        # Hashed to stay well inside the unix socket path limit
+        import hashlib
+        return self.control_dir / hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def client_options(self, key):
+        """ssh -o options that multiplex over the master for key"""
+        return ["-o", f"ControlPath={self.socket_path(key)}", "-o", "ControlMaster=no"]
+
+    def is_alive(self, config):
+        """Check whether a usable master is running for config"""
+        path = self.socket_path(self.key(config))
+        if not path.exists():
+            return False
+        cmd = build_ssh_command(config, ["-o", f"ControlPath={path}", "-O", "check"])
+        try:
+            return subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL, timeout=5).returncode == 0
+        except subprocess.TimeoutExpired:
+            return False
+
+    @traced("ssh.master")
+    def acquire(self, op, config, timeout=TEST_TIMEOUT):
+        """Return ssh options that reuse a master, starting one if needed
+
+        Password profiles authenticate the master through SSH_ASKPASS; when
+        no password is known yet an empty list is returned, so callers
+        connect directly.
+        """
+        key = self.key(config)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One master per host, even when several workers ask at once
+        with key_lock:
+            if self.is_alive(config):
+                with self._lock:
+                    self.reused += 1
+                    self.masters[key] = time.monotonic()
+                op.report(f"Reusing shared connection to {key}")
+                return self.client_options(key)
+
+            env = ssh_environment(config)
+            if config.get("auth_method") == "password" and env is None:
+                return []
+
+            ensure_private_dir(self.control_dir)
+            path = self.socket_path(key)
+            cmd = build_ssh_command(config, [
+                "-o", "ControlMaster=yes",
+                "-o", f"ControlPath={path}",
+                "-o", f"ControlPersist={self.idle_timeout}",
+            ], "true")
+            op.report(f"Opening shared connection to {key}")
+            try:
+                process = op.run(cmd, timeout, env=env)
+            except subprocess.TimeoutExpired:
+                raise SSHFSError(f"Timed out connecting to {key}")
+            if process.returncode != 0:
+                raise SSHFSError(process.stderr or f"Failed to connect to {key}")
+
+            with self._lock:
+                self.handshakes += 1
+                self.masters[key] = time.monotonic()
+            return self.client_options(key)
+
+    def prune(self):
+        """Forget masters whose socket has gone away (closed by ControlPersist)"""
+        with self._lock:
+            for key in list(self.masters):
+                if not self.socket_path(key).exists():
+                    del self.masters[key]
+
+    def stats(self):
+        with self._lock:
+            return {"connections": len(self.masters), "handshakes": self.handshakes,
+                    "saved": self.reused}
+
+
+def kill_process_group(process):
+    """Kill a process started with start_new_session=True and its children"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    except AttributeError:
+        # No process groups on this platform
+        process.kill()
+
+
+class Operation:
+    """A single background job (mount, unmount, test) owned by an OperationEngine
+
+    With engine=None it can also be used directly on the calling thread, as
+    the command line interface does.
+    """
+
+    def __init__(self, engine, name, on_done=None, on_error=None, source=None):
+        self.engine = engine
+        self.name = name
+        self.source = source or APP_SOURCE
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        # Spans of the worker hang off whatever was being timed when it was queued
+        self.trace_parent = tracer.current()
+        self.submitted = time.perf_counter()
+        self._process = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the operation, killing any command it is running"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+        with self._lock:
+            process = self._process
+        if process is not None and process.poll() is None:
+            kill_process_group(process)
+
+    def check_cancelled(self):
+        """Raise OperationCancelled if cancel() has been called"""
+        if self.cancelled:
+            raise OperationCancelled(self.name)
+
+    def report(self, message):
+        """Send a progress message to the UI thread, or print it without an engine"""
+        if self.engine is None:
+            print(message)
+        else:
+            self.engine.post(self.engine.on_progress, self, message)
+
+    def log(self, message, level="DEBUG"):
+        """Write straight to the engine's log pipeline, bypassing the event queue"""
+        logs = self.engine.logs if self.engine is not None else None
+        if logs is None:
+            if level != "DEBUG":
+                print(message)
+        else:
+            logs.emit(message, level, self.source)
+
+    def run(self, cmd, timeout, input_text=None, env=None):
+        """Run a command, killing it on timeout or cancellation"""
+        self.check_cancelled()
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=env,
+            # Own process group, so ssh children die with the command
+            start_new_session=True
+        )
+        with self._lock:
+            self._process = process
+        try:
+            if self.cancelled:
+                kill_process_group(process)
+            stdout, stderr = process.communicate(input=input_text, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_group(process)
+            process.communicate()
+            raise
+        except BaseException:
+            # e.g. Ctrl-C on the command line; the child is in its own session
+            kill_process_group(process)
+            raise
+        finally:
+            with self._lock:
+                self._process = None
+        self.check_cancelled()
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def run_timed(self, cmd, timeout, env=None):
+        """Like run(), also noting when each line of stderr arrived
+
+        The result's stderr_times holds (seconds since start, line) pairs and
+        its elapsed the total run time, which is how the phases of an ssh -v
+        handshake are timed.
+        """
+        self.check_cancelled()
+        started = time.perf_counter()
+        process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True, env=env, start_new_session=True)
+        with self._lock:
+            self._process = process
+        stamped, output = [], []
+
+        def read_stderr():
+            for line in process.stderr:
+                stamped.append((time.perf_counter() - started, line.rstrip("\n")))
+
+        readers = [threading.Thread(target=read_stderr, daemon=True),
+                   threading.Thread(target=lambda: output.append(process.stdout.read()), daemon=True)]
+        for reader in readers:
+            reader.start()
+        try:
+            if self.cancelled:
+                kill_process_group(process)
+            process.wait(timeout)
+        except BaseException:
+            kill_process_group(process)
+            process.wait()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            # A grandchild may hold the pipes open; don't wait on it for long
+            for reader in readers:
+                reader.join(1)
+            with self._lock:
+                self._process = None
+        self.check_cancelled()
+        result = subprocess.CompletedProcess(cmd, process.returncode, "".join(output),
+                                             "\n".join(line for _, line in stamped))
+        result.stderr_times = list(stamped)
+        result.elapsed = elapsed
+        return result
+
+    def run_until(self, cmd, timeout, ready, output, input_text=None, env=None):
+        """Start a long-lived command and return once ready() is true
+
+        Its output goes to the file ``output``, which is followed into the
+        engine's log pipeline for as long as we run. Nothing ties the command
+        to us, so it keeps running after we exit. It is killed if it exits
+        early, times out or is cancelled before becoming ready.
+        """
+        self.check_cancelled()
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as log:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                text=True,
+                env=env,
+                start_new_session=True
+            )
+        with self._lock:
+            self._process = process
+        try:
+            if input_text is not None:
+                try:
+                    process.stdin.write(input_text)
+                    process.stdin.close()
+                except OSError:
+                    pass
+            self.engine.logs.follow(output, process, self.source)
+            deadline = time.monotonic() + timeout
+            while not ready():
+                if process.poll() is not None:
+                    raise SSHFSError(f"{cmd[0]} exited with status {process.returncode}; see the log for its output")
+                self.check_cancelled()
+                if time.monotonic() > deadline:
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+                time.sleep(0.1)
+        except BaseException:
+            kill_process_group(process)
+            raise
+        finally:
+            with self._lock:
+                self._process = None
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+class OperationEngine:
+    """Bounded worker pool for mount, unmount and test jobs
+
+    Workers never touch Tk. Results, errors and progress messages are posted
+    as callbacks onto ``events``, which the UI thread drains with dispatch().
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, events=None):
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sshfs-worker")
+        self.events = events if events is not None else queue.Queue()
+        self.operations = set()
+        self.on_progress = lambda op, message: None
+        self.logs = None
+        self._lock = threading.Lock()
+
+    def post(self, callback, *args):
+        """Queue a callback to run on the UI thread"""
+        self.events.put((callback, args))
+
+    def submit(self, name, func, *args, on_done=None, on_error=None, source=None):
+        """Run func(operation, *args) on a worker and return the Operation"""
+        op = Operation(self, name, on_done=on_done, on_error=on_error, source=source)
+        with self._lock:
+            self.operations.add(op)
+        op.future = self.executor.submit(self._run, op, func, args)
+        return op
+
+    def _run(self, op, func, args):
+        try:
+            op.check_cancelled()
+            with tracer.span("operation", parent=op.trace_parent, operation=op.name, source=op.source,
+                             queued_ms=round((time.perf_counter() - op.submitted) * 1000, 3)):
+                result = func(op, *args)
+        except OperationCancelled:
+            self.post(self._finish, op, None, None)
+        except Exception as e:
+            self.post(self._finish, op, None, None if op.cancelled else e)
+        else:
+            self.post(self._finish, op, result, None)
+
+    def _finish(self, op, result, error):
+        with self._lock:
+            self.operations.discard(op)
+        if op.cancelled:
+            self.on_progress(op, f"{op.name} cancelled")
+        elif error is not None:
+            if op.on_error:
+                op.on_error(error)
+        elif op.on_done:
+            op.on_done(result)
+
+    def active_count(self):
+        with self._lock:
+            return len(self.operations)
+
+    def cancel_all(self):
+        """Cancel every pending or running operation"""
+        with self._lock:
+            operations = list(self.operations)
+        for op in operations:
+            op.cancel()
+            if op.future is not None and op.future.cancelled():
+                # Never started, so no worker will report back for it
+                self.post(self._finish, op, None, None)
+        return len(operations)
+
+    def dispatch(self, block=False, timeout=None, limit=200):
+        """Run queued callbacks on the calling (UI) thread"""
+        handled = 0
+        while handled < limit:
+            try:
+                callback, args = self.events.get(block=block and handled == 0, timeout=timeout)
+            except queue.Empty:
+                break
+            # One broken callback must not stop the UI thread from draining the rest
+            try:
+                callback(*args)
+            except Exception as e:
+                self.report_error(callback, e)
+            handled += 1
+        return handled
+
+    def report_error(self, callback, error):
+        """Log an exception raised by a queued callback"""
+        import traceback
+        name = getattr(callback, "__qualname__", repr(callback))
+        message = f"Error in {name}: {error}"
+        if self.logs is not None:
+            self.logs.emit(message, level="ERROR")
+            for line in traceback.format_exception(error)[:-1]:
+                self.logs.emit(line.rstrip(), level="DEBUG")
+        else:
+            traceback.print_exception(error, file=sys.stderr)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False)
+
+
+class LogPipeline:
+    """Bounded, thread-safe log buffer backed by rotating files on disk
+
+    Any thread may emit() records. The UI thread picks up new records with
+    drain() at a fixed frame rate, so a flood of sshfs debug output costs one
+    widget update per frame rather than one per line. Only the newest
+    ``capacity`` lines are kept in memory; the full log goes to ``log_file``.
+    """
+
+    def __init__(self, capacity=LOG_BUFFER_LINES, log_file=LOG_FILE):
+        self.records = deque(maxlen=capacity)
+        self._sources = {APP_SOURCE}
+        self._pending = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.logger = None
+        if log_file is not None:
+            try:
+                self.logger = self._open_log_file(Path(log_file))
+            except OSError as e:
+                print(f"Cannot open log file {log_file}: {e}")
+
+    @staticmethod
+    def _open_log_file(path):
+        import logging
+        import logging.handlers
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_FILE_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(source)s] %(message)s"))
+        # Write debug floods in blocks; warnings and errors reach the disk at once
+        buffered = logging.handlers.MemoryHandler(LOG_FILE_BATCH, flushLevel=logging.WARNING, target=handler)
+        logger = logging.getLogger(f"sshfs_gui.{path}")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.handlers = [buffered]
+        return logger
+
+    def emit(self, message, level="INFO", source=APP_SOURCE):
+        """Record a message; multi-line messages become one record per line"""
+        now = time.time()
+        records = [(now, level, source, line) for line in str(message).splitlines() or [""]]
+        with self._lock:
+            self.records.extend(records)
+            self._pending.extend(records)
+            self._sources.add(source)
+        if self.logger is not None:
+            number = 10 * (LOG_LEVELS.index(level) + 1)
+            for record in records:
+                self.logger.log(number, "%s", record[3], extra={"source": source})
+
+    def drain(self):
+        """Return and forget records emitted since the last drain"""
+        with self._lock:
+            records = list(self._pending)
+            self._pending.clear()
+        return records
+
+    def snapshot(self):
+        """Every record still in the ring buffer"""
+        with self._lock:
+            return list(self.records)
+
+    def follow(self, path, process, source, level="DEBUG"):
+        """Emit each line written to a file by process from a reader thread until it exits"""
+        def reader():
+            try:
+                with open(path, "rb") as f:
+                    while not self._closed.is_set():
+                        line = f.readline()
+                        if line.endswith(b"\n"):
+                            self.emit(line.decode(errors="replace").rstrip("\n"), level, source)
+                            continue
+                        # Leave a partly written line for the next round
+                        f.seek(-len(line), os.SEEK_CUR)
+                        if process.poll() is not None:
+                            break
+                        time.sleep(0.2)
+            except (OSError, ValueError):
+                return
+            self.emit("Process exited", "INFO", source)
+
+        thread = threading.Thread(target=reader, name=f"log-{source}", daemon=True)
+        thread.start()
+        return thread
+
+    def sources_snapshot(self):
+        """Every source that has logged something so far"""
+        with self._lock:
+            return sorted(self._sources)
+
+    def close(self):
+        self._closed.set()
+        if self.logger is not None:
+            for handler in self.logger.handlers:
+                # MemoryHandler.close() flushes and then forgets its target
+                target = handler.target
+                handler.close()
+                target.close()
+            self.logger.handlers = []
+
+    @staticmethod
+    def matches(record, level=LOG_LEVELS[0], source=ALL_SOURCES):
+        """Whether a record passes the level and mount filters"""
+        return (LOG_LEVELS.index(record[1]) >= LOG_LEVELS.index(level)
+                and source in (ALL_SOURCES, record[2]))
+
+    @staticmethod
+    def format(record):
+        stamp, level, source, message = record
+        clock = time.strftime("%H:%M:%S", time.localtime(stamp))
+        return f"{clock} {level:<7} [{source}] {message}"
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory and rename it into place"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _search_tokens(text):
+    return [t for t in re.split(r"[^0-9a-z]+", str(text).lower()) if t]
+
+
+class ProfileStore:
+    """Named server profiles with tags, groups and indexed search
+
+    Profiles live in CONFIG_FILE as {"version": 2, "profiles": [...]}; the
+    old format (a bare list of at most ten recent servers) is read
+    transparently. Every change is written atomically. search() answers
+    prefix queries from an inverted token index, so type-ahead filtering
+    stays fast with thousands of profiles. The index is built on the first
+    search, so command line lookups by name don't pay for it.
+    """
+
+    def __init__(self, path=CONFIG_FILE):
+        self.path = Path(path)
+        self.profiles = {}
+        self._index = None
+        self._tokens = []
+        self._tokens_dirty = False
+        self._lock = threading.RLock()
+        self.load()
+
+    @traced("config.load")
+    def load(self):
+        """Load profiles from disk, returning an empty store on any error"""
+        data = []
+        try:
+            if self.path.exists():
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+        except Exception as e:
+            print(f"Failed to load profiles: {e}")
+        if isinstance(data, dict):
+            data = data.get("profiles", [])
+
+        with self._lock:
+            self.profiles = {}
+            self._index = None
+            for profile in data:
+                if profile.get("name"):
+                    self._add(profile)
+
+    @traced("config.save")
+    def save(self):
+        with self._lock:
+            data = {"version": CONFIG_VERSION, "profiles": self.all()}
+        atomic_write_json(self.path, data)
+
+    def _add(self, profile):
+        name = profile["name"]
+        if name in self.profiles:
+            self._unindex(name)
+        self.profiles[name] = profile
+        if self._index is not None:
+            self._index_profile(profile)
+
+    def _index_profile(self, profile):
+        name = profile["name"]
+        fields = [name, profile.get("server"), profile.get("username"), profile.get("group")]
+        fields.extend(profile.get("tags", []))
+        for token in {t for field in fields if field for t in _search_tokens(field)}:
+            self._index.setdefault(token, set()).add(name)
+        self._tokens_dirty = True
+
+    def _ensure_index(self):
+        if self._index is None:
+            self._index = {}
+            for profile in self.profiles.values():
+                self._index_profile(profile)
+
+    def _unindex(self, name):
+        if self._index is None:
+            return
+        for token, names in list(self._index.items()):
+            names.discard(name)
+            if not names:
+                del self._index[token]
+        self._tokens_dirty = True
+
+    def get(self, name):
+        with self._lock:
+            return self.profiles.get(name)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def all(self):
+        """All profiles, most recently used first"""
+        with self._lock:
+            profiles = list(self.profiles.values())
+        return sorted(profiles, key=lambda p: -p.get("last_used", 0))
+
+    def groups(self):
+        with self._lock:
+            return sorted({p["group"] for p in self.profiles.values() if p.get("group")})
+
+    def put(self, profile, save=True):
+        """Add or replace a profile and mark it as just used"""
+        profile = dict(profile)
+        profile["last_used"] = time.time()
+        profile.setdefault("tags", [])
+        with self._lock:
+            self._add(profile)
+        if save:
+            self.save()
+        return profile
+
+    def delete(self, name):
+        with self._lock:
+            if self.profiles.pop(name, None) is None:
+                return False
+            self._unindex(name)
+        self.save()
+        return True
+
+    def _prefix_matches(self, prefix):
+        if self._tokens_dirty:
+            self._tokens = sorted(self._index)
+            self._tokens_dirty = False
+        matches = set()
+        start = bisect.bisect_left(self._tokens, prefix)
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._index[token]
+        return matches
+
+    def search(self, query, limit=None):
+        """Profiles matching every word of query, most recently used first
+
+        Words match token prefixes of the name, server, username, group and
+        tags; "group:NAME" and "tag:NAME" match those fields exactly.
+        """
+        with self._lock:
+            self._ensure_index()
+            names = None
+            for word in query.lower().split():
+                if word.startswith(("group:", "tag:")):
+                    field, _, value = word.partition(":")
+                    found = {n for n, p in self.profiles.items()
+                             if (value == (p.get("group") or "").lower() if field == "group"
+                                 else value in [t.lower() for t in p.get("tags", [])])}
+                else:
+                    found = None
+                    for token in _search_tokens(word):
+                        matches = self._prefix_matches(token)
+                        found = matches if found is None else found & matches
+                    if found is None:
+                        continue
+                names = found if names is None else names & found
+            if names is None:
+                results = self.all()
+            else:
+                results = sorted((self.profiles[n] for n in names), key=lambda p: -p.get("last_used", 0))
+        return results[:limit] if limit else results
+
+    def import_ssh_config(self, path=SSH_CONFIG_FILE, group="ssh config"):
+        """Add a profile for every concrete Host in an ssh config; returns the count"""
+        imported = 0
+        with self._lock:
+            for host in parse_ssh_config(path):
+                if host["name"] in self.profiles:
+                    continue
+                host["group"] = group
+                self.put(host, save=False)
+                imported += 1
+        if imported:
+            self.save()
+        return imported
+
+
+def parse_ssh_config(path=SSH_CONFIG_FILE):
+    """Read Host blocks from an ssh config file as profile dicts
+
+    Wildcard patterns and negations are skipped; Include is followed.
+    """
+    default_key = str(Path.home() / ".ssh" / "id_rsa")
+    fields = {"hostname": "server", "user": "username", "port": "port", "identityfile": "key_file"}
+    hosts = []
+
+    def read(config_path, seen):
+        config_path = Path(os.path.expanduser(str(config_path)))
+        if config_path in seen or not config_path.is_file():
+            return
+        seen.add(config_path)
+        current = []
+        with open(config_path, "r", errors="replace") as f:
+            for raw in f:
+                line = raw.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                # Keyword and value are separated by whitespace and/or one "="
+                keyword, value = (re.split(r"\s*=\s*|\s+", line, maxsplit=1) + [""])[:2]
+                keyword, value = keyword.lower(), value.strip().strip('"')
+                if keyword == "include":
+                    for pattern in value.split():
+                        if not os.path.isabs(os.path.expanduser(pattern)):
+                            pattern = str(Path.home() / ".ssh" / pattern)
+                        for included in sorted(glob.glob(os.path.expanduser(pattern))):
+                            read(included, seen)
+                elif keyword == "host":
+                    current = []
+                    for alias in value.split():
+                        if any(c in alias for c in "*?!"):
+                            continue
+                        host = {"name": alias, "server": alias, "port": "22",
+                                "username": getpass.getuser(), "auth_method": "key",
+                                "key_file": default_key if os.path.exists(default_key) else "",
+                                "remote_dir": "/", "local_dir": str(Path.home() / "mnt" / alias),
+                                "additional_options": "", "tags": [], "_seen": set()}
+                        hosts.append(host)
+                        current.append(host)
+                elif keyword == "match":
+                    current = []
+                elif keyword in fields:
+                    # Like ssh itself, the first value given for a keyword wins
+                    for host in current:
+                        if keyword not in host["_seen"]:
+                            host["_seen"].add(keyword)
+                            host[fields[keyword]] = value
+
+    read(path, set())
+    for host in hosts:
+        del host["_seen"]
+        host["key_file"] = os.path.expanduser(host["key_file"])
+    return hosts
+
+
+@traced("mount")
+def mount_profile(op, config, timeout=MOUNT_TIMEOUT, pool=None):
+    """Mount a configuration; runs on a worker thread"""
+    # Striped mounts need a TCP connection each, so they can't share a master
+    striped = profile_connections(config) > 1
+    ssh_options = pool.acquire(op, config, timeout) if pool and not striped else []
+
+    # sshfs reads the password from stdin (-o password_stdin)
+    input_text = None
+    if config.get("auth_method") == "password":
+        input_text = session_credentials.password(config) + "\n"
+
+    process = _run_sshfs(op, config, ssh_options, config.get("local_dir", "").strip(), timeout, input_text)
+
+    # Without max_conns support, stripe over extra instances on sibling directories
+    stripes = stripe_dirs(config)
+    already = read_mount_table() if stripes else {}
+    mounted = []
+    try:
+        for stripe_dir in stripes:
+            if stripe_dir in already:
+                if mount_responds(stripe_dir):
+                    continue
+                # Left hung by an earlier mount; replace it
+                op.run(lazy_unmount_command(stripe_dir), MOUNT_TIMEOUT)
+            os.makedirs(stripe_dir, exist_ok=True)
+            _run_sshfs(op, config, ssh_options, stripe_dir, timeout, input_text)
+            mounted.append(stripe_dir)
+    except (SSHFSError, OSError, OperationCancelled) as e:
+        for local_dir in reversed([config.get("local_dir", "").strip()] + mounted):
+            try:
+                subprocess.run(lazy_unmount_command(local_dir), stdin=subprocess.DEVNULL,
+                               capture_output=True, timeout=MOUNT_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        if isinstance(e, OperationCancelled):
+            raise
+        raise SSHFSError(f"Striped mount failed after {len(mounted) + 1} connection(s): {e}")
+    if stripes:
+        op.report(f"Striped over {len(stripes) + 1} sshfs instances")
+    session_credentials.remember(config)
+    return process
+
+
+def _run_sshfs(op, config, ssh_options, local_dir, timeout, input_text):
+    with tracer.span("sshfs", local_dir=local_dir):
+        return _start_sshfs(op, config, ssh_options, local_dir, timeout, input_text)
+
+
+def _start_sshfs(op, config, ssh_options, local_dir, timeout, input_text):
+    cmd = build_sshfs_command(config, ssh_options, local_dir)
+    op.report(f"Executing: {' '.join(cmd)}")
+
+    # Debug output stops once sshfs daemonizes, so keep it in the foreground.
+    # It writes to a file that is followed into the log, so the mount
+    # doesn't depend on us and survives the app closing
+    foreground = sshfs_debug_requested(cmd) and op.engine is not None and op.engine.logs is not None
+    key = mount_key(local_dir)
+    try:
+        if foreground:
+            output = sshfs_output_file(local_dir)
+            op.report(f"sshfs output goes to {output}")
+            return op.run_until(cmd + ["-f"], timeout, lambda: key in read_mount_table(), output,
+                                input_text=input_text)
+        process = op.run(cmd, timeout, input_text=input_text)
+    except subprocess.TimeoutExpired:
+        raise SSHFSError("Mount operation timed out")
+
+    for line in process.stderr.splitlines():
+        op.log(line)
+    if process.returncode != 0:
+        raise SSHFSError(process.stderr or "Unknown error occurred")
+    return process
+
+
+def trace_tree(spans):
+    """Group spans into (roots, children by parent span id), each sorted by start time"""
+    by_id = {span["span"] for span in spans if "span" in span}
+    roots, children = [], {}
+    for span in spans:
+        if span.get("parent") in by_id:
+            children.setdefault(span["parent"], []).append(span)
+        else:
+            roots.append(span)
+    roots.sort(key=lambda span: span.get("start", 0))
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span.get("start", 0))
+    return roots, children
+
+
+def span_details(span):
+    """A span's own attributes as key=value text"""
+    return " ".join(f"{key}={value}" for key, value in span.items()
+                    if key not in TRACE_FIELDS and value not in (None, ""))
+
+
+@traced("trace.mount")
+def trace_mount(op, config, timeout=MOUNT_TIMEOUT):
+    """Mount a profile in the foreground with debug output, time each phase, then unmount it
+
+    Runs on a worker thread. ssh's -v lines mark DNS, connect, banner, key
+    exchange and authentication, sshfs_debug marks the SFTP session, and
+    fuse_init runs from there until the mount shows up in the mount table.
+    Returns (phase, offset, ms) tuples.
+    """
+    local_dir = mount_key(config.get("local_dir", ""))
+    if local_dir in read_mount_table():
+        raise SSHFSError(f"{local_dir} is already mounted; unmount it to trace a mount")
+    os.makedirs(local_dir, exist_ok=True)
+    cmd = build_sshfs_command(config, (), local_dir) + ["-f", "-o", "sshfs_debug", "-o", "LogLevel=DEBUG1"]
+    password = config.get("auth_method") == "password"
+    op.report(f"Tracing: {' '.join(cmd)}")
+    started_wall, started = time.time(), time.perf_counter()
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE if password else subprocess.DEVNULL,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                               start_new_session=True)
+    if password:
+        try:
+            process.stdin.write(session_credentials.password(config) + "\n")
+            process.stdin.close()
+        except OSError:
+            pass
+    stamped = []
+
+    def read_output():
+        for line in process.stdout:
+            stamped.append((time.perf_counter() - started, line.rstrip("\n")))
+            op.log(line.rstrip("\n"))
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    mounted_at = None
+    try:
+        deadline = started + timeout
+        while mounted_at is None:
+            if local_dir in read_mount_table():
+                mounted_at = time.perf_counter() - started
+            elif process.poll() is not None:
+                last = stamped[-1][1] if stamped else ""
+                raise SSHFSError(f"sshfs exited with status {process.returncode}: {last}")
+            elif time.perf_counter() > deadline:
+                raise SSHFSError("Mount operation timed out")
+            else:
+                op.check_cancelled()
+                time.sleep(0.02)
+    finally:
+        if mounted_at is not None:
+            try:
+                _unmount_one(op, local_dir)
+            except SSHFSError:
+                pass
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            kill_process_group(process)
+            process.wait()
+        reader.join(1)
+
+    phases = split_phases(stamped, SSH_PHASES + [("sftp", ("Server version:",))], mounted_at, rest="fuse_init")
+    for name, offset, ms in phases:
+        tracer.record(f"sshfs.{name}", ms, started_wall + offset)
+    return phases
+
+
+def sshfs_output_file(local_dir):
+    """Log file for the output of a foreground sshfs serving local_dir"""
+    return LOG_DIR / ("sshfs" + re.sub(r"[^\w.-]+", "_", mount_key(local_dir)) + ".log")
+
+
+def sshfs_debug_requested(cmd):
+    """Whether an sshfs command line asks for debug output"""
+    if "-d" in cmd:
+        return True
+    return any(flag == "-o" and any(option in SSHFS_DEBUG_OPTIONS for option in value.split(","))
+               for flag, value in zip(cmd, cmd[1:]))
+
+
+def lazy_unmount_command(local_dir):
+    """Command that detaches a mount even if it is hung or busy"""
+    if sys.platform.startswith("linux"):
+        return ["fusermount", "-uz", local_dir]
+    return ["umount", "-f", local_dir]
+
+
+def unmount_commands(local_dir):
+    """Unmount commands to try in order for this platform"""
+    if sys.platform.startswith("linux"):
+        # Unprivileged FUSE mounts must go through fusermount; umount needs root
+        fusermount = shutil.which("fusermount3") or "fusermount"
+        return [[fusermount, "-u", local_dir], ["umount", local_dir]]
+    if sys.platform == "darwin":
+        return [["umount", local_dir], ["diskutil", "unmount", local_dir]]
+    return [["umount", local_dir]]
+
+
+def stripe_mounts(local_dir):
+    """Stripe instances of a mount point that are in the mount table"""
+    prefix = mount_key(local_dir) + STRIPE_SUFFIX
+    return [mount_point for mount_point in read_mount_table()
+            if mount_point.startswith(prefix) and mount_point[len(prefix):].isdigit()]
+
+
+def mount_responds(local_dir, timeout=HEALTH_TIMEOUT):
+    """Whether a statvfs() on a mount point succeeds within timeout seconds
+
+    The call runs in its own daemon thread, so a mount stuck in the kernel
+    only ever blocks that thread.
+    """
+    done = threading.Event()
+    answered = []
+
+    def target():
+        try:
+            os.statvfs(local_dir)
+            answered.append(True)
+        except OSError:
+            pass
+        done.set()
+
+    threading.Thread(target=target, name=f"sshfs-probe {local_dir}", daemon=True).start()
+    return done.wait(timeout) and bool(answered)
+
+
+@traced("unmount")
+def unmount_path(op, local_dir, registry=None, lazy=False):
+    """Unmount a local mount point and any stripe instances; runs on a worker thread
+
+    Every instance is tried even if one of them is busy, and the first
+    failure is raised afterwards. lazy detaches hung or busy mounts too.
+    """
+    if registry is not None and not registry.is_mounted(local_dir):
+        raise SSHFSError(f"{local_dir} is not mounted")
+
+    processes, errors = [], []
+    for mount_point in [local_dir] + stripe_mounts(local_dir):
+        try:
+            processes.append(_unmount_one(op, mount_point, lazy))
+        except SSHFSError as e:
+            errors.append(e)
+    if errors:
+        raise errors[0]
+    return processes[0]
+
+
+def _unmount_one(op, local_dir, lazy=False):
+    process = None
+    for cmd in [lazy_unmount_command(local_dir)] if lazy else unmount_commands(local_dir):
+        try:
+            process = op.run(cmd, MOUNT_TIMEOUT)
+        except FileNotFoundError:
+            continue
+        if process.returncode == 0:
+            return process
+
+    if process is None:
+        raise SSHFSError("No unmount command found")
+    raise SSHFSError(process.stderr or "Unknown error occurred")
+
+
+def mount_key(path):
+    """Normalise a mount point the way the mount table spells it
+
+    Symlinks in the parent directories are resolved, since the kernel
+    records the real path. The mount point itself is never stat()ed, as it
+    may be a hung mount.
+    """
+    path = os.path.abspath(os.path.expanduser(path.strip()))
+    parent, name = os.path.split(path)
+    return os.path.join(os.path.realpath(parent), name) if name else path
+
+
+def _unescape_mountinfo(field):
+    # Spaces, tabs, newlines and backslashes are octal-escaped, e.g. \040
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+def parse_mountinfo(text):
+    """Parse /proc/self/mountinfo, returning sshfs mounts keyed by mount point"""
+    mounts = {}
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index("-", 6)
+            fstype, source = fields[separator + 1], fields[separator + 2]
+        except (ValueError, IndexError):
+            continue
+        if fstype != SSHFS_FSTYPE:
+            continue
+        mount_point = _unescape_mountinfo(fields[4])
+        mounts[mount_point] = {
+            "mount_point": mount_point,
+            "mount_id": int(fields[0]),
+            "device": fields[2],
+            "source": _unescape_mountinfo(source),
+            "options": fields[5],
+        }
+    return mounts
+
+
+def parse_mount_output(text):
+    """Parse `mount` output on macOS/BSD, returning sshfs mounts keyed by mount point"""
+    mounts = {}
+    for line in text.splitlines():
+        match = re.match(r"^(\S+@?\S*:\S*) on (.+) \((.*)\)$", line)
+        if not match or not re.search(r"fuse|sshfs", match.group(3)):
+            continue
+        source, mount_point, options = match.groups()
+        mounts[mount_point] = {"mount_point": mount_point, "mount_id": None, "device": None,
+                               "source": source, "options": options}
+    return mounts
+
+
+def read_mount_table():
+    """Return the current sshfs mounts without stat()ing any mount point"""
+    if os.path.exists(MOUNTINFO):
+        with open(MOUNTINFO, "r") as f:
+            return parse_mountinfo(f.read())
+    try:
+        output = subprocess.run(["mount"], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    return parse_mount_output(output)
+
+
+def find_sshfs_pids(mount_points):
+    """Map mount points to the pid of the sshfs process serving them (Linux)"""
+    pids = {}
+    wanted = set(mount_points)
+    if not wanted or not os.path.isdir("/proc"):
+        return pids
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                argv = f.read().split(b"\0")
+            if not argv or os.path.basename(argv[0]) != b"sshfs":
+                continue
+            cwd = os.readlink(f"/proc/{entry}/cwd")
+        except OSError:
+            continue
+        for arg in argv[1:]:
+            path = mount_key(os.path.join(cwd, os.fsdecode(arg)))
+            if path in wanted:
+                pids[path] = int(entry)
+    return pids
+
+
+class MountRegistry:
+    """Tracks active sshfs mounts from the kernel's mount table
+
+    On Linux a watcher thread poll()s /proc/self/mountinfo, which the kernel
+    flags with POLLPRI whenever the mount table changes, so the table is only
+    re-read when something was actually mounted or unmounted. Elsewhere the
+    `mount` output is re-read every few seconds. Each change is delivered as
+    on_change(added, removed) with entries annotated with the sshfs pid and
+    the saved profile whose local directory matches.
+    """
+
+    def __init__(self, profiles=None, on_change=None):
+        self.profiles = profiles or (lambda: [])
+        self.on_change = on_change or (lambda added, removed: None)
+        self.mounts = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sshfs-mounts", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def is_mounted(self, local_dir):
+        with self._lock:
+            return mount_key(local_dir) in self.mounts
+
+    def get(self, local_dir):
+        with self._lock:
+            return self.mounts.get(mount_key(local_dir))
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.mounts)
+
+    def refresh(self, text=None):
+        """Re-read the mount table and report what changed"""
+        current = parse_mountinfo(text) if text is not None else read_mount_table()
+        with self._lock:
+            previous = self.mounts
+            added = {k: v for k, v in current.items() if k not in previous}
+            removed = {k: v for k, v in previous.items() if k not in current}
+            # Keep annotations for mounts we already know about
+            for key in current:
+                if key in previous:
+                    current[key] = previous[key]
+            self.mounts = current
+
+        if added:
+            self._annotate(added)
+        if added or removed:
+            self.on_change(added, removed)
+        return added, removed
+
+    def _annotate(self, added):
+        profiles = {mount_key(p.get("local_dir", "")): p for p in self.profiles() if p.get("local_dir")}
+        pids = find_sshfs_pids(added)
+        for key, entry in added.items():
+            entry["pid"] = pids.get(key)
+            entry["profile"] = profiles.get(key)
+
+    def _run(self):
+        if not os.path.exists(MOUNTINFO) or not hasattr(select, "poll"):
+            while not self._stop.wait(MOUNT_TABLE_INTERVAL):
+                self.refresh()
+            return
+
+        with open(MOUNTINFO, "r") as f:
+            poller = select.poll()
+            poller.register(f.fileno(), select.POLLPRI | select.POLLERR)
+            while not self._stop.is_set():
+                if not poller.poll(1000):
+                    continue
+                # Reading the whole file re-arms the notification
+                f.seek(0)
+                self.refresh(f.read())
+
+
+@traced("test")
+def test_profile(op, config, pool=None):
+    """Test the SSH connection for a configuration; runs on a worker thread"""
+    ssh_options = pool.acquire(op, config) if pool else []
+    cmd = build_test_command(config, ssh_options)
+    op.report(f"Testing connection: {' '.join(cmd[:5])}...")
+    # ssh -v output tells how long each phase of the handshake took
+    cmd.insert(1, "-v")
+    started = time.time()
+    try:
+        process = op.run_timed(cmd, TEST_TIMEOUT, env=ssh_environment(config))
+    except subprocess.TimeoutExpired:
+        raise SSHFSError("Connection test timed out")
+
+    phases = split_phases(process.stderr_times, SSH_PHASES, process.elapsed)
+    for name, offset, ms in phases:
+        tracer.record(f"ssh.{name}", ms, started + offset)
+    if len(phases) > 1:
+        op.report("Connection phases: " + ", ".join(f"{name} {ms:.0f} ms" for name, _, ms in phases))
+    errors = "\n".join(line for _, line in process.stderr_times
+                       if not line.startswith(("debug", "OpenSSH_", "Transferred:", "Bytes per second:")))
+    process.stderr = errors
+    if process.returncode != 0:
+        raise SSHFSError(errors or "Connection failed")
+    session_credentials.remember(config)
+    return process
+
+
+class BatchMount:
+    """Mount many profiles concurrently and record per-profile latency
+
+    Uses its own OperationEngine sized to the concurrency limit. Pass the
+    GUI's event queue as ``events`` to have results delivered on the Tk
+    thread, or call run() to drive the batch headlessly.
+    """
+
+    def __init__(self, profiles, concurrency=BATCH_CONCURRENCY, timeout=MOUNT_TIMEOUT,
+                 events=None, on_progress=None, on_complete=None, pool=None, logs=None):
+        self.profiles = list(profiles)
+        self.timeout = timeout
+        self.pool = pool
+        self.mounted = {}
+        self.on_complete = on_complete
+        self.results = []
+        self.started = None
+        self.elapsed = None
+        self.engine = OperationEngine(max_workers=max(1, concurrency), events=events)
+        if on_progress:
+            self.engine.on_progress = on_progress
+        self.engine.logs = logs
+
+    @property
+    def done(self):
+        return len(self.results) == len(self.profiles)
+
+    def start(self):
+        """Submit every profile to the pool"""
+        self.started = time.monotonic()
+        self.mounted = read_mount_table()
+        for config in self.profiles:
+            self.engine.submit(f"Mount {config.get('name', 'Unknown')}", self._mount_one, config,
+                               on_done=self._record, source=config.get("name"))
+        if not self.profiles:
+            self._complete()
+        return self
+
+    def run(self):
+        """Run the batch to completion on the calling thread"""
+        self.start()
+        while not self.done:
+            self.engine.dispatch(block=True, timeout=0.5)
+        return self.results
+
+    def cancel(self):
+        self.engine.cancel_all()
+
+    def _mount_one(self, op, config):
+        started = time.monotonic()
+        row = {"name": config.get("name", "Unknown"), "status": "mounted", "error": ""}
+        local_dir = config.get("local_dir", "").strip()
+        try:
+            if config.get("auth_method") == "password" and not session_credentials.password(config):
+                row["status"] = "skipped"
+                row["error"] = "password required"
+            elif local_dir and mount_key(local_dir) in self.mounted:
+                row["status"] = "already mounted"
+            else:
+                os.makedirs(local_dir, exist_ok=True)
+                timeout = float(config.get("timeout") or self.timeout)
+                mount_profile(op, config, timeout=timeout, pool=self.pool)
+        except OperationCancelled:
+            row["status"] = "cancelled"
+        except Exception as e:
+            row["status"] = "failed"
+            row["error"] = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        row["seconds"] = time.monotonic() - started
+        op.report(f"{row['name']}: {row['status']} ({row['seconds']:.2f}s)")
+        return row
+
+    def _record(self, row):
+        self.results.append(row)
+        if self.done:
+            self._complete()
+
+    def _complete(self):
+        self.elapsed = time.monotonic() - self.started
+        self.engine.executor.shutdown(wait=False)
+        if self.on_complete:
+            self.on_complete(self)
+
+    def failed(self):
+        """Rows whose profile did not end up mounted, including ones skipped for want of a password"""
+        return [r for r in self.results if r["status"] in ("failed", "cancelled", "skipped")]
+
+    def summary(self):
+        """Format the results as a plain-text table"""
+        rows = sorted(self.results, key=lambda r: r["seconds"], reverse=True)
+        width = max([len("Profile")] + [len(r["name"]) for r in rows])
+        lines = [f"{'Profile':<{width}}  {'Result':<15}  {'Latency':>8}  Error",
+                 f"{'-' * width}  {'-' * 15}  {'-' * 8}  {'-' * 5}"]
+        for r in rows:
+            lines.append(f"{r['name']:<{width}}  {r['status']:<15}  {r['seconds']:>7.2f}s  {r['error']}")
+        mounted = sum(1 for r in rows if r["status"] in ("mounted", "already mounted"))
+        lines.append(f"{mounted}/{len(rows)} mounted in {self.elapsed or 0:.2f}s")
+        return "\n".join(lines)
+
+
+def startup_profiles(profiles):
+    """Return the profiles marked 'Mount on startup'"""
+    return [p for p in profiles if p.get("mount_on_startup")]
+
+
+def run_benchmark(op, mount_dir, file_mb=BENCH_FILE_MB, small_files=BENCH_SMALL_FILES):
+    """Measure throughput and metadata latency of a mounted directory
+
+    Works in a scratch directory inside mount_dir that is removed afterwards.
+    Runs on a worker thread; op may be None when called directly.
+    """
+    import statistics
+
+    def step(message):
+        if op is not None:
+            op.check_cancelled()
+            op.report(message)
+
+    workdir = os.path.join(mount_dir, f".sshfs-gui-bench-{os.getpid()}-{int(time.time())}")
+    os.mkdir(workdir)
+    results = {"file_mb": file_mb, "small_files": small_files}
+    try:
+        # Sequential write of incompressible data, flushed to the server
+        step(f"Benchmark: writing {file_mb} MB...")
+        block = os.urandom(1 << 20)
+        big_file = os.path.join(workdir, "sequential.bin")
+        started = time.perf_counter()
+        with open(big_file, "wb", buffering=0) as f:
+            for _ in range(file_mb):
+                f.write(block)
+            os.fsync(f.fileno())
+        results["seq_write_mbps"] = file_mb / (time.perf_counter() - started)
+
+        # Sequential read, dropping the local page cache first where possible
+        step(f"Benchmark: reading {file_mb} MB...")
+        with open(big_file, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            started = time.perf_counter()
+            while f.read(1 << 20):
+                pass
+        results["seq_read_mbps"] = file_mb / (time.perf_counter() - started)
+        os.remove(big_file)
+
+        # Small file create / stat / delete
+        step(f"Benchmark: {small_files} small file operations...")
+        names = [os.path.join(workdir, f"small-{i:05d}") for i in range(small_files)]
+        started = time.perf_counter()
+        for name in names:
+            with open(name, "wb") as f:
+                f.write(b"x" * 512)
+        results["create_ops"] = small_files / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for name in names:
+            os.stat(name)
+        results["stat_ops"] = small_files / (time.perf_counter() - started)
+
+        # Directory listing of the populated scratch directory
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            os.listdir(workdir)
+            timings.append(time.perf_counter() - started)
+        results["listdir_ms"] = statistics.median(timings) * 1000
+
+        started = time.perf_counter()
+        for name in names:
+            os.remove(name)
+        results["delete_ops"] = small_files / (time.perf_counter() - started)
+
+        # Lookups of names that do not exist can't be answered from cache
+        step("Benchmark: measuring metadata round trip...")
+        timings = []
+        for i in range(20):
+            started = time.perf_counter()
+            try:
+                os.stat(os.path.join(workdir, f"missing-{time.time_ns()}-{i}"))
+            except FileNotFoundError:
+                pass
+            timings.append(time.perf_counter() - started)
+        results["metadata_rtt_ms"] = statistics.median(timings) * 1000
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def load_benchmarks(benchmark_file=BENCHMARK_FILE):
+    """Load stored benchmark runs, keyed by profile name"""
+    try:
+        if benchmark_file.exists():
+            with open(benchmark_file, "r") as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Failed to load benchmarks: {e}")
+    return {}
+
+
+def save_benchmark(name, config, results, benchmark_file=BENCHMARK_FILE):
+    """Append a timestamped benchmark run to a profile's history"""
+    history = load_benchmarks(benchmark_file)
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "tuning_profile": config.get("tuning_profile", DEFAULT_TUNING),
+        "additional_options": config.get("additional_options", ""),
+        "results": results,
+    }
+    runs = history.setdefault(name, [])
+    runs.append(run)
+    history[name] = runs[-BENCH_HISTORY:]
+    atomic_write_json(benchmark_file, history)
+    return run
+
+
+def format_benchmark_table(runs):
+    """Format benchmark runs side by side, oldest first"""
+    headers = [run["timestamp"].replace("T", " ")[5:16] for run in runs]
+    labels = ["Options"] + [label for _, label in BENCH_METRICS]
+    width = max(len(label) for label in labels)
+    col = max([16] + [len(h) for h in headers])
+
+    lines = [f"{'':<{width}}  " + "  ".join(f"{h:>{col}}" for h in headers)]
+    options = [(run["tuning_profile"] + " " + run["additional_options"]).strip()[:col] for run in runs]
+    lines.append(f"{'Options':<{width}}  " + "  ".join(f"{o:>{col}}" for o in options))
+    for key, label in BENCH_METRICS:
+        values = [run["results"].get(key) for run in runs]
+        cells = [f"{v:>{col}.2f}" if v is not None else f"{'-':>{col}}" for v in values]
+        lines.append(f"{label:<{width}}  " + "  ".join(cells))
+    return "\n".join(lines)
+
+
+def stripe_paths(config, path):
+    """The same file as seen through every sshfs instance of a striped mount"""
+    path = mount_key(path)
+    root = mount_key(config.get("local_dir", "")) if config else ""
+    if not root or not (path == root or path.startswith(root + os.sep)):
+        return [path]
+    relative = os.path.relpath(path, root)
+    return [path] + [os.path.normpath(os.path.join(d, relative)) for d in stripe_dirs(config)]
+
+
+def parallel_copy(op, src, dst, workers=None, config=None, chunk_size=STRIPE_CHUNK):
+    """Copy one large file with several workers, each pread/pwrite-ing its own chunks
+
+    With a profile whose mount is striped over several sshfs instances, each
+    worker reads or writes through a different instance, so the chunks travel
+    over separate SSH connections; with max_conns every worker opens its own
+    handle and sshfs spreads the handles over its connections. op may be
+    None when called directly.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = workers or (profile_connections(config) if config else 1)
+    sources = stripe_paths(config, src)
+    targets = stripe_paths(config, dst)
+    size = os.stat(sources[0]).st_size
+    with open(targets[0], "wb") as f:
+        f.truncate(size)
+
+    offsets = iter(range(0, size, chunk_size))
+    lock = threading.Lock()
+    progress = {"copied": 0, "reported": 0}
+
+    def copy_chunk(src_fd, dst_fd, fallback_fd, offset):
+        end = min(offset + chunk_size, size)
+        while offset < end:
+            data = os.pread(src_fd, end - offset, offset)
+            if not data:
+                # Another instance may still cache an older, shorter size
+                if src_fd == fallback_fd:
+                    raise SSHFSError(f"{src} changed size while it was being copied")
+                src_fd = fallback_fd
+                continue
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(dst_fd, view, offset)
+                view = view[written:]
+                offset += written
+        return end
+
+    def worker(index):
+        src_fd = os.open(sources[index % len(sources)], os.O_RDONLY)
+        fallback_fd = os.open(sources[0], os.O_RDONLY)
+        # O_CREAT: an instance may not have seen the new file yet
+        dst_fd = os.open(targets[index % len(targets)], os.O_WRONLY | os.O_CREAT)
+        try:
+            while True:
+                if op is not None:
+                    op.check_cancelled()
+                with lock:
+                    offset = next(offsets, None)
+                if offset is None:
+                    break
+                end = copy_chunk(src_fd, dst_fd, fallback_fd, offset)
+                with lock:
+                    progress["copied"] += end - offset
+                    percent = progress["copied"] * 100 // max(size, 1)
+                    if op is not None and percent >= progress["reported"] + 10:
+                        progress["reported"] = percent
+                        op.report(f"Copying {os.path.basename(src)}: {percent}%")
+            os.fsync(dst_fd)
+        finally:
+            os.close(src_fd)
+            os.close(fallback_fd)
+            os.close(dst_fd)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sshfs-copy") as pool:
+        for future in [pool.submit(worker, i) for i in range(workers)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    return {"bytes": size, "seconds": elapsed, "workers": workers,
+            "mbps": size / (1 << 20) / max(elapsed, 1e-9)}
+
+
+def run_scaling_benchmark(op, config, file_mb=BENCH_FILE_MB, counts=None):
+    """Measure parallel copy throughput to and from a mount for 1..N connections
+
+    Uploads a file of random data with each connection count, then reads a
+    second file back with the same counts after dropping it from the page
+    cache. op may be None when called directly.
+    """
+    connections = profile_connections(config)
+    counts = counts or sorted({1, connections} | {c for c in (2, 4, 8) if c < connections})
+    mount_dir = mount_key(config.get("local_dir", ""))
+    prefix = os.path.join(mount_dir, f".sshfs-gui-scaling-{os.getpid()}")
+    fd, local_file = tempfile.mkstemp(prefix="sshfs-gui-scaling-")
+    local_copy = local_file + ".copy"
+    remote_files = []
+    results = []
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for _ in range(file_mb):
+                f.write(os.urandom(1 << 20))
+
+        # Read-back source, written once so no instance caches a partial size
+        source = prefix + "-read"
+        shutil.copyfile(local_file, source)
+        remote_files.append(source)
+
+        for count in counts:
+            if op is not None:
+                op.check_cancelled()
+                op.report(f"Scaling benchmark: {count} connection(s)...")
+            target = f"{prefix}-write-{count}"
+            remote_files.append(target)
+            write = parallel_copy(op, local_file, target, count, config)
+
+            for path in stripe_paths(config, source):
+                with open(path, "rb") as f:
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            read = parallel_copy(op, source, local_copy, count, config)
+            results.append({"connections": count, "write_mbps": write["mbps"], "read_mbps": read["mbps"]})
+    finally:
+        for path in [local_file, local_copy] + remote_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return results
+
+
+def format_scaling_table(results):
+    """Format scaling benchmark results, one row per connection count"""
+    lines = [f"{'Connections':>11}  {'Write (MB/s)':>12}  {'Read (MB/s)':>11}  {'Speed-up':>8}"]
+    base = results[0]["read_mbps"] if results else 0
+    for row in results:
+        speedup = row["read_mbps"] / base if base else 0
+        lines.append(f"{row['connections']:>11}  {row['write_mbps']:>12.2f}  {row['read_mbps']:>11.2f}  {speedup:>7.2f}x")
+    return "\n".join(lines)
+
+
+class HealthMonitor:
+    """Probe active mounts and remount stale ones with backoff
+
+    Each probe is a statvfs() on the mount point run in its own daemon
+    thread, so a FUSE call stuck in the kernel only ever blocks that thread.
+    A mount counts as hung if its probe misses the deadline and as stale if
+    the probe fails with an error such as ENOTCONN. Profiles with
+    auto_reconnect are lazily unmounted and remounted through the engine.
+    Status updates are posted to the UI thread as on_status(local_dir, info).
+    """
+
+    def __init__(self, engine, pool=None, interval=HEALTH_INTERVAL, probe_timeout=HEALTH_TIMEOUT,
+                 on_status=None):
+        self.engine = engine
+        self.pool = pool
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.on_status = on_status or (lambda local_dir, info: None)
+        self.mounts = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sshfs-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def watch(self, config):
+        """Start monitoring a mounted profile"""
+        local_dir = mount_key(config.get("local_dir", ""))
+        with self._lock:
+            if local_dir in self.mounts:
+                # Already watched; just pick up the newer configuration
+                self.mounts[local_dir]["config"] = config
+                return
+            self.mounts[local_dir] = {
+                "config": config,
+                "status": "mounted",
+                "latency": None,
+                "failures": 0,
+                "next_remount": 0,
+                "remounting": False,
+                "probe": None,
+                "probes": 0,
+            }
+        self._report(local_dir)
+
+    def unwatch(self, local_dir):
+        with self._lock:
+            self.mounts.pop(mount_key(local_dir), None)
+
+    def probe_count(self, local_dir):
+        """Probes made of a mount so far; sshfs has to answer each one"""
+        with self._lock:
+            state = self.mounts.get(mount_key(local_dir))
+            return state["probes"] if state else 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                watched = list(self.mounts.items())
+            # Probe every mount at once, then collect against one deadline
+            probes = [(local_dir, state, self._start_probe(local_dir, state)) for local_dir, state in watched]
+            deadline = time.monotonic() + self.probe_timeout
+            for local_dir, state, probe in probes:
+                self._collect(local_dir, state, probe, deadline)
+
+    def _start_probe(self, local_dir, state):
+        probe = state["probe"]
+        if probe is not None and not probe["done"].is_set():
+            # The previous probe is still stuck; don't pile up threads on it
+            return probe
+
+        probe = {"done": threading.Event(), "started": time.monotonic(), "latency": None,
+                 "error": None, "mounted": True}
+
+        def target():
+            started = time.perf_counter()
+            try:
+                os.statvfs(local_dir)
+                probe["mounted"] = os.path.ismount(local_dir)
+            except OSError as e:
+                probe["error"] = e.strerror or str(e)
+            probe["latency"] = time.perf_counter() - started
+            probe["done"].set()
+
+        state["probe"] = probe
+        state["probes"] += 1
+        threading.Thread(target=target, name=f"sshfs-probe {local_dir}", daemon=True).start()
+        return probe
+
+    def _collect(self, local_dir, state, probe, deadline):
+        probe["done"].wait(max(0, deadline - time.monotonic()))
+        with self._lock:
+            if local_dir not in self.mounts:
+                return
+            if not probe["done"].is_set():
+                state["status"] = "hung"
+                state["latency"] = time.monotonic() - probe["started"]
+            elif probe["error"]:
+                state["status"] = f"stale: {probe['error']}"
+                state["latency"] = probe["latency"]
+            elif not probe["mounted"]:
+                # Unmounted behind our back; stop watching rather than fight the user
+                state["status"] = "unmounted"
+                del self.mounts[local_dir]
+            else:
+                state["status"] = "ok"
+                state["latency"] = probe["latency"]
+                state["failures"] = 0
+            healthy = state["status"] in ("ok", "unmounted")
+        self._report(local_dir, state)
+        if not healthy:
+            self._recover(local_dir, state)
+
+    def _recover(self, local_dir, state):
+        config = state["config"]
+        with self._lock:
+            if (not config.get("auto_reconnect") or state["remounting"]
+                    or time.monotonic() < state["next_remount"]):
+                return
+            state["remounting"] = True
+            state["status"] = "remounting"
+        self._report(local_dir, state)
+
+        def on_done(result):
+            with self._lock:
+                state["remounting"] = False
+                state["failures"] = 0
+                state["status"] = "remounted"
+                state["probe"] = None
+            self.on_status(local_dir, self._info(state))
+
+        def on_error(error):
+            with self._lock:
+                state["remounting"] = False
+                state["failures"] += 1
+                delay = min(REMOUNT_BACKOFF * 2 ** (state["failures"] - 1), REMOUNT_BACKOFF_MAX)
+                state["next_remount"] = time.monotonic() + delay
+                state["status"] = f"remount failed, retrying in {delay:.0f}s"
+            self.on_status(local_dir, self._info(state))
+
+        self.engine.submit(f"Remount {config.get('name', local_dir)}", self._remount, local_dir, config,
+                           on_done=on_done, on_error=on_error, source=config.get("name"))
+
+    def _remount(self, op, local_dir, config):
+        op.report(f"{local_dir} is not responding, remounting...")
+        # Stripe instances of a hung mount are usually hung as well
+        for mount_point in [local_dir] + stripe_dirs(config):
+            op.run(lazy_unmount_command(mount_point), MOUNT_TIMEOUT)
+        return mount_profile(op, config, pool=self.pool)
+
+    def _info(self, state):
+        return {"name": state["config"].get("name", ""), "status": state["status"],
+                "latency": state["latency"], "failures": state["failures"]}
+
+    def _report(self, local_dir, state=None):
+        if state is None:
+            with self._lock:
+                state = self.mounts.get(local_dir)
+            if state is None:
+                return
+        self.engine.post(self.on_status, local_dir, self._info(state))
+
+
+class InotifyWatcher:
+    """Report the first open of watched directories through Linux inotify
+
+    One inotify descriptor and one thread serve every watch. A watch fires
+    once: callback(path) runs on the watcher thread and the watch is dropped.
+    """
+
+    IN_OPEN = 0x20
+    IN_IGNORED = 0x8000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise()
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sshfs-inotify", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux")
+
+    def _raise(self, path=None):
+        errno = self._ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), path)
+
+    def add(self, path, callback):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.IN_OPEN)
+        if wd < 0:
+            self._raise(path)
+        with self._lock:
+            self._watches[wd] = (path, callback)
+
+    def remove(self, path):
+        with self._lock:
+            wds = [wd for wd, (watched, _) in self._watches.items() if watched == path]
+            for wd in wds:
+                del self._watches[wd]
+        for wd in wds:
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(2)
+        os.close(self.fd)
+
+    def _run(self):
+        import struct
+        poller = select.poll()
+        poller.register(self.fd, select.POLLIN)
+        while not self._stop.is_set():
+            if not poller.poll(1000):
+                continue
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            fired = []
+            offset = 0
+            # struct inotify_event: wd, mask, cookie, len, then len bytes of name
+            while offset + 16 <= len(data):
+                wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+                offset += 16 + length
+                if not mask & (self.IN_OPEN | self.IN_IGNORED):
+                    continue
+                with self._lock:
+                    watch = self._watches.pop(wd, None)
+                if watch is not None and mask & self.IN_OPEN:
+                    self._libc.inotify_rm_watch(self.fd, wd)
+                    fired.append(watch)
+            for path, callback in fired:
+                callback(path)
+
+
+class IdleManager:
+    """Unmount idle profiles and mount them again on first access
+
+    Profiles with idle_minutes set are unmounted once their sshfs processes
+    have done no I/O for that long. Activity comes from the syscall counters
+    in /proc/<pid>/io, less what the HealthMonitor's own statvfs probes
+    cost. A mount still in use (open files, a shell sitting in it) refuses
+    to unmount and simply stays mounted. The empty mount point is then
+    watched with inotify and the first open of it (ls, a file manager)
+    mounts the profile again through the engine; that first open itself
+    still sees the empty directory. Events are posted to the UI thread as
+    on_event(message, level, source).
+    """
+
+    def __init__(self, engine, registry, profiles, pool=None, health=None,
+                 interval=IDLE_CHECK_INTERVAL, on_event=None):
+        self.engine = engine
+        self.registry = registry
+        self.profiles = profiles
+        self.pool = pool
+        self.health = health
+        self.interval = interval
+        self.on_event = on_event or (lambda message, level, source: None)
+        self.active = {}
+        self.sleeping = {}
+        self.watcher = None
+        self.disabled = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sshfs-idle", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def _event(self, message, level="INFO", config=None):
+        self.engine.post(self.on_event, message, level, (config or {}).get("name") or APP_SOURCE)
+
+    def _ensure_watcher(self):
+        if self.watcher is None and not self.disabled:
+            try:
+                if not InotifyWatcher.available():
+                    raise OSError("inotify is only available on Linux")
+                self.watcher = InotifyWatcher()
+            except (OSError, AttributeError) as e:
+                self.disabled = True
+                self._event(f"Idle unmount disabled: cannot watch mount points ({e})", "WARNING")
+        return self.watcher
+
+    def check(self, now=None):
+        """Look for idle mounts once; the monitor thread calls this every interval"""
+        now = time.monotonic() if now is None else now
+        profiles = {mount_key(p.get("local_dir", "")): p for p in self.profiles() if p.get("local_dir")}
+        mounts = self.registry.snapshot()
+        with self._lock:
+            for local_dir in [d for d in self.active if d not in mounts]:
+                del self.active[local_dir]
+            woken = [d for d in self.sleeping if d in mounts]
+            for local_dir in woken:
+                # Mounted again some other way
+                del self.sleeping[local_dir]
+        for local_dir in woken:
+            self.watcher.remove(local_dir)
+
+        for local_dir, config in profiles.items():
+            minutes = profile_idle_minutes(config)
+            entry = mounts.get(local_dir)
+            if not minutes or entry is None or not entry.get("pid") or not self._ensure_watcher():
+                with self._lock:
+                    self.active.pop(local_dir, None)
+                continue
+            # Striped profiles are busy if any of their instances is
+            prefix = local_dir + STRIPE_SUFFIX
+            pids = [entry["pid"]] + [e["pid"] for k, e in mounts.items()
+                                     if k.startswith(prefix) and k[len(prefix):].isdigit() and e.get("pid")]
+            calls = 0
+            for pid in pids:
+                counters = read_proc_io(pid) or {}
+                calls += counters.get("syscr", 0) + counters.get("syscw", 0)
+            probes = self.health.probe_count(local_dir) if self.health else 0
+            with self._lock:
+                state = self.active.get(local_dir)
+                if state is None or state["pids"] != pids:
+                    self.active[local_dir] = {"pids": pids, "calls": calls, "probes": probes,
+                                              "last_active": now, "unmounting": False}
+                    continue
+                if calls - state["calls"] > max(probes - state["probes"], 0) * IDLE_PROBE_SYSCALLS:
+                    state["last_active"] = now
+                state["calls"], state["probes"] = calls, probes
+                if state["unmounting"] or now - state["last_active"] < minutes * 60:
+                    continue
+                state["unmounting"] = True
+            self._unmount(local_dir, config, minutes)
+
+    def _unmount(self, local_dir, config, minutes):
+        def on_done(process):
+            self.arm(config)
+            self._event(f"{local_dir} was idle for {minutes} min; unmounted until next access", config=config)
+
+        def on_error(error):
+            with self._lock:
+                state = self.active.get(local_dir)
+                if state is not None:
+                    state["unmounting"] = False
+                    state["last_active"] = time.monotonic()
+            self._event(f"Idle unmount of {local_dir} skipped: {error}", "WARNING", config)
+
+        self.engine.submit(f"Idle unmount {config.get('name', local_dir)}", unmount_path, local_dir,
+                           on_done=on_done, on_error=on_error, source=config.get("name"))
+
+    def arm(self, config):
+        """Mount config on the next open of its (unmounted) mount point"""
+        local_dir = mount_key(config.get("local_dir", ""))
+        if self._ensure_watcher() is None:
+            return False
+        with self._lock:
+            self.sleeping[local_dir] = config
+        try:
+            os.makedirs(local_dir, exist_ok=True)
+            self.watcher.add(local_dir, self._on_access)
+        except OSError as e:
+            with self._lock:
+                self.sleeping.pop(local_dir, None)
+            self._event(f"Cannot watch {local_dir} for access: {e}", "ERROR", config)
+            return False
+        return True
+
+    def _on_access(self, local_dir):
+        with self._lock:
+            config = self.sleeping.pop(local_dir, None)
+        if config is None or self._stop.is_set():
+            return
+        started = time.monotonic()
+
+        def on_done(process):
+            self._event(f"{local_dir} mounted again on access in {time.monotonic() - started:.1f}s", config=config)
+
+        def on_error(error):
+            self._event(f"Mount on access of {local_dir} failed: {error}", "ERROR", config)
+            self.arm(config)
+
+        self.engine.submit(f"Mount {config.get('name', local_dir)}", mount_profile, config, MOUNT_TIMEOUT,
+                           self.pool, on_done=on_done, on_error=on_error, source=config.get("name"))
+
+
+def supervisor_request(command, socket_path=SUPERVISOR_SOCKET, timeout=2, **fields):
+    """Send one request to a running supervisor; None if none is listening
+
+    A socket in a directory that isn't private to us is ignored, since
+    whoever owns that directory could be answering. Raises SSHFSError when
+    a supervisor is listening but doesn't answer within timeout seconds.
+    """
+    import socket
+    socket_path = Path(socket_path)
+    if not is_private_dir(socket_path.parent):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall((json.dumps(dict(fields, command=command)) + "\n").encode())
+            with sock.makefile("rb") as f:
+                return json.loads(f.readline())
+    except socket.timeout:
+        raise SSHFSError(f"The mount supervisor did not answer within {timeout:g}s")
+    except (OSError, ValueError):
+        return None
+
+
+def stop_supervised(op, local_dir):
+    """Have the supervisor unmount local_dir and stop restarting it; runs on a worker thread"""
+    op.report(f"Asking the mount supervisor to unmount {local_dir}")
+    response = supervisor_request("stop", timeout=SUPERVISOR_STOP_TIMEOUT, local_dir=mount_key(local_dir))
+    if response is None:
+        raise SSHFSError("The mount supervisor is not running")
+    if not response.get("ok"):
+        raise SSHFSError(response.get("error") or "The mount supervisor refused")
+    return response
+
+
+class Supervisor:
+    """Own foreground sshfs processes and keep their profiles mounted
+
+    Each instance (a profile's mount point plus any stripe directories) has
+    a thread running ``sshfs -f`` as its child, so an exit is noticed at
+    once. A stale mount is then lazily detached and sshfs started again
+    after REMOUNT_BACKOFF seconds, doubling up to REMOUNT_BACKOFF_MAX; a
+    mount that stayed up for SUPERVISOR_STABLE seconds starts over at the
+    shortest delay. Clients talk to it over a unix socket, one JSON object
+    per line: {"command": "status" | "start" | "stop" | "restart",
+    "profile": name} (or "local_dir" instead of "profile").
+    """
+
+    def __init__(self, socket_path=SUPERVISOR_SOCKET, timeout=MOUNT_TIMEOUT, log=None):
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+        self.log = log or (lambda message: print(message, flush=True))
+        self.profiles = {}
+        self.server = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def serve(self):
+        """Listen on the status socket in a background thread"""
+        import socketserver
+
+        if supervisor_request("status", self.socket_path) is not None:
+            raise SSHFSError(f"A supervisor is already listening on {self.socket_path}")
+        ensure_private_dir(self.socket_path.parent)
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        supervisor = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    response = supervisor.handle(json.loads(self.rfile.readline()))
+                except (ValueError, AttributeError) as e:
+                    response = {"ok": False, "error": f"Bad request: {e}"}
+                self.wfile.write((json.dumps(response) + "\n").encode())
+
+        self.server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="sshfs-supervisor", daemon=True).start()
+        return self
+
+    def handle(self, request):
+        """Answer one client request"""
+        command = request.get("command")
+        if command == "status":
+            return {"ok": True, "pid": os.getpid(), "mounts": self.status()}
+        if command not in ("start", "stop", "restart"):
+            return {"ok": False, "error": f"Unknown command {command!r}"}
+        name = request.get("profile") or self.profile_for(request.get("local_dir", ""))
+        try:
+            if command == "start":
+                config = ProfileStore().get(name) if name else None
+                if config is None:
+                    raise SSHFSError(f"No saved profile named {name!r}")
+                self.start(config)
+            elif name not in self.profiles:
+                raise SSHFSError(f"{name or request.get('local_dir')} is not supervised")
+            elif command == "stop":
+                self.stop_profile(name)
+            else:
+                self.restart(name)
+        except SSHFSError as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True}
+
+    def profile_for(self, local_dir):
+        local_dir = mount_key(local_dir) if local_dir else ""
+        with self._lock:
+            for name, instances in self.profiles.items():
+                if any(state["local_dir"] == local_dir for state in instances):
+                    return name
+        return None
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            instances = [state for states in self.profiles.values() for state in states]
+        return [{"profile": s["name"], "local_dir": s["local_dir"], "status": s["status"], "pid": s["pid"],
+                 "restarts": s["restarts"], "uptime": now - s["since"] if s["since"] else None,
+                 "error": s["error"]} for s in instances]
+
+    def start(self, config):
+        """Supervise a profile; its instances are started in parallel"""
+        name = config.get("name", "")
+        if config.get("auth_method") == "password" and not session_credentials.password(config):
+            raise SSHFSError(f"{name} uses password authentication and no password was given")
+        local_dir = mount_key(config.get("local_dir", ""))
+        with self._lock:
+            if name in self.profiles:
+                return
+            instances = [{"name": name, "config": config, "local_dir": d, "process": None, "pid": None,
+                          "status": "starting", "failures": 0, "restarts": 0, "since": None,
+                          "next_start": 0, "error": "", "wanted": True, "restart": False,
+                          "wake": threading.Event()}
+                         for d in [local_dir] + stripe_dirs(config)]
+            self.profiles[name] = instances
+        for state in instances:
+            threading.Thread(target=self._supervise, args=(state,), daemon=True,
+                             name=f"sshfs-supervise {state['local_dir']}").start()
+
+    def stop_profile(self, name):
+        """Unmount a profile and stop supervising it"""
+        with self._lock:
+            instances = self.profiles.pop(name, [])
+        for state in instances:
+            state["wanted"] = False
+            self._end(state)
+
+    def restart(self, name):
+        """Remount a profile now, forgetting earlier failures"""
+        with self._lock:
+            instances = list(self.profiles.get(name, []))
+        for state in instances:
+            state["restart"] = True
+            if not self._end(state):
+                state["next_start"] = 0
+                state["wake"].set()
+
+    def shutdown(self):
+        """Unmount everything and close the status socket"""
+        self._stop.set()
+        for name in list(self.profiles):
+            self.stop_profile(name)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _end(self, state):
+        """Unmount an instance so its sshfs exits; False if none was running"""
+        state["wake"].set()
+        process = state["process"]
+        if process is None:
+            return False
+        for cmd in unmount_commands(state["local_dir"]):
+            try:
+                if subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True,
+                                  timeout=MOUNT_TIMEOUT).returncode == 0:
+                    break
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            # Busy or hung; the supervising thread detaches the stale mount
+            kill_process_group(process)
+        return True
+
+    def _supervise(self, state):
+        name, config, local_dir = state["name"], state["config"], state["local_dir"]
+        while state["wanted"] and not self._stop.is_set():
+            delay = state["next_start"] - time.monotonic()
+            if delay > 0:
+                state["wake"].wait(delay)
+                state["wake"].clear()
+                continue
+            if local_dir in read_mount_table():
+                if mount_responds(local_dir):
+                    state["status"] = "mounted elsewhere"
+                    state["next_start"] = time.monotonic() + SUPERVISOR_POLL
+                    continue
+                # Left behind by a crashed or hung sshfs
+                subprocess.run(lazy_unmount_command(local_dir), stdin=subprocess.DEVNULL,
+                               capture_output=True, timeout=MOUNT_TIMEOUT)
+            returncode = self._run_once(state)
+            up = time.monotonic() - state["since"] if state["since"] else 0
+            state["since"] = None
+            if local_dir in read_mount_table():
+                subprocess.run(lazy_unmount_command(local_dir), stdin=subprocess.DEVNULL,
+                               capture_output=True, timeout=MOUNT_TIMEOUT)
+            if not state["wanted"] or self._stop.is_set():
+                break
+            state["restarts"] += 1
+            if state["restart"]:
+                state["restart"] = False
+                state["failures"] = 0
+                state["next_start"] = 0
+                state["status"] = "restarting"
+                continue
+            state["failures"] = 1 if up >= SUPERVISOR_STABLE else state["failures"] + 1
+            delay = min(REMOUNT_BACKOFF * 2 ** (state["failures"] - 1), REMOUNT_BACKOFF_MAX)
+            state["next_start"] = time.monotonic() + delay
+            state["status"] = f"restarting in {delay:.0f}s"
+            self.log(f"[{name}] sshfs on {local_dir} exited with status {returncode}; restarting in {delay:.0f}s")
+        state["status"] = "stopped"
+
+    def _run_once(self, state):
+        """Run sshfs -f for an instance until it exits; returns its exit status"""
+        name, config, local_dir = state["name"], state["config"], state["local_dir"]
+        try:
+            os.makedirs(local_dir, exist_ok=True)
+        except OSError as e:
+            state["error"] = str(e)
+            return None
+        password = config.get("auth_method") == "password"
+        state["status"] = "starting"
+        process = subprocess.Popen(build_sshfs_command(config, (), local_dir) + ["-f"],
+                                   stdin=subprocess.PIPE if password else subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                   start_new_session=True)
+        state["process"], state["pid"] = process, process.pid
+        if password:
+            try:
+                process.stdin.write(session_credentials.password(config) + "\n")
+                process.stdin.close()
+            except OSError:
+                pass
+
+        def forward():
+            for line in process.stdout:
+                line = line.rstrip()
+                if line:
+                    state["error"] = line
+                    self.log(f"[{name}] {line}")
+
+        threading.Thread(target=forward, daemon=True).start()
+        deadline = time.monotonic() + self.timeout
+        while process.poll() is None and local_dir not in read_mount_table():
+            if time.monotonic() > deadline:
+                state["error"] = "mount timed out"
+                kill_process_group(process)
+                break
+            time.sleep(0.2)
+        else:
+            if process.poll() is None:
+                state["status"] = "mounted"
+                state["since"] = time.monotonic()
+                state["error"] = ""
+                self.log(f"[{name}] mounted on {local_dir}")
+        returncode = process.wait()
+        state["process"], state["pid"] = None, None
+        return returncode
+
+
+def _systemd_quote(args):
+    """Quote a command line for Exec*=, escaping systemd's % and $ specifiers"""
+    return " ".join(shlex.quote(str(arg)).replace("%", "%%").replace("$", "$$") for arg in args)
+
+
+def systemd_unit_name(config, suffix=""):
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", config.get("name", "")).strip("-") or "profile"
+    return f"{SYSTEMD_PREFIX}{slug}{suffix}.service"
+
+
+def systemd_mount_units(config):
+    """(file name, text) of systemd --user services that keep a profile mounted
+
+    One service per sshfs instance, each running sshfs in the foreground so
+    systemd sees it exit and restarts it. RestartSteps/RestartMaxDelaySec
+    (systemd 254+) back off exponentially; older versions ignore them.
+    """
+    sshfs = shutil.which("sshfs") or "/usr/bin/sshfs"
+    local_dirs = [mount_key(config.get("local_dir", ""))] + stripe_dirs(config)
+    units = []
+    for index, local_dir in enumerate(local_dirs):
+        cmd = build_sshfs_command(config, (), local_dir) + ["-f"]
+        cmd[0] = sshfs
+        fusermount = unmount_commands(local_dir)[0][0]
+        fusermount = shutil.which(fusermount) or fusermount
+        units.append((systemd_unit_name(config, f"-stripe{index}" if index else ""), "\n".join([
+            f"# Generated by sshfs-gui from profile {config.get('name', '')!r}; regenerate instead of editing",
+            "[Unit]",
+            f"Description=SSHFS mount of {config.get('username', '')}@{config.get('server', '')} "
+            f"on {local_dir}".replace("%", "%%"),
+            "StartLimitIntervalSec=0",
+            "",
+            "[Service]",
+            "Type=simple",
+            f"ExecStartPre=/bin/mkdir -p {_systemd_quote([local_dir])}",
+            # Clear a stale mount left behind by a crash
+            f"ExecStartPre=-{_systemd_quote([fusermount, '-uz', local_dir])}",
+            f"ExecStart={_systemd_quote(cmd)}",
+            f"ExecStop={_systemd_quote([fusermount, '-u', local_dir])}",
+            "Restart=always",
+            f"RestartSec={REMOUNT_BACKOFF}",
+            "RestartSteps=6",
+            f"RestartMaxDelaySec={REMOUNT_BACKOFF_MAX}",
+            "",
+            "[Install]",
+            "WantedBy=default.target",
+            "",
+        ])))
+    return units
+
+
+def systemd_supervisor_unit(query=()):
+    """(file name, text) of a systemd --user service running the supervisor"""
+    cmd = [sys.executable, os.path.abspath(__file__), "supervise", *query]
+    return (f"{SYSTEMD_PREFIX}supervisor.service", "\n".join([
+        "# Generated by sshfs-gui; regenerate instead of editing",
+        "[Unit]",
+        "Description=SSHFS GUI mount supervisor",
+        "",
+        "[Service]",
+        "Type=simple",
+        f"ExecStart={_systemd_quote(cmd)}",
+        # SIGTERM to the supervisor only; it unmounts its sshfs children itself
+        "KillMode=mixed",
+        "Restart=on-failure",
+        "",
+        "[Install]",
+        "WantedBy=default.target",
+        "",
+    ]))
+
+
+def read_proc_io(pid):
+    """I/O counters of a process from /proc/<pid>/io, or None"""
+    counters = {}
+    try:
+        with open(f"/proc/{pid}/io", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                counters[name] = int(value)
+    except (OSError, ValueError):
+        return None
+    return counters
+
+
+def fuse_waiting(device):
+    """Requests outstanding on a FUSE connection, from its major:minor device"""
+    minor = device.rpartition(":")[2]
+    try:
+        with open(f"{FUSE_CONNECTIONS}/{minor}/waiting", "r") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _prometheus_labels(labels):
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class MetricsSampler:
+    """Per-mount I/O metrics sampled into fixed-size ring buffers
+
+    Every ``interval`` seconds each sshfs mount is sampled from the sshfs
+    process's /proc/<pid>/io counters and its FUSE connection's outstanding
+    request count; rates come from the difference to the previous sample.
+    The ssh round-trip time is measured every ``rtt_interval`` seconds by
+    running `true` over the host's shared connection, when one is open, so
+    the probe never costs a new handshake. The newest counters can be
+    rendered as Prometheus text, written to ``textfile`` after each round
+    and served over HTTP with serve_metrics().
+    """
+
+    def __init__(self, registry, pool=None, interval=METRICS_INTERVAL, history=METRICS_HISTORY,
+                 rtt_interval=METRICS_RTT_INTERVAL, textfile=None, on_sample=None):
+        self.registry = registry
+        self.pool = pool or ControlMasterPool()
+        self.interval = interval
+        self.history = history
+        self.rtt_interval = rtt_interval
+        self.textfile = Path(textfile) if textfile else None
+        self.on_sample = on_sample or (lambda latest: None)
+        self.series = {}
+        self._state = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sshfs-metrics", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            self.sample()
+            if self._stop.wait(self.interval):
+                return
+
+    def sample(self):
+        """Take one sample of every mount and return the newest sample per mount"""
+        now = time.monotonic()
+        mounts = self.registry.snapshot()
+        with self._lock:
+            for gone in set(self._state) - set(mounts):
+                del self._state[gone]
+                self.series.pop(gone, None)
+            for key, entry in mounts.items():
+                self._sample_mount(key, entry, now)
+            latest = {key: series[-1] for key, series in self.series.items() if series}
+        if self.textfile is not None:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                print(f"Cannot write metrics to {self.textfile}: {e}")
+        self.on_sample(latest)
+        return latest
+
+    def _sample_mount(self, key, entry, now):
+        state = self._state.get(key)
+        if state is None or state["pid"] != entry.get("pid"):
+            state = self._state[key] = {"pid": entry.get("pid"), "io": None, "time": None,
+                                        "rtt": None, "rtt_at": 0, "rtt_probe": None}
+        io = read_proc_io(state["pid"]) if state["pid"] else None
+        sample = {"time": time.time(), "read_bps": None, "write_bps": None, "requests_ps": None,
+                  "waiting": fuse_waiting(entry.get("device", "")), "rtt": state["rtt"]}
+        if io is not None and state["io"] is not None:
+            elapsed = max(now - state["time"], 1e-6)
+            sample["read_bps"] = (io.get("rchar", 0) - state["io"].get("rchar", 0)) / elapsed
+            sample["write_bps"] = (io.get("wchar", 0) - state["io"].get("wchar", 0)) / elapsed
+            sample["requests_ps"] = (io.get("syscr", 0) - state["io"].get("syscr", 0)) / elapsed
+        state["io"], state["time"] = io, now
+        self.series.setdefault(key, deque(maxlen=self.history)).append(sample)
+
+        profile = entry.get("profile")
+        if profile and now - state["rtt_at"] >= self.rtt_interval and state["rtt_probe"] is None:
+            state["rtt_at"] = now
+            state["rtt_probe"] = threading.Thread(target=self._probe_rtt, args=(key, profile),
+                                                  name="sshfs-rtt", daemon=True)
+            state["rtt_probe"].start()
+
+    def _probe_rtt(self, key, profile):
+        rtt = None
+        path = self.pool.socket_path(self.pool.key(profile))
+        if path.exists():
+            cmd = build_ssh_command(profile, ["-o", f"ControlPath={path}", "-o", "ControlMaster=no"], "true")
+            started = time.perf_counter()
+            try:
+                if subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL, timeout=HEALTH_TIMEOUT).returncode == 0:
+                    rtt = time.perf_counter() - started
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        with self._lock:
+            state = self._state.get(key)
+            if state is not None:
+                state["rtt"] = rtt
+                state["rtt_probe"] = None
+
+    def latest(self):
+        with self._lock:
+            return {key: series[-1] for key, series in self.series.items() if series}
+
+    def samples(self, local_dir):
+        """Every sample still in the ring buffer for a mount, oldest first"""
+        with self._lock:
+            return list(self.series.get(mount_key(local_dir), ()))
+
+    def prometheus(self):
+        """Render the newest counters in the Prometheus text exposition format"""
+        metrics = [
+            ("sshfs_up", "gauge", "1 while the mount is in the mount table", lambda s, l: 1),
+            ("sshfs_read_bytes_total", "counter", "Bytes read by the sshfs process (rchar)",
+             lambda s, l: (s["io"] or {}).get("rchar")),
+            ("sshfs_write_bytes_total", "counter", "Bytes written by the sshfs process (wchar)",
+             lambda s, l: (s["io"] or {}).get("wchar")),
+            ("sshfs_read_syscalls_total", "counter", "read() calls by the sshfs process, about one per request",
+             lambda s, l: (s["io"] or {}).get("syscr")),
+            ("sshfs_fuse_waiting_requests", "gauge", "Requests outstanding on the FUSE connection",
+             lambda s, l: l["waiting"]),
+            ("sshfs_ssh_rtt_seconds", "gauge", "Time to run a command over the shared ssh connection",
+             lambda s, l: l["rtt"]),
+        ]
+        mounts = self.registry.snapshot()
+        with self._lock:
+            rows = []
+            for key, series in sorted(self.series.items()):
+                entry = mounts.get(key, {})
+                profile = entry.get("profile") or {}
+                labels = {"mount": key, "source": entry.get("source", ""), "profile": profile.get("name", "")}
+                rows.append((_prometheus_labels(labels), self._state[key], series[-1]))
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for labels, state, latest in rows:
+                v = value(state, latest)
+                if v is not None:
+                    lines.append(f"{name}{labels} {v:g}" if isinstance(v, float) else f"{name}{labels} {v}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        """Atomically replace the textfile, as node_exporter's collector expects"""
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.textfile.parent, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.prometheus())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.textfile)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def serve_metrics(sampler, address):
+    """Serve sampler.prometheus() at http://address/metrics from a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = sampler.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(address, Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="sshfs-metrics-http", daemon=True).start()
+    return server
+
+
+def format_rate(value):
+    """Human-readable bytes per second"""
+    if value is None:
+        return "-"
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B/s" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB/s"
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl=LISTING_TTL, max_entries=LISTING_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored, value = item
+            if time.monotonic() - stored > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+
+def parse_ls_line(line):
+    """Parse one line of `ls -lan` output into an entry dict, or None"""
+    parts = line.split(None, 8)
+    if len(parts) < 9 or len(parts[0]) < 10:
+        return None
+    mode, size, name = parts[0], parts[4], parts[8]
+    kind = {"d": "dir", "l": "link"}.get(mode[0], "file")
+    if kind == "link":
+        name = name.partition(" -> ")[0]
+    if name in (".", ".."):
+        return None
+    return {
+        "name": name,
+        "kind": kind,
+        "mode": mode,
+        "size": int(size) if size.isdigit() else None,
+        "modified": " ".join(parts[5:8]),
+    }
+
+
+def listing_page_limit(total, shown, advance=False):
+    """How many of a listing's total entries to show: the first page, or one more page"""
+    return min(total, shown + LISTING_PAGE if advance else max(shown, LISTING_PAGE))
+
+
+class RemoteShell:
+    """A persistent non-interactive /bin/sh on a remote host
+
+    Commands are written to the shell's stdin and their output is read back
+    line by line up to a unique end marker, so one ssh session serves any
+    number of commands.
+    """
+
+    def __init__(self, config, ssh_options=()):
+        self.cmd = build_ssh_command(config, ssh_options, "/bin/sh")
+        self.env = ssh_environment(config)
+        self.process = None
+        self.last_status = None
+        self._lock = threading.Lock()
+
+    def _ensure_running(self):
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env=self.env,
+                start_new_session=True
+            )
+
+    def run_lines(self, command):
+        """Run a command, yielding its output lines as they arrive"""
+        token = f"__sshfs_gui_{os.urandom(8).hex()}__"
+        with self._lock:
+            self._ensure_running()
+            try:
+                self.process.stdin.write(f"{command}; printf '%s %s\\n' {token} \"$?\"\n")
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            for line in self.process.stdout:
+                line = line.rstrip("\n")
+                if line.startswith(token):
+                    self.last_status = int(line.split()[-1])
+                    return
+                yield line
+            error = self.process.stderr.read().strip()
+            self.close()
+            raise SSHFSError(error or "Remote shell closed unexpectedly")
+
+    def close(self):
+        process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            kill_process_group(process)
+
+
+class RemoteBrowser:
+    """Cached, paginated remote directory listings over one ssh session
+
+    Listings are streamed to on_page() in pages as `ls` produces them and
+    then cached for LISTING_TTL seconds, so revisiting a directory is
+    answered locally.
+    """
+
+    def __init__(self, config, pool=None, cache=None, page_size=LISTING_PAGE):
+        self.config = config
+        self.pool = pool
+        self.cache = cache if cache is not None else TTLCache()
+        self.page_size = page_size
+        self.host = ControlMasterPool.key(config)
+        self.shell = None
+        self._lock = threading.Lock()
+
+    def list_dir(self, op, path, on_page):
+        """List path, calling on_page(entries) per page; runs on a worker thread"""
+        cached = self.cache.get((self.host, path))
+        if cached is not None:
+            for start in range(0, len(cached), self.page_size):
+                on_page(cached[start:start + self.page_size])
+            return cached
+
+        with self._lock:
+            if self.shell is None:
+                ssh_options = self.pool.acquire(op, self.config) if self.pool else []
+                self.shell = RemoteShell(self.config, ssh_options)
+            shell = self.shell
+
+        entries, page, errors = [], [], []
+        try:
+            for line in shell.run_lines(f"LC_ALL=C ls -lan -- {shlex.quote(path)} 2>&1"):
+                op.check_cancelled()
+                entry = parse_ls_line(line)
+                if entry is None:
+                    if line and not line.startswith("total "):
+                        errors.append(line)
+                    continue
+                entries.append(entry)
+                page.append(entry)
+                if len(page) >= self.page_size:
+                    on_page(page)
+                    page = []
+        except BaseException:
+            # The shell is mid-command; start a fresh one next time
+            shell.close()
+            with self._lock:
+                self.shell = None
+            raise
+
+        if shell.last_status != 0:
+            raise SSHFSError("\n".join(errors) or f"Cannot list {path}")
+        if page:
+            on_page(page)
+        self.cache.put((self.host, path), entries)
+        return entries
+
+    def close(self):
+        with self._lock:
+            if self.shell is not None:
+                self.shell.close()
+                self.shell = None
+
+
+class ReadCache:
+    """Bounded on-disk cache of remote files read through a profile's mount
+
+    Entries are keyed by remote path, mtime and size, so a stat() of the
+    mounted file (answered from sshfs's attribute cache most of the time)
+    is enough to tell whether the local copy is still current. The newest
+    copy of each file is kept in an LRU index; the least recently used
+    files are evicted once the cache grows past ``budget_mb``.
+    """
+
+    def __init__(self, config, root=None, budget_mb=None):
+        import hashlib
+        self.config = config
+        self.mount_dir = mount_key(config.get("local_dir", ""))
+        self.remote_dir = config.get("remote_dir", "").strip() or "/"
+        name = hashlib.sha1(config.get("name", "").encode()).hexdigest()[:16]
+        self.root = Path(root) if root else READ_CACHE_DIR / name
+        mb = budget_mb if budget_mb is not None else config.get("read_cache_mb", READ_CACHE_MB)
+        self.budget = int(mb) << 20
+        self.entries = OrderedDict()
+        self.by_path = {}
+        self.total = 0
+        self.hits = self.misses = 0
+        self._fetching = {}
+        self._dirty = False
+        self._saved = time.monotonic()
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def index_file(self):
+        return self.root / "index.json"
+
+    def _load(self):
+        try:
+            with open(self.index_file, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, entry in data.get("entries", []):
+            if (self.root / key).exists():
+                self.entries[key] = entry
+                self.by_path[entry["path"]] = key
+                self.total += entry["size"]
+
+    def save(self):
+        """Write the LRU index if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "entries": list(self.entries.items())}
+            self._dirty = False
+            self._saved = time.monotonic()
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.index_file, data)
+
+    def remote_path(self, path):
+        """Map a path under the mount point to the remote path it shows"""
+        path = mount_key(path)
+        if path != self.mount_dir and not path.startswith(self.mount_dir + os.sep):
+            raise SSHFSError(f"{path} is not under {self.mount_dir}")
+        relative = os.path.relpath(path, self.mount_dir)
+        return os.path.normpath(os.path.join(self.remote_dir, relative))
+
+    @staticmethod
+    def key(remote, st):
+        import hashlib
+        return hashlib.sha1(f"{remote}\0{st.st_mtime_ns}\0{st.st_size}".encode()).hexdigest()
+
+    def get(self, path):
+        """Return a local file with the current contents of path, fetching it on a miss"""
+        remote = self.remote_path(path)
+        st = os.stat(path)
+        key = self.key(remote, st)
+        while True:
+            with self._lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+                    entry["used"] = time.time()
+                    self.hits += 1
+                    self._dirty = True
+                    break
+                waiter = self._fetching.get(key)
+                if waiter is None:
+                    self._fetching[key] = threading.Event()
+                    self.misses += 1
+            if waiter is None:
+                try:
+                    self._fetch(path, remote, key, st)
+                finally:
+                    with self._lock:
+                        self._fetching.pop(key).set()
+                break
+            # Another thread is fetching the same file
+            waiter.wait()
+        if time.monotonic() - self._saved > READ_CACHE_SAVE_INTERVAL:
+            self.save()
+        return str(self.root / key)
+
+    def _fetch(self, path, remote, key, st):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".fetch-")
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, "rb") as f:
+                shutil.copyfileobj(f, out, 1 << 20)
+            after = os.stat(path)
+            if (after.st_mtime_ns, after.st_size) != (st.st_mtime_ns, st.st_size):
+                raise SSHFSError(f"{remote} changed while it was being cached")
+            os.replace(tmp, self.root / key)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            stale = self.by_path.get(remote)
+            if stale is not None and stale != key:
+                self._drop(stale)
+            self.entries[key] = {"path": remote, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                 "used": time.time()}
+            self.by_path[remote] = key
+            self.total += st.st_size
+            self._dirty = True
+            self._evict()
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        if self.by_path.get(entry["path"]) == key:
+            del self.by_path[entry["path"]]
+        self.total -= entry["size"]
+        try:
+            os.remove(self.root / key)
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.total > self.budget and len(self.entries) > 1:
+            self._drop(next(iter(self.entries)))
+
+    def warm(self, op, subtrees, workers=READ_CACHE_WORKERS):
+        """Cache every file under the given mount directories in parallel
+
+        Stops queueing files once the budget is used up, so warming a
+        subtree bigger than the cache doesn't just churn it. op may be None
+        when called directly.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def files():
+            budget = self.budget
+            for subtree in subtrees:
+                for dirpath, dirnames, filenames in os.walk(subtree):
+                    for filename in filenames:
+                        path = os.path.join(dirpath, filename)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        if not stat.S_ISREG(st.st_mode):
+                            continue
+                        budget -= st.st_size
+                        if budget < 0:
+                            return
+                        yield path
+
+        stats = {"files": 0, "fetched": 0, "bytes": 0, "errors": 0}
+        hits = self.hits
+        started = time.perf_counter()
+
+        def warm_one(path):
+            if op is not None:
+                op.check_cancelled()
+            try:
+                cached = self.get(path)
+            except (OSError, SSHFSError):
+                return path, None
+            return path, os.path.getsize(cached)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sshfs-cache") as pool:
+            for path, size in pool.map(warm_one, files()):
+                if size is None:
+                    stats["errors"] += 1
+                    continue
+                stats["files"] += 1
+                stats["bytes"] += size
+                if op is not None and stats["files"] % 100 == 0:
+                    op.report(f"Cache warm: {stats['files']} files, {stats['bytes'] / (1 << 20):.1f} MB")
+        stats["fetched"] = stats["files"] - (self.hits - hits)
+        stats["seconds"] = time.perf_counter() - started
+        self.save()
+        return stats
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "bytes": self.total, "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            for key in list(self.entries):
+                self._drop(key)
+            self._dirty = True
+        self.save()
+
+
+def _sftp_quote(path):
+    return '"' + path.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class Transfer:
+    """Parallel bulk copy of a directory tree to or from a profile's host
+
+    Bypasses the FUSE mount: files go over a pool of concurrent sftp (or
+    rsync) sessions. Small files are grouped into batches that one session
+    works through back to back, so they cost no connection setup and no
+    per-operation FUSE round trips; large files get a batch of their own.
+    Finished files are recorded in a manifest under TRANSFER_DIR, so
+    running the same transfer again resumes where it stopped and skips
+    files that haven't changed since.
+    """
+
+    def __init__(self, config, direction, source, destination, workers=TRANSFER_WORKERS,
+                 pool=None, use_rsync=False, fresh=False):
+        import hashlib
+        if direction not in ("upload", "download"):
+            raise ValueError(f"Unknown transfer direction {direction!r}")
+        self.config = config
+        self.direction = direction
+        remote_dir = config.get("remote_dir", "").strip() or "/"
+        if direction == "upload":
+            self.source = mount_key(source)
+            self.destination = os.path.normpath(os.path.join(remote_dir, destination))
+        else:
+            self.source = os.path.normpath(os.path.join(remote_dir, source))
+            self.destination = mount_key(destination)
+        self.workers = max(1, workers)
+        self.pool = pool
+        self.use_rsync = use_rsync
+        identity = f"{ControlMasterPool.key(config)}\0{direction}\0{self.source}\0{self.destination}"
+        self.manifest_file = TRANSFER_DIR / (hashlib.sha1(identity.encode()).hexdigest()[:16] + ".json")
+        self.done = {} if fresh else self._load_manifest()
+        self.ssh_options = []
+        self.env = None
+        self.errors = []
+        self.files_total = self.files_done = self.files_skipped = 0
+        self.bytes_total = self.bytes_done = 0
+        self.started = None
+        self._samples = deque()
+        self._processes = set()
+        self._batches = queue.Queue()
+        self._cancelled = threading.Event()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_file, "r") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"profile": self.config.get("name"), "direction": self.direction,
+                    "source": self.source, "destination": self.destination, "files": dict(self.done)}
+            self._dirty = False
+        TRANSFER_DIR.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.manifest_file, data)
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                kill_process_group(process)
+
+    def progress(self):
+        """Aggregate counts, throughput over the last few seconds and ETA"""
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, self.bytes_done, self.files_done))
+            while len(self._samples) > 2 and now - self._samples[0][0] > TRANSFER_RATE_WINDOW:
+                self._samples.popleft()
+            then, bytes_then, files_then = self._samples[0]
+            elapsed = now - then
+            rate = (self.bytes_done - bytes_then) / elapsed if elapsed > 0 else 0
+            file_rate = (self.files_done - files_then) / elapsed if elapsed > 0 else 0
+            if self.bytes_total and rate > 0:
+                eta = (self.bytes_total - self.bytes_done) / rate
+            elif file_rate > 0:
+                eta = (self.files_total - self.files_done) / file_rate
+            else:
+                eta = None
+            return {"files_done": self.files_done, "files_total": self.files_total,
+                    "files_skipped": self.files_skipped, "bytes_done": self.bytes_done,
+                    "bytes_total": self.bytes_total, "rate": rate, "eta": eta,
+                    "errors": len(self.errors),
+                    "elapsed": now - self.started if self.started else 0}
+
+    def _run_command(self, op, cmd, timeout=TEST_TIMEOUT):
+        if op is not None:
+            return op.run(cmd, timeout, env=self.env)
+        return subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                              timeout=timeout, env=self.env)
+
+    def plan(self, op=None):
+        """List (relative path, size, mtime) of every file to copy"""
+        if self.direction == "upload":
+            files = []
+            for dirpath, dirnames, filenames in os.walk(self.source):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((os.path.relpath(path, self.source), st.st_size, int(st.st_mtime)))
+            return sorted(files)
+
+        # GNU find reports sizes and mtimes in one pass; elsewhere fall back to names only
+        quoted = shlex.quote(self.source)
+        listing = (f"cd {quoted} && if find . -maxdepth 0 -printf '' >/dev/null 2>&1; "
+                   f"then find . -type f -printf '%s %T@ %P\\n'; else find . -type f | sed 's|^|- - |'; fi")
+        try:
+            process = self._run_command(op, build_ssh_command(self.config, self.ssh_options, listing), 300)
+        except subprocess.TimeoutExpired:
+            raise SSHFSError(f"Timed out listing {self.source}")
+        if process.returncode != 0:
+            raise SSHFSError(process.stderr or f"Cannot list {self.source}")
+        files = []
+        for line in process.stdout.splitlines():
+            size, _, rest = line.partition(" ")
+            mtime, _, path = rest.partition(" ")
+            if path.startswith("./"):
+                path = path[2:]
+            if path:
+                files.append((path, int(size) if size.isdigit() else 0,
+                              int(float(mtime)) if mtime not in ("", "-") else 0))
+        return sorted(files)
+
+    def run(self, op=None):
+        """Run the transfer to completion; runs on a worker thread. op may be None"""
+        from concurrent.futures import ThreadPoolExecutor, wait
+
+        self.env = ssh_environment(self.config)
+        if self.config.get("auth_method") == "password" and self.env is None:
+            raise SSHFSError("No password for this profile yet; mount or test it first")
+        if self.use_rsync and not shutil.which("rsync"):
+            raise SSHFSError("rsync is not installed")
+        if self.direction == "upload" and not os.path.isdir(self.source):
+            raise SSHFSError(f"Not a directory: {self.source}")
+        if self.pool is not None and op is not None:
+            self.ssh_options = self.pool.acquire(op, self.config)
+
+        self.started = time.monotonic()
+        pending = []
+        for rel, size, mtime in self.plan(op):
+            self.files_total += 1
+            self.bytes_total += size
+            if self.done.get(rel) == [size, mtime]:
+                self.files_skipped += 1
+                self.files_done += 1
+                self.bytes_done += size
+            else:
+                pending.append((rel, size, mtime))
+        if op is not None:
+            op.report(f"Transfer: {len(pending)} of {self.files_total} file(s) to copy, "
+                      f"{self.files_skipped} already done")
+        if not pending:
+            return self.progress()
+
+        self._prepare_directories(op, pending)
+        with self._lock:
+            self._samples.append((time.monotonic(), self.bytes_done, self.files_done))
+        for batch in self._make_batches(pending):
+            self._batches.put(batch)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sshfs-transfer") as executor:
+            futures = [executor.submit(self._worker) for _ in range(min(self.workers, self._batches.qsize()))]
+            while True:
+                finished, running = wait(futures, timeout=2)
+                if op is not None and op.cancelled:
+                    self.cancel()
+                self.save_manifest()
+                if not running:
+                    break
+            for future in futures:
+                future.result()
+        self.save_manifest()
+        if self._cancelled.is_set():
+            raise OperationCancelled("Transfer")
+        return self.progress()
+
+    def _make_batches(self, files):
+        """Group small files up to TRANSFER_BATCH_FILES / _MB; large files go alone"""
+        batches, batch, batch_bytes = [], [], 0
+        for item in files:
+            size = item[1]
+            if size >= TRANSFER_LARGE_MB << 20:
+                batches.append([item])
+                continue
+            if batch and (len(batch) >= TRANSFER_BATCH_FILES or batch_bytes + size > TRANSFER_BATCH_MB << 20):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(item)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        # Large files first, so they don't end up as a long tail
+        batches.sort(key=lambda b: -sum(item[1] for item in b))
+        return batches
+
+    def _prepare_directories(self, op, files):
+        dirs = sorted({os.path.dirname(rel) for rel, _, _ in files} - {""})
+        if self.direction == "download":
+            for rel in [""] + dirs:
+                os.makedirs(os.path.join(self.destination, rel), exist_ok=True)
+            return
+        if self.use_rsync:
+            return
+        # Every parent first; "-" tells sftp to carry on if it already exists
+        needed = {self.destination}
+        for rel in dirs:
+            parts = rel.split("/")
+            needed.update(os.path.join(self.destination, *parts[:i]) for i in range(1, len(parts) + 1))
+        commands = "".join(f"-mkdir {_sftp_quote(d)}\n" for d in sorted(needed, key=lambda d: (d.count("/"), d)))
+        process = subprocess.run(build_sftp_command(self.config, self.ssh_options), input=commands,
+                                 capture_output=True, text=True, timeout=300, env=self.env)
+        if process.returncode != 0:
+            raise SSHFSError(process.stderr or f"Cannot create directories under {self.destination}")
+
+    def _worker(self):
+        while not self._cancelled.is_set():
+            try:
+                batch = self._batches.get_nowait()
+            except queue.Empty:
+                return
+            failed, error = self._run_batch(batch)
+            if failed is None:
+                continue
+            rel = batch[failed][0]
+            with self._lock:
+                self.errors.append((rel, error))
+            # Carry on with the rest of the batch in a new session
+            if failed + 1 < len(batch) and not self._cancelled.is_set():
+                self._batches.put(batch[failed + 1:])
+
+    def _command_for(self, batch):
+        if self.use_rsync:
+            ssh = build_ssh_command(self.config, self.ssh_options)
+            remote = ssh[-1]
+            cmd = ["rsync", "-a", "--partial", "--from0", "--files-from=-", "--out-format=%n",
+                   "-e", shlex.join(ssh[:-1])]
+            if self.direction == "upload":
+                cmd += [self.source + "/", f"{remote}:{self.destination}/"]
+            else:
+                cmd += [f"{remote}:{self.source}/", self.destination + "/"]
+            return cmd, "".join(rel + "\0" for rel, _, _ in batch)
+
+        verb = "put" if self.direction == "upload" else "get"
+        lines = [f"{verb} -p {_sftp_quote(os.path.join(self.source, rel))} "
+                 f"{_sftp_quote(os.path.join(self.destination, rel))}\n" for rel, _, _ in batch]
+        return build_sftp_command(self.config, self.ssh_options), "".join(lines)
+
+    def _run_batch(self, batch):
+        """Copy one batch in one session; returns (index of the failed file, error) or (None, None)"""
+        cmd, stdin_text = self._command_for(batch)
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True, env=self.env,
+                                   start_new_session=True)
+        with self._lock:
+            self._processes.add(process)
+        errors = []
+        reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+        reader.start()
+        try:
+            try:
+                process.stdin.write(stdin_text)
+                process.stdin.close()
+            except OSError:
+                pass
+            by_name = {rel: i for i, (rel, _, _) in enumerate(batch)}
+            started = 0
+            for line in process.stdout:
+                line = line.rstrip("\n")
+                if self.use_rsync:
+                    # rsync prints each file once it has been sent
+                    index = by_name.get(line)
+                    if index is not None:
+                        self._finished(batch[index])
+                elif line.startswith("sftp> "):
+                    # sftp echoes each command as it starts, so the previous one is done
+                    if started:
+                        self._finished(batch[started - 1])
+                    started += 1
+            process.wait()
+            reader.join()
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        error = "".join(errors).strip()
+        if process.returncode == 0:
+            if not self.use_rsync and started:
+                self._finished(batch[started - 1])
+            return None, None
+        if self._cancelled.is_set():
+            return None, None
+        if self.use_rsync:
+            # rsync carries on past bad files; retrying the batch skips finished ones
+            with self._lock:
+                missing = [i for i, item in enumerate(batch) if self.done.get(item[0]) != list(item[1:])]
+            return (missing[0] if missing else len(batch) - 1), error or f"rsync exited with {process.returncode}"
+        return max(started - 1, 0), error or f"sftp exited with {process.returncode}"
+
+    def _finished(self, item):
+        rel, size, mtime = item
+        with self._lock:
+            if self.done.get(rel) == [size, mtime]:
+                return
+            self.done[rel] = [size, mtime]
+            self.files_done += 1
+            self.bytes_done += size
+            self._dirty = True
+
+
+def format_duration(seconds):
+    """Format seconds as H:MM:SS or M:SS"""
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def format_transfer_progress(progress):
+    """One-line transfer status: counts, throughput and ETA"""
+    total_mb = progress["bytes_total"] / (1 << 20)
+    text = (f"{progress['files_done']}/{progress['files_total']} files, "
+            f"{progress['bytes_done'] / (1 << 20):.1f}/{total_mb:.1f} MB, "
+            f"{format_rate(progress['rate'])}, ETA {format_duration(progress['eta'])}")
+    if progress["errors"]:
+        text += f", {progress['errors']} error(s)"
+    return text
+
+
+async def probe_host(config, timeout=PROBE_TIMEOUT, check_auth=False):
+    """Probe one profile: DNS, TCP connect, SSH banner and optionally authentication
+
+    Returns a result dict with per-phase latencies in milliseconds.
+    """
+    import asyncio
+    import socket
+
+    host = config.get("server", "").strip()
+    port = int(config.get("port", "").strip() or 22)
+    result = {"name": config.get("name", ""), "host": f"{host}:{port}", "status": "ok",
+              "dns_ms": None, "connect_ms": None, "banner_ms": None, "auth_ms": None,
+              "banner": "", "error": ""}
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        addresses = await asyncio.wait_for(
+            loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), timeout)
+        result["dns_ms"] = (time.perf_counter() - started) * 1000
+        family, _, _, _, address = addresses[0]
+
+        started = time.perf_counter()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(address[0], address[1], family=family), timeout)
+        result["connect_ms"] = (time.perf_counter() - started) * 1000
+        try:
+            # Servers may send other lines before the identification string
+            for _ in range(5):
+                line = await asyncio.wait_for(reader.readline(), timeout)
+                if not line or line.startswith(b"SSH-"):
+                    break
+            result["banner_ms"] = (time.perf_counter() - started) * 1000
+            result["banner"] = line.decode("ascii", "replace").strip()
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        if not result["banner"].startswith("SSH-"):
+            result["status"] = "no ssh banner"
+            return result
+    except socket.gaierror as e:
+        result.update(status="unresolvable", error=e.strerror or str(e))
+        return result
+    except asyncio.TimeoutError:
+        result["status"] = "timeout"
+        return result
+    except ConnectionRefusedError:
+        result["status"] = "refused"
+        return result
+    except OSError as e:
+        result.update(status="unreachable", error=e.strerror or str(e))
+        return result
+
+    if check_auth:
+        env = ssh_environment(config)
+        if config.get("auth_method") == "password" and env is None:
+            result["status"] = "ok (password; auth not checked)"
+            return result
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *build_test_command(config), stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE, env=env,
+            start_new_session=True)
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), PROBE_AUTH_TIMEOUT)
+        except asyncio.TimeoutError:
+            kill_process_group(process)
+            await process.wait()
+            result["status"] = "auth timeout"
+            return result
+        except asyncio.CancelledError:
+            kill_process_group(process)
+            raise
+        result["auth_ms"] = (time.perf_counter() - started) * 1000
+        if process.returncode != 0:
+            lines = stderr.decode(errors="replace").strip().splitlines()
+            result.update(status="auth failed", error=lines[-1] if lines else "")
+    return result
+
+
+def probe_fleet(op, profiles, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT,
+                check_auth=False, on_result=None):
+    """Probe many profiles concurrently on a private event loop; runs on a worker thread
+
+    At most ``concurrency`` hosts are probed at once. on_result(result) is
+    called from the worker thread as each host finishes. op may be None.
+    """
+    import asyncio
+
+    on_result = on_result or (lambda result: None)
+
+    async def probe_one(semaphore, config):
+        async with semaphore:
+            try:
+                result = await probe_host(config, timeout, check_auth)
+            except Exception as e:
+                result = {"name": config.get("name", ""), "host": config.get("server", ""),
+                          "status": "error", "error": str(e), "dns_ms": None, "connect_ms": None,
+                          "banner_ms": None, "auth_ms": None, "banner": ""}
+        on_result(result)
+        return result
+
+    async def main():
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        task = asyncio.ensure_future(asyncio.gather(*(probe_one(semaphore, c) for c in profiles)))
+        while not task.done():
+            await asyncio.wait({task}, timeout=0.2)
+            if op is not None and op.cancelled:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise OperationCancelled(op.name)
+        return task.result()
+
+    return asyncio.run(main())
+
+
+def probe_latency(result):
+    """Total latency to a usable SSH banner (or auth), for sorting"""
+    return result["auth_ms"] if result["auth_ms"] is not None else result["banner_ms"]
+
+
+def format_ms(value):
+    return f"{value:.0f}" if value is not None else "-"
+
 
 class SSHFSGui:
     def __init__(self, root):
         self.root = root
         self.root.title("SSHFS GUI - Advanced")
-        self.root.geometry("600x850")
+        self.root.geometry("650x950")
         
-        # Configuration file for saving recent servers
-        self.config_file = Path.home() / ".sshfs_gui_config.json"
-        self.recent_servers = self.load_recent_servers()
+        # Saved server profiles
+        self.config_file = CONFIG_FILE
+        self.store = ProfileStore(self.config_file)
+        self.visible_profiles = []
+        self.profile_filter_job = None
         
         # Variables
         self.auth_method = tk.StringVar(value="password")
@@ -27,8 +4071,55 @@ class SSHFSGui:
         self.mount_on_startup = tk.BooleanVar()
         self.auto_reconnect = tk.BooleanVar()
         self.allow_other = tk.BooleanVar()
+        self.tuning_profile = tk.StringVar(value=DEFAULT_TUNING)
+        self.connections = tk.IntVar(value=1)
+        self.read_cache_mb = tk.IntVar(value=0)
+        self.idle_minutes = tk.IntVar(value=0)
+        self.read_caches = {}
+        self.tuning_summary = tk.StringVar()
+        self.status_text = tk.StringVar(value="Idle")
+        self.log_level = tk.StringVar(value="INFO")
+        self.log_source = tk.StringVar(value=ALL_SOURCES)
+        self.batch_concurrency = tk.IntVar(value=BATCH_CONCURRENCY)
+        self.batch = None
+        self.listing_cache = TTLCache()
+        
+        # Background operations report back through the engine's event queue
+        self.engine = OperationEngine()
+        self.pool = ControlMasterPool()
+        self.logs = LogPipeline()
+        self.engine.logs = self.logs
+        self.engine.on_progress = lambda op, message: self.log_message(message, source=op.source)
+        self.monitor = HealthMonitor(self.engine, self.pool, on_status=self.on_mount_status)
+        self.registry = MountRegistry(
+            profiles=self.store.all,
+            on_change=lambda added, removed: self.engine.post(self.on_mounts_changed, added, removed)
+        )
+        self.metrics = MetricsSampler(self.registry, self.pool, textfile=METRICS_FILE,
+                                      on_sample=lambda latest: self.engine.post(self.on_metrics, latest))
+        # Mounts a running supervisor owns, by local directory; it restarts them itself
+        self.supervised = {}
+        self.supervisor_pid = None
+        self.closing = threading.Event()
+        self.idle = IdleManager(self.engine, self.registry,
+                                lambda: [p for p in self.store.all()
+                                         if mount_key(p.get("local_dir", "")) not in self.supervised],
+                                pool=self.pool, health=self.monitor,
+                                on_event=lambda message, level, source: self.log_message(message, level, source))
         
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(EVENT_POLL_MS, self.process_events)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+        self.registry.refresh()
+        self.registry.start()
+        self.monitor.start()
+        self.metrics.start()
+        self.idle.start()
+        threading.Thread(target=self.poll_supervisor, name="sshfs-supervisor-poll", daemon=True).start()
+        
+        if startup_profiles(self.store.all()):
+            self.root.after(0, self.mount_startup_profiles, True)
         
     def setup_gui(self):
         # Main frame with padding
@@ -121,6 +4212,8 @@ class SSHFSGui:
         self.remote_dir_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 5))
         self.remote_dir_entry.insert(0, "/")
         
+        ttk.Button(dir_frame, text="Browse", command=self.browse_remote_dir).grid(row=0, column=2, sticky=tk.W)
+        
         # Local directory
         ttk.Label(dir_frame, text="Local Directory:").grid(row=1, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
         self.local_dir_entry = ttk.Entry(dir_frame, width=40)
@@ -145,25 +4238,95 @@ class SSHFSGui:
         self.options_entry = ttk.Entry(advanced_frame, width=40)
         self.options_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(0, 5), pady=(10, 0))
         
+        # Performance tuning profile
+        ttk.Label(advanced_frame, text="Tuning:").grid(row=2, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        tuning_combo = ttk.Combobox(advanced_frame, textvariable=self.tuning_profile,
+                                    values=list(TUNING_PROFILES), state="readonly", width=25)
+        tuning_combo.grid(row=2, column=1, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        tuning_combo.bind("<<ComboboxSelected>>", self.on_tuning_change)
+        ttk.Label(advanced_frame, textvariable=self.tuning_summary, foreground="gray",
+                  wraplength=450).grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(2, 0))
+        
+        # Parallel SSH connections
+        ttk.Label(advanced_frame, text="Connections:").grid(row=4, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        connections_frame = ttk.Frame(advanced_frame)
+        connections_frame.grid(row=4, column=1, sticky=tk.W, pady=(10, 0))
+        ttk.Spinbox(connections_frame, from_=1, to=MAX_CONNECTIONS, textvariable=self.connections,
+                    width=5).pack(side=tk.LEFT)
+        mode = "sshfs max_conns" if supports_max_conns() else "one sshfs instance per connection"
+        ttk.Label(connections_frame, text=f"({mode})", foreground="gray").pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Local read cache
+        ttk.Label(advanced_frame, text="Read cache (MB):").grid(row=5, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        cache_frame = ttk.Frame(advanced_frame)
+        cache_frame.grid(row=5, column=1, sticky=tk.W, pady=(10, 0))
+        ttk.Spinbox(cache_frame, from_=0, to=1048576, increment=256, textvariable=self.read_cache_mb,
+                    width=8).pack(side=tk.LEFT)
+        ttk.Label(cache_frame, text="(0 = off)", foreground="gray").pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Button(cache_frame, text="Warm Cache...", command=self.warm_read_cache).pack(side=tk.LEFT)
+        
+        # Idle auto-unmount
+        ttk.Label(advanced_frame, text="Idle unmount (min):").grid(row=6, column=0, sticky=tk.W, padx=(0, 5), pady=(10, 0))
+        idle_frame = ttk.Frame(advanced_frame)
+        idle_frame.grid(row=6, column=1, sticky=tk.W, pady=(10, 0))
+        ttk.Spinbox(idle_frame, from_=0, to=1440, increment=5, textvariable=self.idle_minutes,
+                    width=8).pack(side=tk.LEFT)
+        ttk.Label(idle_frame, text="(0 = never; the first access remounts it but sees an empty folder)", foreground="gray").pack(side=tk.LEFT, padx=(5, 0))
+        
         # Checkboxes
-        ttk.Checkbutton(advanced_frame, text="Auto-reconnect", variable=self.auto_reconnect).grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
-        ttk.Checkbutton(advanced_frame, text="Mount on startup", variable=self.mount_on_startup).grid(row=2, column=1, sticky=tk.W, pady=(10, 0))
-        ttk.Checkbutton(advanced_frame, text="Allow other users (might be necessary for some applications)", variable=self.allow_other).grid(row=3, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Checkbutton(advanced_frame, text="Auto-reconnect", variable=self.auto_reconnect).grid(row=7, column=0, sticky=tk.W, pady=(10, 0))
+        ttk.Checkbutton(advanced_frame, text="Mount on startup", variable=self.mount_on_startup).grid(row=7, column=1, sticky=tk.W, pady=(10, 0))
+        ttk.Checkbutton(advanced_frame, text="Allow other users (might be necessary for some applications)", variable=self.allow_other).grid(row=8, column=0, sticky=tk.W, pady=(5, 0))
         
-        # Recent Servers Frame
-        recent_frame = ttk.LabelFrame(main_frame, text="Recent Servers", padding="10")
+        # Saved Profiles Frame
+        recent_frame = ttk.LabelFrame(main_frame, text="Saved Profiles", padding="10")
         recent_frame.grid(row=current_row, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
         recent_frame.columnconfigure(0, weight=1)
         current_row += 1
         
-        # Recent servers listbox
-        self.recent_listbox = tk.Listbox(recent_frame, height=3)
-        self.recent_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+        # Type-ahead filter
+        filter_frame = ttk.Frame(recent_frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        filter_frame.columnconfigure(1, weight=1)
+        ttk.Label(filter_frame, text="Search:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        self.profile_filter = tk.StringVar()
+        self.profile_filter.trace_add("write", self.on_profile_filter_change)
+        ttk.Entry(filter_frame, textvariable=self.profile_filter).grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.profile_count = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.profile_count).grid(row=0, column=2, sticky=tk.E, padx=(5, 0))
+        
+        # Profiles listbox, filled a chunk at a time as it is scrolled
+        self.recent_listbox = tk.Listbox(recent_frame, height=5)
+        self.recent_listbox.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
         self.recent_listbox.bind('<Double-1>', self.load_recent_server)
         
-        recent_scrollbar = ttk.Scrollbar(recent_frame, orient=tk.VERTICAL, command=self.recent_listbox.yview)
-        recent_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.recent_listbox.configure(yscrollcommand=recent_scrollbar.set)
+        self.recent_scrollbar = ttk.Scrollbar(recent_frame, orient=tk.VERTICAL, command=self.recent_listbox.yview)
+        self.recent_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.recent_listbox.configure(yscrollcommand=self.on_profile_list_scroll)
+        
+        # Profile name, group and tags
+        meta_frame = ttk.Frame(recent_frame)
+        meta_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        meta_frame.columnconfigure(1, weight=1)
+        ttk.Label(meta_frame, text="Name:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        self.profile_name_entry = ttk.Entry(meta_frame, width=20)
+        self.profile_name_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 5))
+        ttk.Label(meta_frame, text="Group:").grid(row=0, column=2, sticky=tk.W, padx=(0, 5))
+        self.group_combo = ttk.Combobox(meta_frame, width=12)
+        self.group_combo.grid(row=0, column=3, sticky=tk.W, padx=(0, 5))
+        ttk.Label(meta_frame, text="Tags:").grid(row=0, column=4, sticky=tk.W, padx=(0, 5))
+        self.tags_entry = ttk.Entry(meta_frame, width=15)
+        self.tags_entry.grid(row=0, column=5, sticky=tk.W)
+        
+        # Batch mount of every profile marked "Mount on startup"
+        batch_frame = ttk.Frame(recent_frame)
+        batch_frame.grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        ttk.Button(batch_frame, text="Mount Startup Profiles", command=self.mount_startup_profiles).grid(row=0, column=0, padx=(0, 10))
+        ttk.Label(batch_frame, text="Concurrency:").grid(row=0, column=1, sticky=tk.W, padx=(0, 5))
+        ttk.Spinbox(batch_frame, from_=1, to=64, width=5, textvariable=self.batch_concurrency).grid(row=0, column=2, sticky=tk.W, padx=(0, 10))
+        ttk.Button(batch_frame, text="Import ~/.ssh/config", command=self.import_ssh_config).grid(row=0, column=3, padx=(0, 5))
+        ttk.Button(batch_frame, text="Delete", command=self.delete_profile).grid(row=0, column=4, padx=(0, 5))
+        ttk.Button(batch_frame, text="Check Hosts...", command=lambda: FleetProbeWindow(self)).grid(row=0, column=5)
         
         # Buttons frame
         button_frame = ttk.Frame(main_frame)
@@ -173,21 +4336,69 @@ class SSHFSGui:
         ttk.Button(button_frame, text="Mount", command=self.mount_filesystem).grid(row=0, column=0, padx=(0, 5))
         ttk.Button(button_frame, text="Unmount", command=self.unmount_filesystem).grid(row=0, column=1, padx=(0, 5))
         ttk.Button(button_frame, text="Test Connection", command=self.test_connection).grid(row=0, column=2, padx=(0, 5))
-        ttk.Button(button_frame, text="Save Config", command=self.save_current_config).grid(row=0, column=3, padx=(0, 5))
+        ttk.Button(button_frame, text="Benchmark", command=self.benchmark_mount).grid(row=0, column=3, padx=(0, 5))
+        ttk.Button(button_frame, text="Save Config", command=self.save_current_config).grid(row=0, column=4, padx=(0, 5))
+        ttk.Button(button_frame, text="Transfer...", command=self.open_transfer).grid(row=0, column=5, padx=(0, 5))
+        ttk.Button(button_frame, text="Cancel", command=self.cancel_operations).grid(row=0, column=6, padx=(0, 5))
+        
+        # Active mounts with live health probe latency
+        mounts_frame = ttk.LabelFrame(main_frame, text="Active Mounts", padding="10")
+        mounts_frame.grid(row=current_row, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        mounts_frame.columnconfigure(0, weight=1)
+        current_row += 1
+        
+        self.mounts_tree = ttk.Treeview(mounts_frame, height=3, columns=(
+            "profile", "status", "latency", "read", "write", "requests", "waiting", "rtt"))
+        self.mounts_tree.heading("#0", text="Mount Point")
+        self.mounts_tree.heading("profile", text="Profile")
+        self.mounts_tree.heading("status", text="Status")
+        self.mounts_tree.heading("latency", text="Probe")
+        self.mounts_tree.heading("read", text="Read")
+        self.mounts_tree.heading("write", text="Write")
+        self.mounts_tree.heading("requests", text="Req/s")
+        self.mounts_tree.heading("waiting", text="Waiting")
+        self.mounts_tree.heading("rtt", text="RTT")
+        self.mounts_tree.column("#0", width=140)
+        self.mounts_tree.column("profile", width=90)
+        self.mounts_tree.column("status", width=90)
+        for column, width in (("latency", 50), ("read", 70), ("write", 70), ("requests", 50),
+                              ("waiting", 50), ("rtt", 50)):
+            self.mounts_tree.column(column, width=width, anchor=tk.E, stretch=False)
+        self.mounts_tree.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.mounts_tree.bind("<Double-1>", self.show_mount_metrics)
         
         # Status and Log Frame
         log_frame = ttk.LabelFrame(main_frame, text="Status & Log", padding="10")
         log_frame.grid(row=current_row, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
         log_frame.columnconfigure(0, weight=1)
-        log_frame.rowconfigure(0, weight=1)
+        log_frame.rowconfigure(1, weight=1)
         main_frame.rowconfigure(current_row, weight=1)
         
+        # Log filters
+        filter_frame = ttk.Frame(log_frame)
+        filter_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(filter_frame, text="Level:").pack(side=tk.LEFT)
+        level_combo = ttk.Combobox(filter_frame, textvariable=self.log_level, values=LOG_LEVELS,
+                                   state="readonly", width=9)
+        level_combo.pack(side=tk.LEFT, padx=(5, 10))
+        level_combo.bind("<<ComboboxSelected>>", self.refilter_log)
+        ttk.Label(filter_frame, text="Mount:").pack(side=tk.LEFT)
+        self.log_source_combo = ttk.Combobox(filter_frame, textvariable=self.log_source, state="readonly", width=20,
+                                             postcommand=self.update_log_sources)
+        self.log_source_combo.pack(side=tk.LEFT, padx=(5, 10))
+        self.log_source_combo.bind("<<ComboboxSelected>>", self.refilter_log)
+        ttk.Button(filter_frame, text="Timings...", command=lambda: TraceWindow(self)).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(filter_frame, text=f"Full log: {LOG_FILE}", foreground="gray").pack(side=tk.LEFT)
+        
         # Log text area
         self.log_text = scrolledtext.ScrolledText(log_frame, height=8, width=70)
-        self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.log_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        ttk.Label(log_frame, textvariable=self.status_text).grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
         
         # Initialize GUI state
         self.on_auth_method_change()
+        self.on_tuning_change()
         self.populate_recent_servers()
         self.log_message("SSHFS GUI initialized successfully")
         
@@ -206,6 +4417,11 @@ class SSHFSGui:
             for widget in self.key_frame.winfo_children():
                 widget.configure(state="normal")
     
+    def on_tuning_change(self, event=None):
+        """Show the options the selected tuning profile adds"""
+        options = tuning_options(self.tuning_profile.get())
+        self.tuning_summary.set(" ".join(f"-o {opt}" for opt in options) or "No extra options")
+    
     def toggle_password_visibility(self):
         """Toggle password visibility"""
         if self.show_password.get():
@@ -231,13 +4447,61 @@ class SSHFSGui:
             self.local_dir_entry.delete(0, tk.END)
             self.local_dir_entry.insert(0, dirname)
     
-    def log_message(self, message):
-        """Add message to log"""
-        print(message)
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+    def browse_remote_dir(self):
+        """Pick the remote directory from a live listing of the server"""
+        config = self.get_current_config()
+        if not config["server"].strip() or not config["username"].strip():
+            messagebox.showerror("Error", "Server and username are required for browsing")
+            return
+        RemoteDirectoryDialog(self, config)
+    
+    def log_message(self, message, level="INFO", source=APP_SOURCE):
+        """Add message to log; the pane picks it up on the next flush"""
+        if level != "DEBUG":
+            print(message)
+        self.logs.emit(message, level, source)
+    
+    def flush_log(self):
+        """Append records logged since the last frame in one widget update"""
+        level, source = self.log_level.get(), self.log_source.get()
+        records = [r for r in self.logs.drain() if LogPipeline.matches(r, level, source)]
+        if records:
+            self.append_log(records)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+    
+    def append_log(self, records):
+        """Insert records, trim the pane to LOG_VIEW_LINES and follow the tail"""
+        records = records[-LOG_VIEW_LINES:]
+        at_end = self.log_text.yview()[1] >= 0.999
+        self.log_text.insert(tk.END, "".join(LogPipeline.format(r) + "\n" for r in records))
+        lines = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if lines > LOG_VIEW_LINES:
+            self.log_text.delete("1.0", f"{lines - LOG_VIEW_LINES + 1}.0")
+        if at_end:
+            self.log_text.see(tk.END)
     
+    def refilter_log(self, event=None):
+        """Redraw the pane from the ring buffer with the current filters"""
+        level, source = self.log_level.get(), self.log_source.get()
+        self.logs.drain()
+        self.log_text.delete("1.0", tk.END)
+        records = [r for r in self.logs.snapshot() if LogPipeline.matches(r, level, source)]
+        if records:
+            self.append_log(records)
+    
+    def update_log_sources(self):
+        """Offer every mount that has logged something in the Mount filter"""
+        self.log_source_combo["values"] = [ALL_SOURCES] + self.logs.sources_snapshot()
+    
+    def mount_source(self, local_dir):
+        """Log source name for a mount point: its profile name when known"""
+        profile = (self.registry.get(local_dir) or {}).get("profile")
+        if profile and profile.get("name"):
+            return profile["name"]
+        config = self.get_current_config()
+        return config["name"] if mount_key(config["local_dir"].strip()) == mount_key(local_dir) else local_dir
+    
+    @traced("validate")
     def validate_inputs(self):
         """Validate user inputs"""
         if not self.server_entry.get().strip():
@@ -252,7 +4516,8 @@ class SSHFSGui:
             messagebox.showerror("Error", "Local directory is required")
             return False
         
-        if self.auth_method.get() == "password" and not self.password_entry.get():
+        # A password typed earlier this session for the same host is reused
+        if self.auth_method.get() == "password" and not session_credentials.password(self.get_current_config()):
             messagebox.showerror("Error", "Password is required for password authentication")
             return False
         
@@ -277,230 +4542,475 @@ class SSHFSGui:
         
         return True
     
+    def get_current_config(self):
+        """Snapshot the form into a configuration dict
+
+        Workers get this snapshot instead of reading Tk widgets themselves.
+        """
+        return {
+            "name": self.profile_name_entry.get().strip() or f"{self.username_entry.get()}@{self.server_entry.get()}",
+            "group": self.group_combo.get().strip(),
+            "tags": [t for t in re.split(r"[,\s]+", self.tags_entry.get()) if t],
+            "server": self.server_entry.get(),
+            "port": self.port_entry.get(),
+            "username": self.username_entry.get(),
+            "auth_method": self.auth_method.get(),
+            "password": self.password_entry.get(),
+            "key_file": self.key_entry.get(),
+            "remote_dir": self.remote_dir_entry.get(),
+            "local_dir": self.local_dir_entry.get(),
+            "additional_options": self.options_entry.get(),
+            "tuning_profile": self.tuning_profile.get(),
+            "connections": self.get_connections(),
+            "read_cache_mb": self.get_read_cache_mb(),
+            "idle_minutes": self.get_idle_minutes(),
+            "allow_other": self.allow_other.get(),
+            "mount_on_startup": self.mount_on_startup.get(),
+            "auto_reconnect": self.auto_reconnect.get()
+        }
+    
+    def get_connections(self):
+        try:
+            return profile_connections({"connections": self.connections.get()})
+        except (tk.TclError, ValueError):
+            return 1
+    
+    def get_read_cache_mb(self):
+        try:
+            return max(self.read_cache_mb.get(), 0)
+        except (tk.TclError, ValueError):
+            return 0
+    
+    def get_idle_minutes(self):
+        try:
+            return profile_idle_minutes({"idle_minutes": self.idle_minutes.get()})
+        except (tk.TclError, ValueError):
+            return 0
+    
     def build_sshfs_command(self):
         """Build the SSHFS command"""
-        server = self.server_entry.get().strip()
-        port = self.port_entry.get().strip() or "22"
-        username = self.username_entry.get().strip()
-        remote_dir = self.remote_dir_entry.get().strip() or "/"
-        local_dir = self.local_dir_entry.get().strip()
-        
-        # Base command
-        remote_path = f"{username}@{server}:{remote_dir}"
-        cmd = ["sshfs", remote_path, local_dir]
-        
-        # Add port
-        cmd.extend(["-p", port])
+        return build_sshfs_command(self.get_current_config())
+    
+    def process_events(self):
+        """Drain worker callbacks on the Tk thread"""
+        # Reschedule first, so nothing raised below can stop the pump
+        self.root.after(EVENT_POLL_MS, self.process_events)
+        self.engine.dispatch()
+        active = self.engine.active_count()
+        self.pool.prune()
+        stats = self.pool.stats()
+        self.status_text.set(
+            (f"{active} operation(s) running" if active else "Idle")
+            + f" | {stats['connections']} shared connection(s), {stats['saved']} handshake(s) saved"
+        )
+    
+    def on_mount_status(self, local_dir, info):
+        """Show a health monitor update in the Active Mounts table"""
+        latency = info["latency"]
+        name = f"{info['name']} (supervised)" if local_dir in self.supervised else info["name"]
+        values = (name, info["status"], f"{latency * 1000:.0f} ms" if latency is not None else "")
+        if info["status"] == "unmounted":
+            if self.mounts_tree.exists(local_dir):
+                self.mounts_tree.delete(local_dir)
+            self.log_message(f"{local_dir} is no longer mounted", source=info["name"] or APP_SOURCE)
+            return
         
-        # Add authentication options
-        if self.auth_method.get() == "key":
-            key_file = self.key_entry.get().strip()
-            cmd.extend(["-o", f"IdentityFile={key_file}"])
-            cmd.extend(["-o", "PasswordAuthentication=no"])
+        previous = self.mounts_tree.set(local_dir, "status") if self.mounts_tree.exists(local_dir) else None
+        if previous is None:
+            self.mounts_tree.insert("", tk.END, iid=local_dir, text=local_dir, values=values)
+        else:
+            for column, value in zip(("profile", "status", "latency"), values):
+                self.mounts_tree.set(local_dir, column, value)
+        if previous not in (None, info["status"]) and info["status"] != "ok":
+            self.log_message(f"{local_dir}: {info['status']}", level="WARNING", source=info["name"] or APP_SOURCE)
+    
+    def on_mounts_changed(self, added, removed):
+        """Apply mount table changes to the Active Mounts table"""
+        for mount_point, entry in added.items():
+            if entry.get("profile"):
+                self.watch_mount(entry["profile"])
+            elif not self.mounts_tree.exists(mount_point):
+                # Mounted outside the app; show it but don't manage it
+                pid = f" (pid {entry['pid']})" if entry.get("pid") else ""
+                self.mounts_tree.insert("", tk.END, iid=mount_point, text=mount_point,
+                                        values=(entry["source"], "mounted" + pid, ""))
+        for mount_point in removed:
+            self.unwatch_mount(mount_point)
+    
+    def on_metrics(self, latest):
+        """Show the newest metrics sample of each mount in the Active Mounts table"""
+        for local_dir, sample in latest.items():
+            if not self.mounts_tree.exists(local_dir):
+                continue
+            self.mounts_tree.set(local_dir, "read", format_rate(sample["read_bps"]))
+            self.mounts_tree.set(local_dir, "write", format_rate(sample["write_bps"]))
+            self.mounts_tree.set(local_dir, "requests",
+                                 f"{sample['requests_ps']:.0f}" if sample["requests_ps"] is not None else "")
+            self.mounts_tree.set(local_dir, "waiting", sample["waiting"] if sample["waiting"] is not None else "")
+            self.mounts_tree.set(local_dir, "rtt", f"{sample['rtt'] * 1000:.0f} ms" if sample["rtt"] is not None else "")
+    
+    def show_mount_metrics(self, event=None):
+        """Open a throughput history graph for the selected mount"""
+        selection = self.mounts_tree.selection()
+        if selection:
+            MetricsWindow(self, selection[0])
+    
+    def watch_mount(self, config):
+        """Start health monitoring for a mounted profile"""
+        if mount_key(config.get("local_dir", "")) in self.supervised:
+            # Report its health, but leave remounting to the supervisor
+            config = dict(config, auto_reconnect=False)
+        self.monitor.watch(config)
+    
+    def poll_supervisor(self):
+        """Ask a running mount supervisor for its mounts every few seconds; runs on its own thread"""
+        while not self.closing.is_set():
+            try:
+                self.engine.post(self.on_supervisor_status, supervisor_request("status"))
+            except SSHFSError:
+                pass  # Busy; keep what we know until the next round
+            self.closing.wait(SUPERVISOR_POLL)
+    
+    def on_supervisor_status(self, status):
+        """Track the mounts a running supervisor owns and log their state changes"""
+        pid = status["pid"] if status else None
+        if pid != self.supervisor_pid:
+            if pid:
+                self.log_message(f"Connected to the mount supervisor (pid {pid}, "
+                                 f"{len(status['mounts'])} mount(s))")
+            else:
+                self.log_message("The mount supervisor has stopped", level="WARNING")
+            self.supervisor_pid = pid
+        mounts = {m["local_dir"]: m for m in status["mounts"]} if status else {}
+        previous, self.supervised = self.supervised, mounts
+        for local_dir, info in mounts.items():
+            old = previous.get(local_dir)
+            if old is None:
+                profile = self.store.get(info["profile"])
+                if profile and self.registry.is_mounted(local_dir):
+                    self.watch_mount(profile)
+            elif old["status"] != info["status"]:
+                level = "INFO" if info["status"] == "mounted" else "WARNING"
+                self.log_message(f"{local_dir}: {info['status']} (supervisor)", level=level, source=info["profile"])
+    
+    def unwatch_mount(self, local_dir):
+        local_dir = mount_key(local_dir)
+        self.monitor.unwatch(local_dir)
+        if self.mounts_tree.exists(local_dir):
+            self.mounts_tree.delete(local_dir)
+    
+    def mount_startup_profiles(self, automatic=False):
+        """Mount every saved profile marked 'Mount on startup' concurrently"""
+        if automatic:
+            try:
+                status = supervisor_request("status", timeout=1)
+            except SSHFSError:
+                status = {}  # Listening, just busy
+            if status is not None:
+                pid = f" (pid {status['pid']})" if status.get("pid") else ""
+                self.log_message(f"Leaving startup profiles to the mount supervisor{pid}")
+                return
+        if self.batch is not None and not self.batch.done:
+            self.log_message("A batch mount is already running")
+            return
         
-        # Add common options
-        cmd.extend(["-o", "reconnect"])
-        cmd.extend(["-o", "ServerAliveInterval=15"])
-        cmd.extend(["-o", "ServerAliveCountMax=3"])
+        profiles = startup_profiles(self.store.all())
+        if not profiles:
+            self.log_message("No saved profiles are marked 'Mount on startup'")
+            return
         
-        # Add allow_other option if selected
-        if self.allow_other.get():
-            cmd.extend(["-o", "allow_other"])
+        try:
+            concurrency = max(1, int(self.batch_concurrency.get()))
+        except (tk.TclError, ValueError):
+            concurrency = BATCH_CONCURRENCY
         
-        # Add additional options
-        additional_opts = self.options_entry.get().strip()
-        if additional_opts:
-            for opt in additional_opts.split():
-                cmd.extend(["-o", opt])
+        def on_complete(batch):
+            self.log_message("Batch mount finished:\n" + batch.summary())
+            mounted = {r["name"] for r in batch.results if r["status"] in ("mounted", "already mounted")}
+            for config in batch.profiles:
+                if config.get("name") in mounted:
+                    self.watch_mount(config)
         
-        return cmd
+        self.log_message(f"Mounting {len(profiles)} startup profile(s), {concurrency} at a time...")
+        self.batch = BatchMount(profiles, concurrency=concurrency, events=self.engine.events,
+                                on_progress=lambda op, message: self.log_message(message, source=op.source),
+                                on_complete=on_complete, pool=self.pool, logs=self.logs).start()
+    
+    def cancel_operations(self):
+        """Cancel all running background operations"""
+        count = self.engine.cancel_all()
+        if self.batch is not None and not self.batch.done:
+            count += self.batch.engine.cancel_all()
+        if count:
+            self.log_message(f"Cancelling {count} operation(s)...")
     
+    def on_close(self):
+        """Stop background work and close the window"""
+        self.registry.stop()
+        self.monitor.stop()
+        self.metrics.stop()
+        self.idle.stop()
+        self.closing.set()
+        if self.batch is not None:
+            self.batch.engine.shutdown()
+        self.engine.shutdown()
+        self.logs.close()
+        self.root.destroy()
+    
+    @traced("ui.mount")
     def mount_filesystem(self):
         """Mount the SSHFS filesystem"""
         if not self.validate_inputs():
             return
         
-        try:
-            cmd = self.build_sshfs_command()
-            self.log_message(f"Executing: {' '.join(cmd)}")
-            
-            # For password authentication, we need to handle password input
-            if self.auth_method.get() == "password":
-                # Use expect or similar for password input in production
-                # For now, we'll use a simple approach
-                process = subprocess.Popen(
-                    cmd,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                
-                # Send password if needed
-                try:
-                    stdout, stderr = process.communicate(
-                        input=self.password_entry.get() + "\n", 
-                        timeout=10
-                    )
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    self.log_message("Mount operation timed out")
-                    return
+        def on_done(process):
+            self.log_message("Filesystem mounted successfully!", source=config["name"])
+            self.watch_mount(config)
+            self.save_to_recent_servers()
+            messagebox.showinfo("Success", "Filesystem mounted successfully!")
+        
+        def on_error(error):
+            if isinstance(error, SSHFSError):
+                self.log_message(f"Mount failed: {error}", level="ERROR", source=config["name"])
+                messagebox.showerror("Mount Failed", f"Failed to mount filesystem:\n{error}")
+            else:
+                self.log_message(f"Error during mount: {str(error)}", level="ERROR", source=config["name"])
+                messagebox.showerror("Error", f"Error during mount: {str(error)}")
+        
+        config = self.get_current_config()
+        self.engine.submit(f"Mount {config['name']}", mount_profile, config, MOUNT_TIMEOUT, self.pool,
+                           on_done=on_done, on_error=on_error, source=config["name"])
+    
+    @traced("ui.unmount")
+    def unmount_filesystem(self):
+        """Unmount the SSHFS filesystem"""
+        local_dir = self.local_dir_entry.get().strip()
+        if not local_dir:
+            messagebox.showerror("Error", "Local directory is required for unmounting")
+            return
+        
+        def on_done(process):
+            self.log_message("Filesystem unmounted successfully!")
+            self.unwatch_mount(local_dir)
+            messagebox.showinfo("Success", "Filesystem unmounted successfully!")
+        
+        def on_error(error):
+            if isinstance(error, SSHFSError):
+                self.log_message(f"Unmount failed: {error}", level="ERROR")
+                messagebox.showerror("Unmount Failed", f"Failed to unmount filesystem:\n{error}")
             else:
-                # For key authentication
-                process = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                stdout, stderr = process.stdout, process.stderr
-            
-            if process.returncode == 0:
-                self.log_message("Filesystem mounted successfully!")
-                self.save_to_recent_servers()
-                messagebox.showinfo("Success", "Filesystem mounted successfully!")
+                self.log_message(f"Error during unmount: {str(error)}", level="ERROR")
+                messagebox.showerror("Error", f"Error during unmount: {str(error)}")
+        
+        if mount_key(local_dir) in self.supervised:
+            # Unmounting it ourselves would only make the supervisor mount it again
+            self.engine.submit(f"Unmount {local_dir}", stop_supervised, local_dir,
+                               on_done=on_done, on_error=on_error, source=self.mount_source(local_dir))
+            return
+        self.engine.submit(f"Unmount {local_dir}", unmount_path, local_dir, self.registry,
+                           on_done=on_done, on_error=on_error, source=self.mount_source(local_dir))
+    
+    @traced("ui.test")
+    def test_connection(self):
+        """Test SSH connection"""
+        if not self.server_entry.get().strip() or not self.username_entry.get().strip():
+            messagebox.showerror("Error", "Server and username are required for testing")
+            return
+        
+        def on_done(process):
+            self.log_message("Connection test successful!")
+            messagebox.showinfo("Success", "Connection test successful!")
+        
+        def on_error(error):
+            if isinstance(error, SSHFSError):
+                self.log_message(f"Connection test failed: {error}", level="ERROR", source=config["name"])
+                messagebox.showerror("Connection Failed", f"Connection test failed:\n{error}")
             else:
-                error_msg = stderr or "Unknown error occurred"
-                self.log_message(f"Mount failed: {error_msg}")
-                messagebox.showerror("Mount Failed", f"Failed to mount filesystem:\n{error_msg}")
-                
-        except Exception as e:
-            self.log_message(f"Error during mount: {str(e)}")
-            messagebox.showerror("Error", f"Error during mount: {str(e)}")
+                self.log_message(f"Error during connection test: {str(error)}", level="ERROR", source=config["name"])
+                messagebox.showerror("Error", f"Error during connection test: {str(error)}")
+        
+        config = self.get_current_config()
+        self.engine.submit(f"Test {config['name']}", test_profile, config, self.pool,
+                           on_done=on_done, on_error=on_error, source=config["name"])
     
-    def unmount_filesystem(self):
-        """Unmount the SSHFS filesystem"""
-        local_dir = self.local_dir_entry.get().strip()
-        if not local_dir:
-            messagebox.showerror("Error", "Local directory is required for unmounting")
+    def benchmark_mount(self):
+        """Benchmark the mounted local directory and compare with earlier runs"""
+        config = self.get_current_config()
+        local_dir = config["local_dir"].strip()
+        if not local_dir or not self.registry.is_mounted(local_dir):
+            messagebox.showerror("Error", "Mount the filesystem before running a benchmark")
+            return
+        
+        def on_done(results):
+            save_benchmark(config["name"], config, results)
+            self.log_message(f"Benchmark finished for {config['name']}")
+            self.show_benchmarks(config["name"])
+            if profile_connections(config) > 1:
+                self.engine.submit(f"Scaling benchmark {config['name']}", run_scaling_benchmark, config,
+                                   on_done=on_scaling_done, on_error=on_error, source=config["name"])
+        
+        def on_scaling_done(results):
+            self.log_message("Throughput by connection count:\n" + format_scaling_table(results),
+                             source=config["name"])
+        
+        def on_error(error):
+            self.log_message(f"Benchmark failed: {error}", level="ERROR", source=config["name"])
+            messagebox.showerror("Benchmark Failed", f"Benchmark failed:\n{error}")
+        
+        self.engine.submit(f"Benchmark {config['name']}", run_benchmark, local_dir,
+                           on_done=on_done, on_error=on_error, source=config["name"])
+    
+    def warm_read_cache(self):
+        """Pre-fetch a directory of the mount into the profile's read cache"""
+        config = self.get_current_config()
+        local_dir = config["local_dir"].strip()
+        if not config["read_cache_mb"]:
+            messagebox.showerror("Error", "Set a read cache size first")
+            return
+        if not local_dir or not self.registry.is_mounted(local_dir):
+            messagebox.showerror("Error", "Mount the filesystem before warming its cache")
             return
+        subtree = filedialog.askdirectory(title="Directory to cache", initialdir=local_dir)
+        if not subtree:
+            return
+        
+        cache = self.read_caches.get(config["name"])
+        if cache is None or cache.budget != config["read_cache_mb"] << 20 or cache.mount_dir != mount_key(local_dir):
+            cache = self.read_caches[config["name"]] = ReadCache(config)
+        
+        def on_done(stats):
+            self.log_message(f"Cached {stats['files']} file(s), {stats['bytes'] / (1 << 20):.1f} MB "
+                             f"({stats['fetched']} fetched) in {stats['seconds']:.1f}s", source=config["name"])
+        
+        def on_error(error):
+            self.log_message(f"Cache warm failed: {error}", level="ERROR", source=config["name"])
         
         try:
-            # Try fusermount first (Linux)
-            cmd = ["umount", local_dir]
-            process = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if process.returncode != 0:
-                # Try umount (macOS/BSD)
-                cmd = ["umount", local_dir]
-                process = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if process.returncode == 0:
-                self.log_message("Filesystem unmounted successfully!")
-                messagebox.showinfo("Success", "Filesystem unmounted successfully!")
-            else:
-                error_msg = process.stderr or "Unknown error occurred"
-                self.log_message(f"Unmount failed: {error_msg}")
-                messagebox.showerror("Unmount Failed", f"Failed to unmount filesystem:\n{error_msg}")
-                
-        except Exception as e:
-            self.log_message(f"Error during unmount: {str(e)}")
-            messagebox.showerror("Error", f"Error during unmount: {str(e)}")
+            cache.remote_path(subtree)
+        except SSHFSError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.log_message(f"Warming read cache from {subtree}...", source=config["name"])
+        self.engine.submit(f"Warm cache {config['name']}", cache.warm, [subtree],
+                           on_done=on_done, on_error=on_error, source=config["name"])
     
-    def test_connection(self):
-        """Test SSH connection"""
+    def open_transfer(self):
+        """Open the bulk transfer window for the current profile"""
         if not self.server_entry.get().strip() or not self.username_entry.get().strip():
-            messagebox.showerror("Error", "Server and username are required for testing")
+            messagebox.showerror("Error", "Server and username are required for transfers")
+            return
+        TransferDialog(self, self.get_current_config())
+    
+    def show_benchmarks(self, name):
+        """Show stored benchmark runs for a profile side by side"""
+        runs = load_benchmarks().get(name, [])[-6:]
+        if not runs:
             return
         
-        def test_in_thread():
-            try:
-                server = self.server_entry.get().strip()
-                port = self.port_entry.get().strip() or "22"
-                username = self.username_entry.get().strip()
-                
-                cmd = ["ssh", "-p", port, "-o", "ConnectTimeout=10", "-o", "BatchMode=yes"]
-                
-                if self.auth_method.get() == "key":
-                    key_file = self.key_entry.get().strip()
-                    if key_file and os.path.exists(key_file):
-                        cmd.extend(["-i", key_file])
-                
-                cmd.extend([f"{username}@{server}", "echo 'Connection successful'"])
-                
-                self.log_message(f"Testing connection: {' '.join(cmd[:5])}...")
-                process = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-                
-                if process.returncode == 0:
-                    self.log_message("Connection test successful!")
-                    messagebox.showinfo("Success", "Connection test successful!")
-                else:
-                    error_msg = process.stderr or "Connection failed"
-                    self.log_message(f"Connection test failed: {error_msg}")
-                    messagebox.showerror("Connection Failed", f"Connection test failed:\n{error_msg}")
-                    
-            except Exception as e:
-                self.log_message(f"Error during connection test: {str(e)}")
-                messagebox.showerror("Error", f"Error during connection test: {str(e)}")
+        window = tk.Toplevel(self.root)
+        window.title(f"Benchmarks - {name}")
+        columns = ["metric"] + [str(i) for i in range(len(runs))]
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=len(BENCH_METRICS) + 1)
+        tree.heading("metric", text="Metric")
+        tree.column("metric", width=200)
+        for i, run in enumerate(runs):
+            tree.heading(str(i), text=run["timestamp"].replace("T", " ")[5:16])
+            tree.column(str(i), width=120, anchor=tk.E)
         
-        # Run test in separate thread to avoid blocking GUI
-        thread = threading.Thread(target=test_in_thread)
-        thread.daemon = True
-        thread.start()
+        tree.insert("", tk.END, values=["Options"] + [
+            (run["tuning_profile"] + " " + run["additional_options"]).strip() for run in runs])
+        for key, label in BENCH_METRICS:
+            values = [run["results"].get(key) for run in runs]
+            tree.insert("", tk.END, values=[label] + [f"{v:.2f}" if v is not None else "-" for v in values])
+        tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
     
     def save_current_config(self):
-        """Save current configuration to recent servers"""
+        """Save current configuration as a profile"""
         self.save_to_recent_servers()
-        messagebox.showinfo("Success", "Configuration saved to recent servers!")
+        messagebox.showinfo("Success", "Configuration saved to profiles!")
     
     def save_to_recent_servers(self):
-        """Save current configuration to recent servers"""
-        config = {
-            "name": f"{self.username_entry.get()}@{self.server_entry.get()}",
-            "server": self.server_entry.get(),
-            "port": self.port_entry.get(),
-            "username": self.username_entry.get(),
-            "auth_method": self.auth_method.get(),
-            "key_file": self.key_entry.get(),
-            "remote_dir": self.remote_dir_entry.get(),
-            "local_dir": self.local_dir_entry.get(),
-            "additional_options": self.options_entry.get(),
-            "allow_other": self.allow_other.get()
-        }
+        """Save current configuration as a profile"""
+        config = self.get_current_config()
+        # Never persist the password
+        config.pop("password", None)
         
-        # Remove existing entry with same name
-        self.recent_servers = [s for s in self.recent_servers if s.get("name") != config["name"]]
-        
-        # Add to beginning of list
-        self.recent_servers.insert(0, config)
-        
-        # Keep only last 10 entries
-        self.recent_servers = self.recent_servers[:10]
-        
-        # Save to file
         try:
-            with open(self.config_file, "w") as f:
-                json.dump(self.recent_servers, f, indent=2)
+            self.store.put(config)
             self.populate_recent_servers()
         except Exception as e:
-            self.log_message(f"Failed to save configuration: {e}")
+            self.log_message(f"Failed to save configuration: {e}", level="ERROR")
+    
+    def delete_profile(self):
+        """Delete the selected saved profile"""
+        selection = self.recent_listbox.curselection()
+        if not selection:
+            return
+        name = self.visible_profiles[selection[0]]["name"]
+        if messagebox.askyesno("Delete Profile", f"Delete the saved profile '{name}'?"):
+            try:
+                self.store.delete(name)
+            except Exception as e:
+                self.log_message(f"Failed to save configuration: {e}", level="ERROR")
+            self.populate_recent_servers()
     
-    def load_recent_servers(self):
-        """Load recent servers from configuration file"""
+    def import_ssh_config(self):
+        """Import every Host block from ~/.ssh/config as a profile"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, "r") as f:
-                    return json.load(f)
+            count = self.store.import_ssh_config()
         except Exception as e:
-            print(f"Failed to load recent servers: {e}")
-        return []
+            messagebox.showerror("Import Failed", f"Failed to import {SSH_CONFIG_FILE}:\n{e}")
+            return
+        self.log_message(f"Imported {count} profile(s) from {SSH_CONFIG_FILE}")
+        self.populate_recent_servers()
+    
+    def on_profile_filter_change(self, *args):
+        """Debounce type-ahead filtering of the profile list"""
+        if self.profile_filter_job is not None:
+            self.root.after_cancel(self.profile_filter_job)
+        self.profile_filter_job = self.root.after(PROFILE_FILTER_DELAY_MS, self.populate_recent_servers)
     
     def populate_recent_servers(self):
-        """Populate recent servers listbox"""
+        """Fill the profile list with the first chunk of matching profiles"""
+        self.profile_filter_job = None
+        self.visible_profiles = self.store.search(self.profile_filter.get())
         self.recent_listbox.delete(0, tk.END)
-        for server in self.recent_servers:
-            self.recent_listbox.insert(tk.END, server.get("name", "Unknown"))
+        self.load_more_profiles()
+        self.profile_count.set(f"{len(self.visible_profiles)} of {len(self.store)}")
+        self.group_combo.configure(values=self.store.groups())
+    
+    def load_more_profiles(self):
+        """Append the next chunk of matching profiles to the listbox"""
+        start = self.recent_listbox.size()
+        chunk = self.visible_profiles[start:start + PROFILE_LIST_CHUNK]
+        if chunk:
+            self.recent_listbox.insert(tk.END, *[p.get("name", "Unknown") for p in chunk])
+    
+    def on_profile_list_scroll(self, first, last):
+        """Keep the scrollbar in sync and load more rows near the bottom"""
+        self.recent_scrollbar.set(first, last)
+        if float(last) > 0.9 and self.recent_listbox.size() < len(self.visible_profiles):
+            self.load_more_profiles()
     
     def load_recent_server(self, event):
         """Load selected recent server configuration"""
         selection = self.recent_listbox.curselection()
         if selection:
             index = selection[0]
-            if index < len(self.recent_servers):
-                config = self.recent_servers[index]
+            if index < len(self.visible_profiles):
+                config = self.visible_profiles[index]
                 
                 # Load configuration
+                self.profile_name_entry.delete(0, tk.END)
+                self.profile_name_entry.insert(0, config.get("name", ""))
+                
+                self.group_combo.set(config.get("group", ""))
+                
+                self.tags_entry.delete(0, tk.END)
+                self.tags_entry.insert(0, ", ".join(config.get("tags", [])))
+                
                 self.server_entry.delete(0, tk.END)
                 self.server_entry.insert(0, config.get("server", ""))
                 
@@ -524,16 +5034,1351 @@ class SSHFSGui:
                 self.options_entry.delete(0, tk.END)
                 self.options_entry.insert(0, config.get("additional_options", ""))
                 
+                self.tuning_profile.set(config.get("tuning_profile", DEFAULT_TUNING))
+                self.connections.set(profile_connections(config))
+                self.read_cache_mb.set(config.get("read_cache_mb", 0))
+                self.idle_minutes.set(profile_idle_minutes(config))
                 self.allow_other.set(config.get("allow_other", False))
+                self.mount_on_startup.set(config.get("mount_on_startup", False))
+                self.auto_reconnect.set(config.get("auto_reconnect", False))
                 
                 self.on_auth_method_change()
+                self.on_tuning_change()
                 self.log_message(f"Loaded configuration: {config.get('name')}")
 
-def main():
-    """Main entry point"""
+class MetricsWindow:
+    """Live graph of a mount's throughput and request history"""
+    
+    def __init__(self, app, local_dir):
+        self.app = app
+        self.local_dir = local_dir
+        self.window = tk.Toplevel(app.root)
+        self.window.title(f"Metrics - {local_dir}")
+        self.window.geometry("560x300")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self.window, background="white", highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
+        self.summary = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.summary).grid(row=1, column=0, sticky=tk.W, padx=10, pady=(0, 10))
+        self.redraw()
+    
+    def redraw(self):
+        """Plot the ring buffer: read throughput in blue, write in red"""
+        if not self.window.winfo_exists():
+            return
+        samples = [s for s in self.app.metrics.samples(self.local_dir) if s["read_bps"] is not None]
+        self.canvas.delete("all")
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if len(samples) >= 2 and width > 1:
+            peak = max(max(s["read_bps"], s["write_bps"]) for s in samples) or 1
+            step = width / (METRICS_HISTORY - 1)
+            offset = width - step * (len(samples) - 1)
+            for key, colour in (("read_bps", "blue"), ("write_bps", "red")):
+                points = []
+                for i, sample in enumerate(samples):
+                    points += [offset + i * step, height - 4 - (height - 8) * sample[key] / peak]
+                self.canvas.create_line(*points, fill=colour)
+            self.canvas.create_text(4, 4, anchor=tk.NW, text=f"peak {format_rate(peak)}", fill="gray")
+            latest = samples[-1]
+            waiting = latest["waiting"] if latest["waiting"] is not None else "-"
+            rtt = f"{latest['rtt'] * 1000:.0f} ms" if latest["rtt"] is not None else "-"
+            self.summary.set(f"Read {format_rate(latest['read_bps'])}   Write {format_rate(latest['write_bps'])}   "
+                             f"Requests {latest['requests_ps']:.0f}/s   Waiting {waiting}   RTT {rtt}")
+        else:
+            self.summary.set("Collecting samples...")
+        self.window.after(int(METRICS_INTERVAL * 1000), self.redraw)
+
+
+class TraceWindow:
+    """Timing spans from the trace file, newest operation first"""
+    
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Timings")
+        self.window.geometry("820x420")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(0, weight=1)
+        
+        self.tree = ttk.Treeview(self.window, columns=("ms", "status", "details"))
+        self.tree.heading("#0", text="Span")
+        self.tree.heading("ms", text="ms")
+        self.tree.heading("status", text="Status")
+        self.tree.heading("details", text="Details")
+        self.tree.column("#0", width=260)
+        self.tree.column("ms", width=90, anchor=tk.E)
+        self.tree.column("status", width=80)
+        self.tree.column("details", width=360)
+        self.tree.tag_configure("failed", foreground="red")
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0), pady=10)
+        scrollbar = ttk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S), padx=(0, 10), pady=10)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        
+        buttons = ttk.Frame(self.window)
+        buttons.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=10, pady=(0, 10))
+        ttk.Label(buttons, text=str(tracer.path), foreground="gray").pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Close", command=self.window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.RIGHT, padx=(0, 5))
+        self.refresh()
+    
+    def refresh(self):
+        """Reload the trace file; operations are top-level rows, their phases nested below"""
+        self.tree.delete(*self.tree.get_children())
+        roots, children = trace_tree(read_trace(tracer.path))
+        
+        def insert(parent, span):
+            failed = span.get("status") not in ("ok", None)
+            text = span.get("operation") or span.get("name", "")
+            if not parent:
+                text = f"{datetime.fromtimestamp(span.get('start', 0)):%H:%M:%S}  {text}"
+            item = self.tree.insert(parent, tk.END, text=text,
+                                    values=(f"{span.get('ms', 0):.1f}", span.get("status", ""), span_details(span)),
+                                    tags=("failed",) if failed else ())
+            for child in children.get(span.get("span"), []):
+                insert(item, child)
+        
+        for root in reversed(roots[-TRACE_VIEW_ROOTS:]):
+            insert("", root)
+
+
+class TransferDialog:
+    """Bulk upload or download over parallel sftp/rsync sessions"""
+    
+    def __init__(self, app, config):
+        self.app = app
+        self.config = config
+        self.transfer = None
+        self.operation = None
+        
+        self.window = tk.Toplevel(app.root)
+        self.window.title(f"Transfer - {config['name']}")
+        self.window.geometry("560x260")
+        self.window.columnconfigure(1, weight=1)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.direction = tk.StringVar(value="upload")
+        self.source = tk.StringVar()
+        self.destination = tk.StringVar(value=config["remote_dir"].strip())
+        self.workers = tk.IntVar(value=TRANSFER_WORKERS)
+        self.use_rsync = tk.BooleanVar()
+        self.status = tk.StringVar(value="Idle")
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        frame.columnconfigure(1, weight=1)
+        directions = ttk.Frame(frame)
+        directions.grid(row=0, column=0, columnspan=3, sticky=tk.W)
+        ttk.Radiobutton(directions, text="Upload", variable=self.direction, value="upload",
+                        command=self.on_direction_change).pack(side=tk.LEFT)
+        ttk.Radiobutton(directions, text="Download", variable=self.direction, value="download",
+                        command=self.on_direction_change).pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.source_label = ttk.Label(frame, text="Local source:")
+        self.source_label.grid(row=1, column=0, sticky=tk.W, pady=(10, 0))
+        ttk.Entry(frame, textvariable=self.source).grid(row=1, column=1, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.source_button = ttk.Button(frame, text="Browse", command=lambda: self.browse(self.source))
+        self.source_button.grid(row=1, column=2, padx=(5, 0), pady=(10, 0))
+        self.destination_label = ttk.Label(frame, text="Remote destination:")
+        self.destination_label.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(frame, textvariable=self.destination).grid(row=2, column=1, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.destination_button = ttk.Button(frame, text="Browse", command=lambda: self.browse(self.destination))
+        self.destination_button.grid(row=2, column=2, padx=(5, 0), pady=(5, 0))
+        
+        options = ttk.Frame(frame)
+        options.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
+        ttk.Label(options, text="Parallel sessions:").pack(side=tk.LEFT)
+        ttk.Spinbox(options, from_=1, to=32, textvariable=self.workers, width=4).pack(side=tk.LEFT, padx=(5, 15))
+        rsync = ttk.Checkbutton(options, text="Use rsync", variable=self.use_rsync)
+        rsync.pack(side=tk.LEFT)
+        if not shutil.which("rsync"):
+            rsync.configure(state="disabled")
+        
+        self.progress = ttk.Progressbar(frame, maximum=1000)
+        self.progress.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(15, 0))
+        ttk.Label(frame, textvariable=self.status).grid(row=5, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+        
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=6, column=0, columnspan=3, sticky=tk.E, pady=(10, 0))
+        self.start_button = ttk.Button(buttons, text="Start", command=self.start)
+        self.start_button.pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Cancel", command=self.cancel).pack(side=tk.LEFT, padx=(5, 0))
+        self.on_direction_change()
+    
+    def on_direction_change(self):
+        """Swap which side is local and which is remote"""
+        upload = self.direction.get() == "upload"
+        self.source_label.configure(text="Local source:" if upload else "Remote source:")
+        self.destination_label.configure(text="Remote destination:" if upload else "Local destination:")
+        self.source_button.configure(state="normal" if upload else "disabled")
+        self.destination_button.configure(state="disabled" if upload else "normal")
+        if self.transfer is None:
+            self.source.set("" if upload else self.config["remote_dir"].strip())
+            self.destination.set(self.config["remote_dir"].strip() if upload else "")
+    
+    def browse(self, variable):
+        directory = filedialog.askdirectory(parent=self.window, title="Select local directory")
+        if directory:
+            variable.set(directory)
+    
+    def start(self):
+        """Start the transfer on the app's worker pool"""
+        if self.operation is not None:
+            return
+        if not self.source.get().strip() or not self.destination.get().strip():
+            messagebox.showerror("Error", "Source and destination are required", parent=self.window)
+            return
+        try:
+            workers = max(1, self.workers.get())
+        except (tk.TclError, ValueError):
+            workers = TRANSFER_WORKERS
+        self.transfer = Transfer(self.config, self.direction.get(), self.source.get().strip(),
+                                 self.destination.get().strip(), workers, pool=self.app.pool,
+                                 use_rsync=self.use_rsync.get())
+        self.start_button.configure(state="disabled")
+        self.status.set("Listing files...")
+        self.operation = self.app.engine.submit(
+            f"Transfer {self.config['name']}", self.transfer.run,
+            on_done=self.finish, on_error=self.fail, source=self.config["name"])
+        self.poll()
+    
+    def poll(self):
+        """Refresh the progress bar and throughput while the transfer runs"""
+        if self.operation is None or not self.window.winfo_exists():
+            return
+        if self.transfer.started:
+            progress = self.transfer.progress()
+            self.show(progress)
+        self.window.after(500, self.poll)
+    
+    def show(self, progress):
+        if progress["bytes_total"]:
+            fraction = progress["bytes_done"] / progress["bytes_total"]
+        else:
+            fraction = progress["files_done"] / max(progress["files_total"], 1)
+        self.progress["value"] = fraction * 1000
+        self.status.set(format_transfer_progress(progress))
+    
+    def finish(self, progress):
+        self.operation = None
+        self.start_button.configure(state="normal")
+        summary = format_transfer_progress(progress)
+        self.app.log_message(f"Transfer finished: {summary}", source=self.config["name"])
+        for rel, error in self.transfer.errors:
+            self.app.log_message(f"Transfer failed for {rel}: {error}", level="ERROR", source=self.config["name"])
+        if self.window.winfo_exists():
+            self.show(progress)
+            if self.transfer.errors:
+                self.status.set(f"{summary} - see the log for the failed files")
+    
+    def fail(self, error):
+        self.operation = None
+        self.start_button.configure(state="normal")
+        self.app.log_message(f"Transfer failed: {error}", level="ERROR", source=self.config["name"])
+        if self.window.winfo_exists():
+            self.status.set(f"Failed: {error}")
+    
+    def cancel(self):
+        if self.operation is not None:
+            self.operation.cancel()
+            self.transfer.cancel()
+            self.operation = None
+            self.start_button.configure(state="normal")
+            self.status.set("Cancelled; start again to resume")
+    
+    def close(self):
+        self.cancel()
+        self.window.destroy()
+
+
+class FleetProbeWindow:
+    """Reachability and latency of every saved host, probed concurrently"""
+    
+    COLUMNS = (("host", "Host", 150), ("status", "Status", 110), ("dns_ms", "DNS ms", 60),
+               ("connect_ms", "Connect ms", 75), ("banner_ms", "Banner ms", 70), ("auth_ms", "Auth ms", 60),
+               ("banner", "Server", 180))
+    
+    def __init__(self, app):
+        self.app = app
+        self.operation = None
+        self.results = {}
+        self.sort_column, self.sort_reverse = "banner_ms", False
+        
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Check Hosts")
+        self.window.geometry("880x420")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(1, weight=1)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        top = ttk.Frame(self.window, padding="10 10 10 0")
+        top.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.check_auth = tk.BooleanVar()
+        self.concurrency = tk.IntVar(value=PROBE_CONCURRENCY)
+        self.status = tk.StringVar(value="")
+        self.start_button = ttk.Button(top, text="Start", command=self.start)
+        self.start_button.pack(side=tk.LEFT)
+        ttk.Checkbutton(top, text="Check authentication", variable=self.check_auth).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(top, text="Concurrency:").pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Spinbox(top, from_=1, to=512, width=5, textvariable=self.concurrency).pack(side=tk.LEFT)
+        ttk.Label(top, textvariable=self.status).pack(side=tk.LEFT, padx=(10, 0))
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(0, weight=1)
+        self.tree = ttk.Treeview(frame, columns=[c for c, _, _ in self.COLUMNS])
+        self.tree.heading("#0", text="Profile", command=lambda: self.sort_by("name"))
+        self.tree.column("#0", width=150)
+        for column, title, width in self.COLUMNS:
+            self.tree.heading(column, text=title, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor=tk.E if column.endswith("_ms") else tk.W)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.tag_configure("down", foreground="red")
+        self.start()
+    
+    def start(self):
+        """Probe every saved profile with a server"""
+        if self.operation is not None:
+            return
+        profiles = [p for p in self.app.store.all() if p.get("server", "").strip()]
+        try:
+            concurrency = max(1, self.concurrency.get())
+        except (tk.TclError, ValueError):
+            concurrency = PROBE_CONCURRENCY
+        self.results.clear()
+        self.tree.delete(*self.tree.get_children())
+        self.total = len(profiles)
+        self.started = time.perf_counter()
+        self.start_button.configure(state="disabled")
+        self.status.set(f"Probing {self.total} host(s)...")
+        self.operation = self.app.engine.submit(
+            "Check hosts", probe_fleet, profiles, concurrency, PROBE_TIMEOUT, self.check_auth.get(),
+            lambda result: self.app.engine.post(self.add_result, result),
+            on_done=self.finish, on_error=self.fail)
+    
+    def add_result(self, result):
+        if not self.window.winfo_exists():
+            return
+        iid = str(len(self.results))
+        self.results[iid] = result
+        values = []
+        for column, _, _ in self.COLUMNS:
+            if column.endswith("_ms"):
+                values.append(format_ms(result[column]))
+            elif column == "banner":
+                values.append(result["banner"] or result["error"])
+            else:
+                values.append(result[column])
+        tags = () if result["status"].startswith("ok") else ("down",)
+        self.tree.insert("", tk.END, iid=iid, text=result["name"], values=values, tags=tags)
+        self.status.set(f"{len(self.results)} of {self.total} probed")
+    
+    def sort_by(self, column):
+        """Sort rows by a column; clicking the same heading again reverses the order"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        self.apply_sort()
+    
+    def apply_sort(self):
+        column = self.sort_column
+        if column.endswith("_ms"):
+            key = lambda iid: (self.results[iid][column] is None, self.results[iid][column] or 0)
+        else:
+            key = lambda iid: str(self.results[iid][column]).lower()
+        for index, iid in enumerate(sorted(self.results, key=key, reverse=self.sort_reverse)):
+            self.tree.move(iid, "", index)
+    
+    def finish(self, results):
+        self.operation = None
+        if not self.window.winfo_exists():
+            return
+        self.start_button.configure(state="normal")
+        down = sum(1 for r in results if not r["status"].startswith("ok"))
+        self.status.set(f"{len(results) - down} of {len(results)} reachable in {time.perf_counter() - self.started:.1f}s")
+        self.apply_sort()
+    
+    def fail(self, error):
+        self.operation = None
+        if self.window.winfo_exists():
+            self.start_button.configure(state="normal")
+            self.status.set(f"Failed: {error}")
+    
+    def close(self):
+        if self.operation is not None:
+            self.operation.cancel()
+        self.window.destroy()
+
+
+class RemoteDirectoryDialog:
+    """Tree of remote directories, listed lazily and a page at a time"""
+    
+    def __init__(self, app, config):
+        self.app = app
+        self.browser = RemoteBrowser(config, app.pool, app.listing_cache)
+        self.listings = {}
+        self.shown = {}
+        self.operations = []
+        
+        self.window = tk.Toplevel(app.root)
+        self.window.title(f"Remote Directory - {config['name']}")
+        self.window.geometry("500x500")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(1, weight=1)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        top = ttk.Frame(self.window, padding="10 10 10 0")
+        top.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        top.columnconfigure(1, weight=1)
+        ttk.Button(top, text="Up", command=self.go_up).grid(row=0, column=0, padx=(0, 5))
+        self.path_var = tk.StringVar(value=config["remote_dir"].strip() or "/")
+        ttk.Entry(top, textvariable=self.path_var).grid(row=0, column=1, sticky=(tk.W, tk.E))
+        ttk.Button(top, text="Go", command=lambda: self.set_root(self.path_var.get())).grid(row=0, column=2, padx=(5, 0))
+        
+        tree_frame = ttk.Frame(self.window, padding="10")
+        tree_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        tree_frame.columnconfigure(0, weight=1)
+        tree_frame.rowconfigure(0, weight=1)
+        self.tree = ttk.Treeview(tree_frame, columns=("modified", "mode"))
+        self.tree.heading("#0", text="Name")
+        self.tree.heading("modified", text="Modified")
+        self.tree.heading("mode", text="Mode")
+        self.tree.column("modified", width=110)
+        self.tree.column("mode", width=90)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.bind("<<TreeviewOpen>>", self.on_open)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Double-1>", self.on_double_click)
+        
+        bottom = ttk.Frame(self.window, padding="10 0 10 10")
+        bottom.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        bottom.columnconfigure(0, weight=1)
+        self.status_var = tk.StringVar()
+        ttk.Label(bottom, textvariable=self.status_var).grid(row=0, column=0, sticky=tk.W)
+        ttk.Button(bottom, text="Select", command=self.select).grid(row=0, column=1, padx=(0, 5))
+        ttk.Button(bottom, text="Cancel", command=self.close).grid(row=0, column=2)
+        
+        self.set_root(self.path_var.get())
+    
+    def set_root(self, path):
+        """Show the tree rooted at path"""
+        path = path.strip() or "/"
+        self.tree.delete(*self.tree.get_children())
+        self.path_var.set(path)
+        self.tree.insert("", tk.END, iid=path, text=path, open=True)
+        self.load(path)
+    
+    def go_up(self):
+        path = self.path_var.get().rstrip("/")
+        self.set_root(os.path.dirname(path) or "/")
+    
+    def load(self, path):
+        """List path in the background, streaming pages into the tree"""
+        self.listings[path] = []
+        self.shown[path] = 0
+        self.status_var.set(f"Listing {path}...")
+        
+        def on_page(entries):
+            self.app.engine.post(self.add_page, path, entries)
+        
+        def on_error(error):
+            if self.window.winfo_exists():
+                self.status_var.set(f"Cannot list {path}")
+                messagebox.showerror("Browse Failed", f"Cannot list {path}:\n{error}", parent=self.window)
+        
+        self.operations.append(self.app.engine.submit(
+            f"List {path}", self.browser.list_dir, path, on_page,
+            on_done=lambda entries: self.finish(path), on_error=on_error))
+    
+    def add_page(self, path, entries):
+        """Record a page of entries and insert directories up to the page limit"""
+        if not self.window.winfo_exists() or not self.tree.exists(path):
+            return
+        self.listings[path].extend(e for e in entries if e["kind"] != "file")
+        self.show_more(path, finished=False)
+        self.status_var.set(f"Listing {path}: {len(self.listings[path])} directories so far...")
+    
+    def finish(self, path):
+        if not self.window.winfo_exists() or not self.tree.exists(path):
+            return
+        self.show_more(path, finished=True)
+        self.status_var.set(f"{path}: {len(self.listings[path])} directories")
+    
+    def show_more(self, path, finished=True, advance=False):
+        """Insert directories under path up to the page limit
+
+        Streamed pages only fill the first page; further pages are added
+        one at a time from the "Load more" row (advance=True).
+        """
+        listing = self.listings.get(path, [])
+        start = self.shown[path]
+        limit = listing_page_limit(len(listing), start, advance)
+        more_iid = path + "\0more"
+        if self.tree.exists(more_iid):
+            self.tree.delete(more_iid)
+        
+        for entry in listing[start:limit]:
+            child = path.rstrip("/") + "/" + entry["name"]
+            if self.tree.exists(child):
+                continue
+            self.tree.insert(path, tk.END, iid=child, text=entry["name"],
+                             values=(entry["modified"], entry["mode"]))
+            # Placeholder so the node can be expanded before it is listed
+            self.tree.insert(child, tk.END, iid=child + "\0placeholder", text="...")
+        self.shown[path] = limit
+        
+        if finished and self.shown[path] < len(listing):
+            remaining = len(listing) - self.shown[path]
+            self.tree.insert(path, tk.END, iid=more_iid, text=f"Load more ({remaining} remaining)")
+    
+    def on_open(self, event):
+        path = self.tree.focus()
+        placeholder = path + "\0placeholder"
+        if self.tree.exists(placeholder):
+            self.tree.delete(placeholder)
+            self.load(path)
+    
+    def on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if iid.endswith("\0more"):
+            self.show_more(iid[:-len("\0more")], advance=True)
+    
+    def on_select(self, event):
+        iid = self.tree.focus()
+        if iid and "\0" not in iid:
+            self.path_var.set(iid)
+    
+    def select(self):
+        """Use the selected directory as the remote directory"""
+        self.app.remote_dir_entry.delete(0, tk.END)
+        self.app.remote_dir_entry.insert(0, self.path_var.get())
+        self.close()
+    
+    def close(self):
+        for op in self.operations:
+            op.cancel()
+        self.browser.close()
+        self.window.destroy()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="sshfs_gui.py",
+        description="Graphical interface for SSHFS. Run without a command to open the GUI."
+    )
+    parser.add_argument("--timing", action="store_true",
+                        help="print startup and command timing to stderr")
+    # Not dest="profile": most commands take a positional profile name
+    parser.add_argument("--profile", dest="profile_output", metavar="FILE",
+                        help="run under cProfile and write the stats of every thread to FILE")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    commands.add_parser("gui", help="open the GUI (default)")
+
+    mount = commands.add_parser("mount", help="mount a saved profile")
+    mount.add_argument("profile", help="profile name")
+    mount.add_argument("--timeout", type=float, default=MOUNT_TIMEOUT,
+                       help=f"mount timeout in seconds (default: {MOUNT_TIMEOUT})")
+    mount.add_argument("--shared-connections", action="store_true",
+                       help="open a ControlMaster for the host and mount over it")
+
+    unmount = commands.add_parser("unmount", help="unmount a saved profile or mount point")
+    unmount.add_argument("target", help="profile name or local directory")
+    unmount.add_argument("--lazy", action="store_true",
+                         help="detach even if the mount is hung or busy")
+
+    status = commands.add_parser("status", help="show active sshfs mounts")
+    status.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    listing = commands.add_parser("list", help="list saved profiles")
+    listing.add_argument("query", nargs="*", help="search words, group:NAME or tag:NAME")
+    listing.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    batch = commands.add_parser("batch", help="mount every profile marked 'Mount on startup'")
+    batch.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                       help=f"number of mounts to run at once (default: {BATCH_CONCURRENCY})")
+    batch.add_argument("--timeout", type=float, default=MOUNT_TIMEOUT,
+                       help=f"per-host mount timeout in seconds (default: {MOUNT_TIMEOUT})")
+    batch.add_argument("--shared-connections", action="store_true",
+                       help="open one ControlMaster per host and mount over it")
+
+    benchmark = commands.add_parser("benchmark", help="benchmark the mount of a saved profile")
+    benchmark.add_argument("profile", help="profile name (used as the result key with --dir)")
+    benchmark.add_argument("--dir", dest="benchmark_dir", metavar="DIR",
+                           help="directory to benchmark instead of the profile's local directory")
+    benchmark.add_argument("--size", dest="bench_size", type=int, default=BENCH_FILE_MB,
+                           help=f"sequential test file size in MB (default: {BENCH_FILE_MB})")
+    benchmark.add_argument("--files", dest="bench_files", type=int, default=BENCH_SMALL_FILES,
+                           help=f"number of small files to create (default: {BENCH_SMALL_FILES})")
+    benchmark.add_argument("--scaling", action="store_true",
+                           help="measure parallel copy throughput for 1 up to the profile's connection count")
+
+    copy = commands.add_parser("copy", help="copy a large file to or from a mount over parallel connections")
+    copy.add_argument("profile", help="profile whose mount (and stripe instances) to copy through")
+    copy.add_argument("source", help="file to copy")
+    copy.add_argument("destination", help="destination file")
+    copy.add_argument("--connections", type=int,
+                      help="number of parallel workers (default: the profile's connection count)")
+    copy.add_argument("--chunk", type=int, default=STRIPE_CHUNK >> 20, help="chunk size in MB (default: 8)")
+
+    metrics = commands.add_parser("metrics", help="show or export per-mount I/O metrics")
+    metrics.add_argument("--interval", type=float, default=METRICS_INTERVAL,
+                         help=f"seconds between samples (default: {METRICS_INTERVAL})")
+    metrics.add_argument("--count", type=int, default=0, help="stop after this many reports")
+    metrics.add_argument("--prometheus", action="store_true",
+                         help="print the counters in Prometheus text format once and exit")
+    metrics.add_argument("--textfile", metavar="FILE",
+                         help="rewrite FILE in Prometheus text format after every sample")
+    metrics.add_argument("--listen", metavar="[HOST:]PORT",
+                         help="serve Prometheus metrics over HTTP at /metrics")
+    metrics.add_argument("--quiet", action="store_true", help="don't print the table")
+
+    cache = commands.add_parser("cache", help="use or manage a profile's local read cache")
+    cache.add_argument("action", choices=("get", "warm", "stats", "clear"),
+                       help="get: print cached copies of files; warm: cache whole directories")
+    cache.add_argument("profile", help="profile name")
+    cache.add_argument("paths", nargs="*", help="files (get) or directories (warm) under the mount point")
+    cache.add_argument("--size", type=int, metavar="MB",
+                       help="cache budget in MB (default: the profile's, or %d)" % READ_CACHE_MB)
+    cache.add_argument("--workers", type=int, default=READ_CACHE_WORKERS,
+                       help=f"parallel fetches when warming (default: {READ_CACHE_WORKERS})")
+
+    transfer = commands.add_parser("transfer", help="copy a directory tree to or from a profile's host")
+    transfer.add_argument("direction", choices=("upload", "download"))
+    transfer.add_argument("profile", help="profile name")
+    transfer.add_argument("source", help="local directory (upload) or remote directory (download)")
+    transfer.add_argument("destination", help="remote directory (upload) or local directory (download)")
+    transfer.add_argument("--workers", type=int, default=TRANSFER_WORKERS,
+                          help=f"concurrent sftp/rsync sessions (default: {TRANSFER_WORKERS})")
+    transfer.add_argument("--rsync", action="store_true", help="use rsync instead of sftp")
+    transfer.add_argument("--fresh", action="store_true", help="ignore the resume manifest and copy everything")
+
+    probe = commands.add_parser("probe", help="check which saved hosts are reachable")
+    probe.add_argument("query", nargs="*", help="only probe profiles matching these search words")
+    probe.add_argument("--auth", action="store_true", help="also check key authentication")
+    probe.add_argument("--concurrency", type=int, default=PROBE_CONCURRENCY,
+                       help=f"hosts to probe at once (default: {PROBE_CONCURRENCY})")
+    probe.add_argument("--timeout", type=float, default=PROBE_TIMEOUT,
+                       help=f"per-phase timeout in seconds (default: {PROBE_TIMEOUT})")
+    probe.add_argument("--sort", choices=("latency", "name", "status"), default="latency")
+    probe.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    automount = commands.add_parser(
+        "automount", help="unmount idle profiles and mount them again on access, until interrupted")
+    automount.add_argument("--interval", type=float, default=IDLE_CHECK_INTERVAL,
+                           help=f"seconds between idle checks (default: {IDLE_CHECK_INTERVAL})")
+
+    supervise = commands.add_parser(
+        "supervise", help="keep profiles mounted, restarting sshfs when it exits (a daemon)")
+    supervise.add_argument("query", nargs="*",
+                           help="profiles to supervise (default: those marked 'Mount on startup')")
+    supervise.add_argument("--timeout", type=float, default=MOUNT_TIMEOUT,
+                           help=f"mount timeout in seconds (default: {MOUNT_TIMEOUT})")
+    control = supervise.add_mutually_exclusive_group()
+    control.add_argument("--status", action="store_true", help="show a running supervisor's mounts")
+    control.add_argument("--start", metavar="PROFILE", help="have a running supervisor mount a profile")
+    control.add_argument("--stop", metavar="PROFILE", help="have a running supervisor unmount a profile")
+    control.add_argument("--restart", metavar="PROFILE", help="have a running supervisor remount a profile now")
+
+    systemd = commands.add_parser("systemd", help="generate systemd --user units for saved profiles")
+    systemd.add_argument("query", nargs="*",
+                         help="profiles to generate units for (default: those marked 'Mount on startup')")
+    systemd.add_argument("--supervisor", action="store_true",
+                         help="one unit running the supervisor instead of a unit per profile")
+    action = systemd.add_mutually_exclusive_group()
+    action.add_argument("--install", action="store_true",
+                        help=f"write the units to {SYSTEMD_USER_DIR} and enable and start them")
+    action.add_argument("--remove", action="store_true", help="stop, disable and delete the units")
+
+    trace = commands.add_parser("trace", help="show recent operation timings, or time each phase of a mount")
+    trace.add_argument("profile", nargs="?",
+                       help="mount this profile once with debug output, time its phases and unmount it")
+    trace.add_argument("--last", type=int, default=10, help="operations to show (default: 10)")
+    trace.add_argument("--timeout", type=float, default=MOUNT_TIMEOUT,
+                       help=f"mount timeout in seconds (default: {MOUNT_TIMEOUT})")
+
+    return parser.parse_args(argv)
+
+
+def record_startup(command, ready_ms, total_ms):
+    """Append one startup timing sample to STARTUP_LOG, keeping it bounded"""
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        sample = {"time": round(time.time(), 3), "command": command,
+                  "ready_ms": round(ready_ms, 2), "total_ms": round(total_ms, 2)}
+        with open(STARTUP_LOG, "a") as f:
+            f.write(json.dumps(sample) + "\n")
+        if STARTUP_LOG.stat().st_size > 256 * 1024:
+            with open(STARTUP_LOG, "r") as f:
+                lines = f.readlines()
+            with open(STARTUP_LOG, "w") as f:
+                f.writelines(lines[-STARTUP_LOG_LINES:])
+    except OSError:
+        pass
+
+
+def find_profile(name):
+    """Look up a saved profile by name, printing an error if there is none"""
+    config = ProfileStore().get(name)
+    if config is None:
+        print(f"No saved profile named {name!r}", file=sys.stderr)
+    return config
+
+
+def prompt_password(config, name):
+    """Ask once per user@host on the terminal for a password profile
+
+    Returns False if a password is needed but there is no terminal to ask on.
+    """
+    if config.get("auth_method") != "password" or session_credentials.password(config):
+        return True
+    if not sys.stdin.isatty():
+        print(f"{name} uses password authentication and needs a terminal", file=sys.stderr)
+        return False
+    session_credentials.remember(dict(config, password=getpass.getpass(
+        f"Password for {config['username']}@{config['server']}: ")))
+    return True
+
+
+def run_mount(args):
+    """Mount one saved profile; returns a process exit code"""
+    config = find_profile(args.profile)
+    if config is None:
+        return 2
+    local_dir = config.get("local_dir", "").strip()
+    if mount_key(local_dir) in read_mount_table():
+        print(f"{args.profile} is already mounted on {local_dir}")
+        return 0
+
+    if not prompt_password(config, args.profile):
+        return 2
+
+    try:
+        os.makedirs(local_dir, exist_ok=True)
+        pool = ControlMasterPool() if args.shared_connections else None
+        mount_profile(Operation(None, f"Mount {args.profile}"), config, timeout=args.timeout, pool=pool)
+    except (SSHFSError, OSError) as e:
+        print(f"Mount failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Mounted {args.profile} on {local_dir}")
+    return 0
+
+
+def run_unmount(args):
+    """Unmount a saved profile or a mount point; returns a process exit code"""
+    config = ProfileStore().get(args.target)
+    local_dir = config.get("local_dir", "") if config else args.target
+    registry = MountRegistry()
+    registry.refresh()
+    op = Operation(None, f"Unmount {local_dir}")
+    try:
+        unmount_path(op, local_dir, registry, lazy=args.lazy)
+    except SSHFSError as e:
+        print(f"Unmount failed: {str(e).strip()}", file=sys.stderr)
+        return 1
+    print(f"Unmounted {local_dir}")
+    return 0
+
+
+def run_status(args):
+    """Print the active sshfs mounts; returns a process exit code"""
+    store = ProfileStore()
+    registry = MountRegistry(profiles=store.all)
+    registry.refresh()
+    mounts = sorted(registry.snapshot().values(), key=lambda m: m["mount_point"])
+    if args.json:
+        print(json.dumps([{"mount_point": m["mount_point"], "source": m["source"], "pid": m.get("pid"),
+                           "profile": (m.get("profile") or {}).get("name")} for m in mounts], indent=2))
+        return 0
+    if not mounts:
+        print("No sshfs mounts")
+        return 0
+    rows = [(m["mount_point"], m["source"], str(m.get("pid") or "-"), (m.get("profile") or {}).get("name", "-"))
+            for m in mounts]
+    print_table(("Mount Point", "Source", "PID", "Profile"), rows)
+    return 0
+
+
+def run_list(args):
+    """Print saved profiles matching a query; returns a process exit code"""
+    store = ProfileStore()
+    profiles = store.search(" ".join(args.query)) if args.query else store.all()
+    if args.json:
+        print(json.dumps(profiles, indent=2))
+        return 0
+    mounted = read_mount_table()
+    rows = [(p["name"], f"{p.get('username', '')}@{p.get('server', '')}:{p.get('port') or '22'}",
+             p.get("group", ""), ",".join(p.get("tags", [])),
+             "mounted" if mount_key(p.get("local_dir", "") or "-") in mounted else "")
+            for p in profiles]
+    print_table(("Name", "Server", "Group", "Tags", "State"), rows)
+    return 0
+
+
+def print_table(headers, rows):
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)).rstrip())
+    for row in rows:
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip())
+
+
+def run_headless_benchmark(args):
+    """Headless benchmark; returns a process exit code"""
+    config = ProfileStore().get(args.profile)
+    if config is None and not args.benchmark_dir:
+        print(f"No saved profile named {args.profile!r}", file=sys.stderr)
+        return 2
+    config = config or {"name": args.profile}
+    mount_dir = args.benchmark_dir or config.get("local_dir", "")
+    if not os.path.isdir(mount_dir):
+        print(f"Not a directory: {mount_dir}")
+        return 2
+    # An unmounted profile would benchmark the empty local directory and
+    # store local disk numbers in its history
+    if not args.benchmark_dir and mount_key(mount_dir) not in read_mount_table():
+        print(f"{args.profile} is not mounted on {mount_dir}; mount it first or pass --dir", file=sys.stderr)
+        return 2
+
+    if args.scaling:
+        print(f"Measuring throughput scaling on {mount_dir} with up to {profile_connections(config)} connection(s)...")
+        try:
+            print(format_scaling_table(run_scaling_benchmark(None, config, args.bench_size)))
+        except (OSError, SSHFSError) as e:
+            print(f"Benchmark failed: {e}")
+            return 1
+        return 0
+
+    print(f"Benchmarking {mount_dir}...")
+    try:
+        results = run_benchmark(None, mount_dir, args.bench_size, args.bench_files)
+    except OSError as e:
+        print(f"Benchmark failed: {e}")
+        return 1
+    save_benchmark(args.profile, config, results)
+    print(format_benchmark_table(load_benchmarks().get(args.profile, [])[-6:]))
+    return 0
+
+
+def run_copy(args):
+    """Parallel chunked copy through a profile's mount; returns a process exit code"""
+    config = ProfileStore().get(args.profile)
+    if config is None:
+        print(f"No saved profile named {args.profile!r}", file=sys.stderr)
+        return 2
+    try:
+        result = parallel_copy(None, args.source, args.destination, args.connections, config,
+                               chunk_size=max(args.chunk, 1) << 20)
+    except (OSError, SSHFSError) as e:
+        print(f"Copy failed: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    print(f"Copied {result['bytes'] / (1 << 20):.1f} MB in {result['seconds']:.2f}s "
+          f"({result['mbps']:.1f} MB/s over {result['workers']} connection(s))")
+    return 0
+
+
+def run_cache(args):
+    """Read cache commands; returns a process exit code"""
+    config = find_profile(args.profile)
+    if config is None:
+        return 2
+    cache = ReadCache(config, budget_mb=args.size)
+    if args.action == "stats":
+        stats = cache.stats()
+        print(f"{stats['entries']} file(s), {stats['bytes'] / (1 << 20):.1f} of {stats['budget'] >> 20} MB in {cache.root}")
+        return 0
+    if args.action == "clear":
+        cache.clear()
+        return 0
+    if not cache.budget:
+        print(f"The read cache is off for {args.profile!r}; pass --size or set a size in the GUI", file=sys.stderr)
+        return 2
+    if args.action == "warm":
+        try:
+            stats = cache.warm(None, args.paths or [cache.mount_dir], args.workers)
+        except KeyboardInterrupt:
+            cache.save()
+            return 130
+        print(f"Cached {stats['files']} file(s), {stats['bytes'] / (1 << 20):.1f} MB "
+              f"({stats['fetched']} fetched) in {stats['seconds']:.1f}s; {stats['errors']} error(s)")
+        return 1 if stats["errors"] else 0
+
+    status = 0
+    for path in args.paths:
+        try:
+            print(cache.get(path))
+        except (OSError, SSHFSError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+    cache.save()
+    return status
+
+
+def run_transfer(args):
+    """Bulk directory transfer; returns a process exit code"""
+    config = find_profile(args.profile)
+    if config is None:
+        return 2
+    if not prompt_password(config, args.profile):
+        return 2
+    transfer = Transfer(config, args.direction, args.source, args.destination, args.workers,
+                        use_rsync=args.rsync, fresh=args.fresh)
+    result = {}
+
+    def target():
+        try:
+            result["progress"] = transfer.run(Operation(None, "Transfer"))
+        except (OSError, SSHFSError, OperationCancelled) as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    interactive = sys.stdout.isatty()
+    try:
+        while thread.is_alive():
+            thread.join(1 if interactive else 10)
+            if thread.is_alive() and transfer.started:
+                line = format_transfer_progress(transfer.progress())
+                print(f"\r{line}\033[K" if interactive else line, end="" if interactive else "\n", flush=True)
+    except KeyboardInterrupt:
+        transfer.cancel()
+        thread.join()
+        print("\nTransfer cancelled; run the same command again to resume", file=sys.stderr)
+        return 130
+    if interactive:
+        print()
+    if "error" in result:
+        print(f"Transfer failed: {result['error']}", file=sys.stderr)
+        return 1
+    print(format_transfer_progress(result["progress"]))
+    for rel, error in transfer.errors:
+        print(f"  {rel}: {error}", file=sys.stderr)
+    return 1 if transfer.errors else 0
+
+
+PROBE_SORT_KEYS = {
+    "latency": lambda r: (probe_latency(r) is None, probe_latency(r) or 0),
+    "name": lambda r: r["name"].lower(),
+    "status": lambda r: (r["status"].startswith("ok"), r["status"], r["name"].lower()),
+}
+
+
+def run_probe(args):
+    """Probe saved hosts concurrently; returns a process exit code"""
+    store = ProfileStore()
+    profiles = store.search(" ".join(args.query)) if args.query else store.all()
+    profiles = [p for p in profiles if p.get("server", "").strip()]
+    if not profiles:
+        print("No matching profiles")
+        return 0
+    started = time.perf_counter()
+    try:
+        results = probe_fleet(None, profiles, args.concurrency, args.timeout, args.auth)
+    except KeyboardInterrupt:
+        return 130
+    results.sort(key=PROBE_SORT_KEYS[args.sort])
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        rows = [(r["name"], r["host"], r["status"], format_ms(r["dns_ms"]), format_ms(r["connect_ms"]),
+                 format_ms(r["banner_ms"]), format_ms(r["auth_ms"]), r["banner"] or r["error"])
+                for r in results]
+        print_table(("Profile", "Host", "Status", "DNS ms", "Connect ms", "Banner ms", "Auth ms", "Server"), rows)
+        down = sum(1 for r in results if not r["status"].startswith("ok"))
+        print(f"\n{len(results) - down} of {len(results)} reachable in {time.perf_counter() - started:.1f}s")
+    return 1 if any(not r["status"].startswith("ok") for r in results) else 0
+
+
+def run_batch_mount(args):
+    """Headless batch mount; returns a process exit code"""
+    profiles = startup_profiles(ProfileStore().all())
+    if not profiles:
+        print("No saved profiles are marked 'Mount on startup'")
+        return 0
+    # Ask up front, once per host; profiles still without a password are skipped
+    for config in profiles:
+        if sys.stdin.isatty():
+            prompt_password(config, config.get("name", "Unknown"))
+    print(f"Mounting {len(profiles)} startup profile(s), {args.concurrency} at a time...")
+    batch = BatchMount(profiles, concurrency=args.concurrency, timeout=args.timeout,
+                       on_progress=lambda op, message: print(message),
+                       pool=ControlMasterPool() if args.shared_connections else None)
+    try:
+        batch.run()
+    except KeyboardInterrupt:
+        batch.cancel()
+        return 130
+    print(batch.summary())
+    return 1 if batch.failed() else 0
+
+
+def run_metrics(args):
+    """Sample mount metrics and print, write or serve them; returns a process exit code"""
+    registry = MountRegistry(profiles=ProfileStore().all)
+    registry.refresh()
+    sampler = MetricsSampler(registry, interval=args.interval, textfile=args.textfile)
+    if args.prometheus:
+        sampler.sample()
+        sys.stdout.write(sampler.prometheus())
+        return 0
+    if args.listen:
+        host, _, port = args.listen.rpartition(":")
+        try:
+            server = serve_metrics(sampler, (host, int(port)))
+        except (OSError, ValueError) as e:
+            print(f"Cannot listen on {args.listen}: {e}", file=sys.stderr)
+            return 2
+        print(f"Serving metrics on http://{host or '0.0.0.0'}:{server.server_address[1]}/metrics", file=sys.stderr)
+
+    rounds = 0
+    try:
+        while True:
+            registry.refresh()
+            latest = sampler.sample()
+            rounds += 1
+            if not args.quiet and rounds > 1:
+                mounts = registry.snapshot()
+                rows = [(key, ((mounts.get(key) or {}).get("profile") or {}).get("name", "-"),
+                         format_rate(m["read_bps"]), format_rate(m["write_bps"]),
+                         f"{m['requests_ps']:.0f}" if m["requests_ps"] is not None else "-",
+                         str(m["waiting"]) if m["waiting"] is not None else "-",
+                         f"{m['rtt'] * 1000:.0f} ms" if m["rtt"] is not None else "-")
+                        for key, m in sorted(latest.items())]
+                print(time.strftime("%H:%M:%S"))
+                print_table(("Mount Point", "Profile", "Read", "Write", "Req/s", "Waiting", "RTT"), rows)
+                print(flush=True)
+            if args.count and rounds > args.count:
+                return 0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+def run_automount(args):
+    """Run the idle unmount / mount on access policy headlessly; returns a process exit code"""
+    store = ProfileStore()
+    profiles = [p for p in store.all() if profile_idle_minutes(p) and p.get("local_dir")]
+    if not profiles:
+        print("No saved profiles have an idle unmount time")
+        return 0
+    for config in profiles:
+        if sys.stdin.isatty():
+            prompt_password(config, config.get("name", "Unknown"))
+
+    engine = OperationEngine()
+    engine.on_progress = lambda op, message: print(message)
+    registry = MountRegistry(profiles=store.all)
+    registry.refresh()
+    registry.start()
+    idle = IdleManager(engine, registry, store.all, pool=ControlMasterPool(), interval=args.interval,
+                       on_event=lambda message, level, source: print(message, file=sys.stderr if level == "ERROR" else sys.stdout))
+    idle.start()
+    # Profiles not mounted yet are mounted on first access too
+    mounted = registry.snapshot()
+    # A mount point that can't be watched only loses that profile
+    for config in profiles:
+        if idle.disabled:
+            break
+        if mount_key(config["local_dir"]) not in mounted:
+            idle.arm(config)
+    try:
+        if idle.disabled:
+            engine.dispatch()
+            return 1
+        print(f"Watching {len(profiles)} profile(s); press Ctrl-C to stop")
+        while True:
+            engine.dispatch(block=True, timeout=1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        idle.stop()
+        registry.stop()
+        engine.shutdown()
+    return 0
+
+
+def run_supervise(args):
+    """Run the mount supervisor, or query or control a running one; returns a process exit code"""
+    for command in ("start", "stop", "restart"):
+        name = getattr(args, command)
+        if name:
+            try:
+                # Stopping or restarting waits for up to two unmount attempts
+                response = supervisor_request(command, timeout=2 * args.timeout + 5, profile=name)
+            except SSHFSError as e:
+                print(e, file=sys.stderr)
+                return 1
+            if response is None:
+                print("No mount supervisor is running", file=sys.stderr)
+                return 2
+            if not response.get("ok"):
+                print(response.get("error"), file=sys.stderr)
+                return 1
+            return 0
+    if args.status:
+        try:
+            response = supervisor_request("status")
+        except SSHFSError as e:
+            print(e, file=sys.stderr)
+            return 1
+        if response is None:
+            print("No mount supervisor is running", file=sys.stderr)
+            return 2
+        rows = [(m["profile"], m["local_dir"], m["status"], str(m["pid"] or ""),
+                 format_duration(m["uptime"]) if m["uptime"] is not None else "", str(m["restarts"]),
+                 m["error"])
+                for m in response["mounts"]]
+        print_table(("Profile", "Mount point", "Status", "Pid", "Up", "Restarts", "Last output"), rows)
+        return 0
+
+    store = ProfileStore()
+    profiles = store.search(" ".join(args.query)) if args.query else startup_profiles(store.all())
+    if not profiles:
+        print("No profiles to supervise; name some or mark them 'Mount on startup'")
+        return 0
+    for config in profiles:
+        if sys.stdin.isatty():
+            prompt_password(config, config.get("name", "Unknown"))
+
+    supervisor = Supervisor(timeout=args.timeout)
+    try:
+        supervisor.serve()
+    except (SSHFSError, OSError) as e:
+        print(f"Cannot start the supervisor: {e}", file=sys.stderr)
+        return 1
+    # systemctl stop sends SIGTERM; unmount cleanly as for Ctrl-C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        for config in profiles:
+            try:
+                supervisor.start(config)
+            except SSHFSError as e:
+                print(f"Skipping {config.get('name')}: {e}", file=sys.stderr)
+        print(f"Supervising {len(supervisor.profiles)} profile(s); status socket {supervisor.socket_path}",
+              flush=True)
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.shutdown()
+    return 0
+
+
+def _systemctl(*args):
+    try:
+        process = subprocess.run(["systemctl", "--user", *args], stdin=subprocess.DEVNULL,
+                                 capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"systemctl --user {' '.join(args)} failed: {e}", file=sys.stderr)
+        return 1
+    if process.returncode != 0:
+        print(process.stderr.strip(), file=sys.stderr)
+    return process.returncode
+
+
+def run_systemd(args):
+    """Print, install or remove systemd --user units; returns a process exit code"""
+    if args.supervisor:
+        units = [systemd_supervisor_unit(args.query)]
+    else:
+        store = ProfileStore()
+        profiles = store.search(" ".join(args.query)) if args.query else startup_profiles(store.all())
+        units = []
+        for config in profiles:
+            if config.get("auth_method") == "password":
+                print(f"Skipping {config.get('name')}: a unit cannot ask for a password; "
+                      "use key authentication or the supervisor", file=sys.stderr)
+                continue
+            units.extend(systemd_mount_units(config))
+    if not units:
+        print("No units to generate; name some profiles or mark them 'Mount on startup'")
+        return 0
+    names = [name for name, _ in units]
+
+    if args.remove:
+        status = _systemctl("disable", "--now", *names)
+        for name in names:
+            try:
+                (SYSTEMD_USER_DIR / name).unlink()
+            except FileNotFoundError:
+                pass
+        _systemctl("daemon-reload")
+        print(f"Removed {len(names)} unit(s)")
+        return 1 if status else 0
+    if not args.install:
+        for name, text in units:
+            print(f"# {SYSTEMD_USER_DIR / name}\n{text}")
+        return 0
+    SYSTEMD_USER_DIR.mkdir(parents=True, exist_ok=True)
+    for name, text in units:
+        (SYSTEMD_USER_DIR / name).write_text(text)
+    if _systemctl("daemon-reload") or _systemctl("enable", "--now", *names):
+        return 1
+    print(f"Installed and started {len(names)} unit(s): {' '.join(names)}")
+    return 0
+
+
+def run_trace(args):
+    """Print recent spans from the trace file, or trace one mount; returns a process exit code"""
+    if not args.profile:
+        roots, children = trace_tree(read_trace())
+        if not roots:
+            print(f"No timings recorded yet in {TRACE_FILE}")
+            return 0
+
+        def show(span, depth):
+            status = "" if span.get("status") == "ok" else f" [{span.get('status')}]"
+            name = "  " * depth + (span.get("operation") or span.get("name", ""))
+            print(f"{name:<36} {span.get('ms', 0):>10.1f} ms{status}  {span_details(span)}".rstrip())
+            for child in children.get(span.get("span"), []):
+                show(child, depth + 1)
+
+        for root in roots[-args.last:]:
+            print(f"{datetime.fromtimestamp(root.get('start', 0)):%Y-%m-%d %H:%M:%S}")
+            show(root, 1)
+        return 0
+
+    config = find_profile(args.profile)
+    if config is None:
+        return 2
+    if not prompt_password(config, args.profile):
+        return 2
+    try:
+        phases = trace_mount(Operation(None, f"Trace {args.profile}"), config, args.timeout)
+    except (SSHFSError, OSError, OperationCancelled) as e:
+        print(f"Trace failed: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    rows = [(name, f"{offset * 1000:.1f}", f"{ms:.1f}") for name, offset, ms in phases]
+    rows.append(("total", "", f"{sum(ms for _, _, ms in phases):.1f}"))
+    print_table(("Phase", "Starts at ms", "ms"), rows)
+    return 0
+
+
+def start_profiling():
+    """Profile the calling thread and every thread started from now on
+
+    Returns stop(path), which writes the merged stats to path. Python 3.12+
+    allows only one active profiler, so there only the calling thread is
+    profiled.
+    """
+    import cProfile
+    profilers = [cProfile.Profile()]
+    lock = threading.Lock()
+
+    def profile_thread(*args):
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return
+        with lock:
+            profilers.append(profiler)
+
+    profilers[0].enable()
+    threading.setprofile(profile_thread)
+
+    def stop(path):
+        import pstats
+        threading.setprofile(None)
+        profilers[0].disable()
+        stats = None
+        with lock:
+            for profiler in profilers:
+                try:
+                    stats = pstats.Stats(profiler) if stats is None else stats.add(profiler)
+                except TypeError:
+                    # Nothing was recorded on that thread
+                    continue
+        if stats is not None:
+            stats.dump_stats(path)
+        return stats
+
+    return stop
+
+
+COMMANDS = {
+    "mount": run_mount,
+    "unmount": run_unmount,
+    "status": run_status,
+    "list": run_list,
+    "batch": run_batch_mount,
+    "benchmark": run_headless_benchmark,
+    "metrics": run_metrics,
+    "copy": run_copy,
+    "cache": run_cache,
+    "transfer": run_transfer,
+    "probe": run_probe,
+    "automount": run_automount,
+    "supervise": run_supervise,
+    "systemd": run_systemd,
+    "trace": run_trace,
+}
+
+
+def run_gui(args):
+    """Load tkinter and run the GUI"""
+    load_tkinter()
     root = tk.Tk()
     app = SSHFSGui(root)
+    
+    def on_ready():
+        ready_ms = (time.perf_counter() - _IMPORT_STARTED) * 1000
+        record_startup("gui", ready_ms, ready_ms)
+        if args.timing:
+            print(f"GUI ready in {ready_ms:.1f} ms", file=sys.stderr)
+    
+    root.after_idle(on_ready)
     root.mainloop()
+    return 0
+
+
+def main(argv=None):
+    """Main entry point"""
+    ready = time.perf_counter()
+    args = parse_args(argv)
+    stop_profiling = start_profiling() if args.profile_output else None
+    command = COMMANDS.get(args.command)
+    try:
+        if command is None:
+            code = run_gui(args)
+        else:
+            code = run_command(command, args, ready)
+    finally:
+        if stop_profiling is not None:
+            stop_profiling(args.profile_output)
+            print(f"Profile written to {args.profile_output}; read it with: python3 -m pstats {args.profile_output}",
+                  file=sys.stderr)
+    sys.exit(code)
+
+
+def run_command(command, args, ready):
+    """Run a command line subcommand, recording how long it took"""
+    try:
+        return command(args)
+    except BrokenPipeError:
+        # Output piped into e.g. `head`; not an error
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    finally:
+        ready_ms = (ready - _IMPORT_STARTED) * 1000
+        total_ms = (time.perf_counter() - _IMPORT_STARTED) * 1000
+        record_startup(args.command, ready_ms, total_ms)
+        if args.timing:
+            print(f"{args.command}: imports {ready_ms:.1f} ms, total {total_ms:.1f} ms", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,760 @@
+#!/usr/bin/env python3
+"""
+Performance harness for sshfs_gui.py
+
+Runs a scripted workload of many profiles against stand-in ssh, sshfs and
+fusermount scripts, or against a throwaway OpenSSH server on localhost,
+and records timings as JSON:
+
+    ./sshfs_harness.py                          # 50 profiles, stub binaries
+    ./sshfs_harness.py --sshd --profiles 20     # real sshd with throwaway keys
+    ./sshfs_harness.py -o new.json --baseline old.json
+
+Everything runs under a temporary HOME and XDG_RUNTIME_DIR, so saved
+profiles, logs, control sockets and mounts of the real user are never
+touched. Stub mounts are recorded in a fake mount table instead of the
+kernel's, so no FUSE or root is needed. With --baseline, timings that got
+slower than the tolerance are listed and the exit status is 1.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import getpass
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+# Stand-ins for the real binaries. Each ssh handshake phase takes
+# HARNESS_SSH_DELAY seconds and prints what `ssh -v` would, and a mount
+# takes another HARNESS_MOUNT_DELAY seconds for FUSE setup. Connections
+# multiplexed over an existing ControlPath skip the handshake, and hosts
+# named down-* refuse every connection.
+SSH_STUB = r"""#!/bin/sh
+# ssh stand-in written by sshfs_harness.py
+control= master= check= verbose= target= prev=
+for arg; do
+    case $prev in
+        -o) case $arg in
+                ControlPath=*) control=${arg#ControlPath=} ;;
+                ControlMaster=yes) master=1 ;;
+            esac ;;
+        -O) check=1 ;;
+    esac
+    case $arg in
+        -v) verbose=1 ;;
+        *@*) [ -z "$target" ] && target=$arg ;;
+    esac
+    prev=$arg
+done
+[ -n "$check" ] && { [ -e "$control" ]; exit; }
+host=${target#*@}
+
+phase() {
+    sleep "$HARNESS_SSH_DELAY"
+    if [ -n "$verbose" ]; then echo "debug1: $1" >&2; fi
+}
+
+if [ -z "$control" ] || [ -n "$master" ] || [ ! -e "$control" ]; then
+    [ -n "$verbose" ] && echo "OpenSSH_9.6p1, OpenSSL 3.0.13 30 Jan 2024" >&2
+    case $host in
+        down-*) sleep "$HARNESS_SSH_DELAY"
+                echo "ssh: connect to host $host port 22: Connection refused" >&2
+                exit 255 ;;
+    esac
+    phase "Connecting to $host [127.0.0.1] port 22."
+    phase "Connection established."
+    phase "Remote protocol version 2.0, remote software version OpenSSH_9.6"
+    phase "SSH2_MSG_NEWKEYS received"
+    if [ -n "$SSH_ASKPASS" ]; then
+        secret=$("$SSH_ASKPASS" "$target's password: ")
+        [ -n "$secret" ] || { echo "$target: Permission denied (password)." >&2; exit 255; }
+    fi
+    phase "Authenticated to $host ([127.0.0.1]:22) using \"publickey\"."
+fi
+# ControlPersist puts the master in the background
+[ -n "$master" ] && { : > "$control"; exit 0; }
+
+eval "command=\${$#}"
+[ "$command" = "$target" ] && exit 0
+exec sh -c "$command"
+"""
+
+SSHFS_STUB = r"""#!/bin/sh
+# sshfs stand-in written by sshfs_harness.py
+[ "$1" = "--version" ] && { echo "SSHFS version 3.7.3"; exit 0; }
+remote=$1 local=$2
+host=${remote#*@} host=${host%%:*}
+foreground= password= verbose= control= prev=
+for arg; do
+    case $prev in
+        -o) case $arg in
+                password_stdin) password=1 ;;
+                *debug*|LogLevel=DEBUG*) verbose=1 ;;
+                ControlPath=*) control=${arg#ControlPath=} ;;
+            esac ;;
+    esac
+    case $arg in
+        -f) foreground=1 ;;
+        -d) verbose=1 foreground=1 ;;
+    esac
+    prev=$arg
+done
+
+phase() {
+    sleep "$HARNESS_SSH_DELAY"
+    if [ -n "$verbose" ]; then echo "debug1: $1" >&2; fi
+}
+
+[ -d "$local" ] || { echo "fuse: bad mount point \`$local': No such file or directory" >&2; exit 1; }
+if [ -n "$password" ]; then
+    read -r secret || secret=
+    [ -n "$secret" ] || { echo "$remote: Permission denied (password)." >&2; exit 1; }
+fi
+case $host in
+    down-*) sleep "$HARNESS_SSH_DELAY"; echo "read: Connection reset by peer" >&2; exit 1 ;;
+esac
+if [ -z "$control" ] || [ ! -e "$control" ]; then
+    phase "Connecting to $host [127.0.0.1] port 22."
+    phase "Connection established."
+    phase "Remote protocol version 2.0, remote software version OpenSSH_9.6"
+    phase "SSH2_MSG_NEWKEYS received"
+    phase "Authenticated to $host ([127.0.0.1]:22) using \"publickey\"."
+fi
+phase "Server version: 3"
+sleep "$HARNESS_MOUNT_DELAY"
+
+(
+    flock 9
+    if awk -v d="$local" '$5 == d { found = 1 } END { exit !found }' "$HARNESS_MOUNTINFO"; then
+        echo "fuse: mountpoint is not empty" >&2
+        exit 1
+    fi
+    echo "$$ 1 0:$$ / $local rw,nosuid,nodev,relatime - fuse.sshfs $remote rw,user_id=$(id -u),group_id=$(id -g)" >> "$HARNESS_MOUNTINFO"
+) 9>"$HARNESS_MOUNTINFO.lock" || exit 1
+
+if [ -n "$foreground" ]; then
+    trap 'exit 0' TERM INT
+    while awk -v p="$$" '$1 == p { found = 1 } END { exit !found }' "$HARNESS_MOUNTINFO"; do
+        sleep 0.05
+    done
+fi
+exit 0
+"""
+
+UNMOUNT_STUB = r"""#!/bin/sh
+# fusermount/umount stand-in written by sshfs_harness.py
+for dir; do :; done
+(
+    flock 9
+    if ! awk -v d="$dir" '$5 == d { found = 1 } END { exit !found }' "$HARNESS_MOUNTINFO"; then
+        echo "$(basename "$0"): entry for $dir not found in /etc/mtab" >&2
+        exit 1
+    fi
+    awk -v d="$dir" '$5 != d' "$HARNESS_MOUNTINFO" > "$HARNESS_MOUNTINFO.tmp"
+    mv "$HARNESS_MOUNTINFO.tmp" "$HARNESS_MOUNTINFO"
+) 9>"$HARNESS_MOUNTINFO.lock"
+"""
+
+SSHD_CONFIG = """Port {port}
+ListenAddress 127.0.0.1
+HostKey {root}/host_key
+PidFile {root}/sshd.pid
+AuthorizedKeysFile {root}/authorized_keys
+StrictModes no
+UsePAM no
+PasswordAuthentication no
+KbdInteractiveAuthentication no
+Subsystem sftp internal-sftp
+LogLevel ERROR
+"""
+
+SSH_CLIENT_CONFIG = """Host *
+    IdentityFile {root}/client_key
+    StrictHostKeyChecking no
+    UserKnownHostsFile /dev/null
+    LogLevel ERROR
+"""
+
+HARNESS_PASSWORD = "harness"
+SSHD_START_TIMEOUT = 10
+GUI_STEP_TIMEOUT = 60
+
+# Timings compared against a baseline; max and min are too noisy
+BASELINE_STATS = ("p50", "p95", "mean")
+
+
+class HarnessError(Exception):
+    """The harness could not set up its environment"""
+    pass
+
+
+def write_script(path, text):
+    path.write_text(text)
+    path.chmod(0o755)
+
+
+def write_stubs(bin_dir, names=("ssh", "sshfs", "fusermount", "fusermount3", "umount")):
+    """Write the stand-in binaries that are asked for into bin_dir"""
+    scripts = {"ssh": SSH_STUB, "sshfs": SSHFS_STUB, "fusermount": UNMOUNT_STUB,
+               "fusermount3": UNMOUNT_STUB, "umount": UNMOUNT_STUB}
+    for name in names:
+        write_script(bin_dir / name, scripts[name])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_sshd(root, bin_dir):
+    """Start a throwaway OpenSSH server on localhost and return (process, port)
+
+    ssh on PATH is replaced by a wrapper that trusts the server's host key and
+    authenticates with the throwaway client key, so sshfs uses it as well.
+    """
+    sshd = shutil.which("sshd") or next(
+        (path for path in ("/usr/sbin/sshd", "/usr/local/sbin/sshd") if os.path.exists(path)), None)
+    ssh = shutil.which("ssh")
+    keygen = shutil.which("ssh-keygen")
+    if not (sshd and ssh and keygen):
+        raise HarnessError("--sshd needs sshd, ssh and ssh-keygen")
+
+    for name in ("host_key", "client_key"):
+        subprocess.run([keygen, "-q", "-t", "ed25519", "-N", "", "-f", str(root / name)],
+                       check=True, stdin=subprocess.DEVNULL)
+    shutil.copy(root / "client_key.pub", root / "authorized_keys")
+    port = free_port()
+    (root / "sshd_config").write_text(SSHD_CONFIG.format(port=port, root=root))
+    (root / "ssh_config").write_text(SSH_CLIENT_CONFIG.format(root=root))
+    write_script(bin_dir / "ssh", f'#!/bin/sh\nexec {ssh} -F {root}/ssh_config "$@"\n')
+
+    log = open(root / "sshd.log", "wb")
+    process = subprocess.Popen([sshd, "-D", "-e", "-f", str(root / "sshd_config")],
+                               stdin=subprocess.DEVNULL, stdout=log, stderr=log)
+    deadline = time.monotonic() + SSHD_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise HarnessError(f"sshd exited: {(root / 'sshd.log').read_text().strip()}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise HarnessError(f"sshd did not start listening on port {port}")
+
+
+def make_profiles(g, count, hosts, root, port, key_file, password_every):
+    """Saved profiles spread over hosts, cycling through the tuning profiles"""
+    tunings = list(g.TUNING_PROFILES)
+    profiles = []
+    for i in range(count):
+        password = password_every and i % password_every == password_every - 1
+        profiles.append({
+            "name": f"harness-{i:04d}",
+            "group": f"group{i % 5}",
+            "tags": ["harness", f"rack{i % 7}"],
+            "server": hosts[i % len(hosts)],
+            "port": str(port),
+            "username": getpass.getuser(),
+            "auth_method": "password" if password else "key",
+            "key_file": "" if password else str(key_file),
+            "remote_dir": str(root / "remote"),
+            "local_dir": str(root / "mnt" / f"harness-{i:04d}"),
+            "additional_options": "",
+            "tuning_profile": tunings[i % len(tunings)],
+            "connections": 1,
+            "allow_other": False,
+            "mount_on_startup": False,
+            "auto_reconnect": False,
+        })
+    return profiles
+
+
+def summarize(samples):
+    """Count, mean and percentiles in ms of a list of durations in seconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {"count": len(ordered), "mean": ms(sum(ordered) / len(ordered)), "p50": ms(percentile(50)),
+            "p95": ms(percentile(95)), "max": ms(ordered[-1])}
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def run_op(engine, name, func, *args):
+    """Run func through the engine like the GUI does and wait for it
+
+    Returns (seconds, error), error being None on success.
+    """
+    outcome = []
+    started = time.perf_counter()
+    engine.submit(name, func, *args, on_done=lambda result: outcome.append(None), on_error=outcome.append)
+    while not outcome:
+        engine.dispatch(block=True, timeout=0.5)
+    return time.perf_counter() - started, outcome[0]
+
+
+class Samples:
+    """Durations and errors of one kind of operation"""
+
+    def __init__(self):
+        self.seconds = []
+        self.errors = []
+
+    def add(self, seconds, error=None):
+        if error is None:
+            self.seconds.append(seconds)
+        else:
+            self.errors.append(str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__)
+
+    def result(self):
+        result = summarize(self.seconds)
+        if self.errors:
+            result["errors"] = len(self.errors)
+            result["first_error"] = self.errors[0]
+        return result
+
+
+def bench_config(g, profiles):
+    """Profile store saves, a cold load and type-ahead searches"""
+    store = g.ProfileStore(g.CONFIG_FILE)
+    saves = [timed(store.put, dict(profile)) for profile in profiles]
+    loads = [timed(g.ProfileStore, g.CONFIG_FILE) for _ in range(5)]
+    queries = ["harness", "harness-00", "group1", "rack3", "host", profiles[-1]["name"], "nomatch"]
+    searches = [timed(store.search, query) for query in queries for _ in range(10)]
+    size = os.path.getsize(g.CONFIG_FILE)
+    return {"save": summarize(saves), "load": summarize(loads), "search": summarize(searches),
+            "bytes": size}
+
+
+def bench_commands(g, profiles):
+    """Command line building for every profile"""
+    sshfs = [timed(g.build_sshfs_command, profile) for profile in profiles]
+    ssh = [timed(g.build_test_command, profile) for profile in profiles]
+    return {"sshfs": summarize(sshfs), "ssh": summarize(ssh)}
+
+
+def bench_tests(g, engine, profiles, pool):
+    """Connection tests without shared connections, then twice with them
+
+    The first pooled round opens a master per host, the second reuses them.
+    """
+    rounds = {"direct": (Samples(), None), "pooled_first": (Samples(), pool), "pooled_reused": (Samples(), pool)}
+    for samples, test_pool in rounds.values():
+        for config in profiles:
+            samples.add(*run_op(engine, f"Test {config['name']}", g.test_profile, config, test_pool))
+    return {name: samples.result() for name, (samples, _) in rounds.items()}
+
+
+def bench_mounts(g, engine, profiles, pool, timeout):
+    """One profile at a time: mount, then unmount"""
+    mounts, unmounts = Samples(), Samples()
+    for config in profiles:
+        os.makedirs(config["local_dir"], exist_ok=True)
+        seconds, error = run_op(engine, f"Mount {config['name']}", g.mount_profile, config, timeout, pool)
+        mounts.add(seconds, error)
+        if error is None:
+            unmounts.add(*run_op(engine, f"Unmount {config['name']}", g.unmount_path, config["local_dir"]))
+    return {"mount": mounts.result(), "unmount": unmounts.result()}
+
+
+def bench_batch(g, profiles, concurrency, pool, timeout):
+    """Mount every profile at once, then unmount them all in parallel
+
+    The event queue is drained every EVENT_POLL_MS like the GUI does, and the
+    time spent in each dispatch is what the Tk thread would be blocked for.
+    """
+    batch = g.BatchMount(profiles, concurrency=concurrency, timeout=timeout, pool=pool)
+    dispatches = []
+    batch.start()
+    while not batch.done:
+        time.sleep(g.EVENT_POLL_MS / 1000)
+        started = time.perf_counter()
+        if batch.engine.dispatch():
+            dispatches.append(time.perf_counter() - started)
+
+    statuses = {}
+    for row in batch.results:
+        statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+    mounted = [row["name"] for row in batch.results if row["status"] == "mounted"]
+    table = g.read_mount_table()
+    result = {
+        "elapsed_ms": round(batch.elapsed * 1000, 3),
+        "mounts_per_second": round(len(mounted) / batch.elapsed, 2) if batch.elapsed else 0,
+        "mount": summarize([row["seconds"] for row in batch.results if row["status"] == "mounted"]),
+        "dispatch": summarize(dispatches),
+        "statuses": statuses,
+        "in_mount_table": sum(1 for config in profiles if g.mount_key(config["local_dir"]) in table),
+    }
+    failed = batch.failed()
+    if failed:
+        result["first_error"] = f"{failed[0]['name']}: {failed[0]['error']}"
+
+    engine = g.OperationEngine(max_workers=concurrency)
+    unmounts = Samples()
+    started = time.perf_counter()
+    for config in profiles:
+        if config["name"] in mounted:
+            engine.submit(f"Unmount {config['name']}", g.unmount_path, config["local_dir"],
+                          on_done=lambda process: unmounts.add(0), on_error=lambda error: unmounts.add(0, error))
+    while len(unmounts.seconds) + len(unmounts.errors) < len(mounted):
+        engine.dispatch(block=True, timeout=0.5)
+    result["unmount_elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    if unmounts.errors:
+        result["unmount_errors"] = len(unmounts.errors)
+    engine.shutdown()
+    return result
+
+
+class DialogRecorder:
+    """Stands in for tkinter.messagebox so dialogs don't block the harness"""
+
+    def __init__(self):
+        self.shown = []
+
+    def _show(self, kind, title, message):
+        self.shown.append((kind, title, message))
+
+    def showinfo(self, title=None, message=None, **options):
+        self._show("info", title, message)
+
+    def showwarning(self, title=None, message=None, **options):
+        self._show("warning", title, message)
+
+    def showerror(self, title=None, message=None, **options):
+        self._show("error", title, message)
+
+    def askyesno(self, title=None, message=None, **options):
+        self._show("question", title, message)
+        return True
+
+    askokcancel = askyesno
+
+
+def bench_gui(g, profiles, pool_dir, fake_mounts):
+    """Drive SSHFSGui through its own button handlers
+
+    Loads each profile from the list, then tests, mounts and unmounts it,
+    timing each step up to the dialog it ends with. A 10 ms after() ticker
+    measures how late the Tk event loop runs while that happens.
+    """
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        return {"skipped": "no display"}
+    g.load_tkinter()
+    try:
+        root = g.tk.Tk()
+    except g.tk.TclError as e:
+        return {"skipped": str(e)}
+    root.withdraw()
+    dialogs = DialogRecorder()
+    g.messagebox = dialogs
+
+    started = time.perf_counter()
+    app = g.SSHFSGui(root)
+    root.update()
+    result = {"startup_ms": round((time.perf_counter() - started) * 1000, 3)}
+    app.pool.control_dir = Path(pool_dir)
+
+    lags = []
+
+    def tick(due):
+        now = time.perf_counter()
+        lags.append(max(now - due, 0))
+        root.after(10, tick, now + 0.01)
+
+    root.after(10, tick, time.perf_counter() + 0.01)
+
+    def pump_until(done):
+        deadline = time.monotonic() + GUI_STEP_TIMEOUT
+        while not done():
+            if time.monotonic() > deadline:
+                raise HarnessError("GUI step timed out")
+            root.update()
+            # A stub mount table can't signal changes the way the kernel's does
+            if fake_mounts:
+                app.registry.refresh()
+            time.sleep(0.001)
+
+    def click(handler, samples):
+        shown = len(dialogs.shown)
+        started = time.perf_counter()
+        handler()
+        pump_until(lambda: len(dialogs.shown) > shown)
+        kind, title, message = dialogs.shown[-1]
+        samples.add(time.perf_counter() - started, None if kind == "info" else f"{title}: {message}")
+        return kind == "info"
+
+    steps = {name: Samples() for name in ("load", "test", "mount", "unmount")}
+
+    def filter_profiles(query):
+        app.profile_filter.set(query)
+        app.populate_recent_servers()
+
+    filters = [timed(filter_profiles, query) for query in ("harness", "group2", "rack5", "")]
+    for config in profiles:
+        # Mounting saves the profile as most recently used, which reorders the list
+        index = next((i for i, p in enumerate(app.visible_profiles) if p["name"] == config["name"]), None)
+        if index is None or index >= app.recent_listbox.size():
+            steps["load"].add(0, f"{config['name']} is not in the profile list")
+            continue
+        started = time.perf_counter()
+        app.recent_listbox.selection_clear(0, g.tk.END)
+        app.recent_listbox.selection_set(index)
+        app.load_recent_server(None)
+        root.update()
+        steps["load"].add(time.perf_counter() - started)
+
+        click(app.test_connection, steps["test"])
+        if click(app.mount_filesystem, steps["mount"]):
+            pump_until(lambda: app.registry.is_mounted(config["local_dir"]))
+            click(app.unmount_filesystem, steps["unmount"])
+
+    result.update({name: samples.result() for name, samples in steps.items()})
+    result["filter"] = summarize(filters)
+    result["event_loop_lag"] = summarize(lags)
+    app.on_close()
+    return result
+
+
+def bench_spans(g):
+    """Per-name totals of the spans sshfs_gui traced during the run"""
+    durations = {}
+    for span in g.read_trace(g.TRACE_FILE, limit=10 ** 6):
+        durations.setdefault(span.get("name"), []).append(span.get("ms", 0) / 1000)
+    return {name: summarize(samples) for name, samples in sorted(durations.items()) if name}
+
+
+def flatten(data, prefix=""):
+    """Numeric leaves of nested dicts keyed by dotted path"""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def is_timing(path):
+    name = path.rsplit(".", 1)[-1]
+    return name in BASELINE_STATS or name.endswith("_ms")
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Timings that are more than tolerance (and min_delta ms) slower than the baseline"""
+    old = flatten(baseline)
+    regressions = []
+    for path, value in flatten(results).items():
+        if path.startswith("harness.") or not is_timing(path) or path not in old:
+            continue
+        if value > old[path] * (1 + tolerance) and value - old[path] >= min_delta:
+            regressions.append((path, old[path], value))
+    return regressions
+
+
+def print_summary(results, stream):
+    width = 0
+    rows = []
+    for path, value in flatten(results).items():
+        if path.startswith("harness."):
+            continue
+        if path.rsplit(".", 1)[-1] in ("p50", "p95") or path.endswith("_ms") or "error" in path:
+            rows.append((path, value))
+            width = max(width, len(path))
+    for path, value in rows:
+        print(f"{path:<{width}}  {value:>12.3f}", file=stream)
+
+
+def run_workload(g, args, root, port, key_file, fake_mounts):
+    hosts = [f"down-{i}.example" for i in range(args.down)] if args.down else []
+    if args.sshd:
+        hosts = ["127.0.0.1", "localhost"][:args.hosts] + hosts
+    else:
+        hosts = [f"host{i:03d}.example" for i in range(args.hosts)] + hosts
+    profiles = make_profiles(g, args.profiles, hosts, root, port, key_file,
+                             0 if args.sshd else args.password_every)
+    for config in profiles:
+        config["password"] = HARNESS_PASSWORD if config["auth_method"] == "password" else ""
+        g.session_credentials.remember(config)
+        del config["password"]
+
+    results = {"harness": {
+        "mode": "sshd" if args.sshd else "stub",
+        "sshfs": "stub" if fake_mounts else shutil.which("sshfs"),
+        "profiles": args.profiles, "hosts": len(hosts), "sample": args.sample,
+        "mount_delay_ms": args.mount_delay, "ssh_delay_ms": args.ssh_delay,
+        "python": platform.python_version(), "started": datetime.now().isoformat(timespec="seconds"),
+    }}
+    pool = g.ControlMasterPool(control_dir=root / "control", idle_timeout=60)
+    engine = g.OperationEngine()
+    if args.verbose:
+        engine.on_progress = lambda op, message: print(f"[{op.source}] {message}", file=sys.stderr)
+    sample = profiles[:args.sample]
+    timeout = args.timeout or g.MOUNT_TIMEOUT
+
+    steps = [
+        ("config", lambda: bench_config(g, profiles)),
+        ("commands", lambda: bench_commands(g, profiles)),
+        ("test", lambda: bench_tests(g, engine, sample, pool)),
+        ("mount", lambda: bench_mounts(g, engine, sample, pool, timeout)),
+    ]
+    for concurrency in args.concurrency:
+        steps.append((f"batch.c{concurrency}",
+                      lambda concurrency=concurrency: bench_batch(g, profiles, concurrency, pool, timeout)))
+    if args.gui:
+        steps.append(("gui", lambda: bench_gui(g, sample, root / "control", fake_mounts)))
+
+    for name, step in steps:
+        print(f"Running {name}...", file=sys.stderr)
+        section, _, key = name.rpartition(".")
+        target = results.setdefault(section, {}) if section else results
+        target[key] = step()
+    engine.shutdown()
+    results["spans"] = bench_spans(g)
+    return results
+
+
+def cleanup_mounts(g, root):
+    """Lazily unmount anything a real sshfs left mounted under root"""
+    for mount_point in g.read_mount_table():
+        if mount_point.startswith(str(root)):
+            subprocess.run(g.lazy_unmount_command(mount_point), stdin=subprocess.DEVNULL, capture_output=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time sshfs_gui.py against stub binaries or a local sshd")
+    parser.add_argument("--profiles", type=int, default=50, help="number of profiles (default: 50)")
+    parser.add_argument("--hosts", type=int, default=12, help="distinct hosts they are spread over (default: 12)")
+    parser.add_argument("--down", type=int, default=0, help="extra hosts that refuse connections (default: 0)")
+    parser.add_argument("--password-every", type=int, default=5, metavar="N",
+                        help="every Nth profile uses password authentication, 0 for none (default: 5)")
+    parser.add_argument("--sample", type=int, default=10,
+                        help="profiles to test and mount one at a time (default: 10)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8],
+                        help="batch mount concurrency levels (default: 1 8)")
+    parser.add_argument("--mount-delay", type=float, default=50, metavar="MS",
+                        help="FUSE setup time of a stub mount (default: 50)")
+    parser.add_argument("--ssh-delay", type=float, default=10, metavar="MS",
+                        help="time of each stub ssh handshake phase (default: 10)")
+    parser.add_argument("--timeout", type=float, help="mount timeout in seconds")
+    parser.add_argument("--sshd", action="store_true",
+                        help="connect to a throwaway OpenSSH server on localhost; uses real sshfs when FUSE is usable")
+    parser.add_argument("--gui", action=argparse.BooleanOptionalAction, default=True,
+                        help="also drive the GUI when a display is available (default: on)")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline as a fraction (default: 0.25)")
+    parser.add_argument("--min-delta", type=float, default=1.0, metavar="MS",
+                        help="ignore slowdowns smaller than this (default: 1)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary directory")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print operation progress")
+    args = parser.parse_args(argv)
+    if args.profiles < 1 or args.hosts < 1 or min(args.concurrency) < 1:
+        parser.error("--profiles, --hosts and --concurrency must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    root = Path(tempfile.mkdtemp(prefix="sshfs-harness-"))
+    bin_dir = root / "bin"
+    for path in (bin_dir, root / "home", root / "mnt", root / "remote"):
+        path.mkdir()
+    (root / "run").mkdir(mode=0o700)
+    mountinfo = root / "mountinfo"
+    mountinfo.touch()
+    # sshfs_gui reads HOME and XDG_RUNTIME_DIR when it is imported, so set
+    # everything up first; the control dir, askpass script and supervisor
+    # socket then all live under root instead of /tmp/sshfs-gui-<uid>
+    os.environ.update({
+        "HOME": str(root / "home"),
+        "XDG_RUNTIME_DIR": str(root / "run"),
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "HARNESS_MOUNTINFO": str(mountinfo),
+        "HARNESS_MOUNT_DELAY": str(args.mount_delay / 1000),
+        "HARNESS_SSH_DELAY": str(args.ssh_delay / 1000),
+    })
+
+    sshd = None
+    g = None
+    try:
+        if args.sshd:
+            sshd, port = start_sshd(root, bin_dir)
+            key_file = root / "client_key"
+            fake_mounts = not (shutil.which("sshfs") and os.path.exists("/dev/fuse"))
+            write_stubs(bin_dir, ("sshfs", "fusermount", "fusermount3", "umount") if fake_mounts else ())
+        else:
+            port = 22
+            key_file = root / "client_key"
+            key_file.write_text("")
+            fake_mounts = True
+            write_stubs(bin_dir)
+
+        sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+        import sshfs_gui as g
+        for path in (g.CONTROL_DIR, g.ASKPASS_SCRIPT, g.SUPERVISOR_SOCKET, g.STATE_DIR):
+            if root not in Path(path).parents:
+                raise HarnessError(f"{path} is outside the harness directory {root}")
+        if fake_mounts:
+            g.MOUNTINFO = str(mountinfo)
+        results = run_workload(g, args, root, port, key_file, fake_mounts)
+    except HarnessError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if g is not None:
+            cleanup_mounts(g, root)
+        if sshd is not None:
+            sshd.terminate()
+            sshd.wait()
+        if args.keep:
+            print(f"Kept {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print_summary(results, sys.stderr)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        for path, old, new in regressions:
+            print(f"Slower: {path} {old:.3f} -> {new:.3f} ms (+{(new / old - 1) * 100 if old else 100:.0f}%)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
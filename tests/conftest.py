@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sshfs_gui  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_tracing(monkeypatch):
+    """Keep traced helpers from writing spans to the real trace file"""
+    monkeypatch.setattr(sshfs_gui.tracer, "enabled", False)
@@ -0,0 +1,63 @@
+import pytest
+
+import sshfs_gui
+from sshfs_gui import BatchMount, SSHFSError
+
+
+def profile(tmp_path, name, **fields):
+    return dict({"name": name, "server": f"{name}.example", "username": "u", "auth_method": "key",
+                 "local_dir": str(tmp_path / name)}, **fields)
+
+
+@pytest.fixture
+def mounts(monkeypatch, tmp_path):
+    """Fake mount table and mount_profile: profiles named fail-* fail"""
+    table = {str(tmp_path / "busy"): {"mount_point": str(tmp_path / "busy")}}
+
+    def mount_profile(op, config, timeout=None, pool=None):
+        if config["name"].startswith("fail"):
+            raise SSHFSError("read: Connection reset by peer\nmore detail")
+        table[config["local_dir"]] = {"mount_point": config["local_dir"]}
+
+    monkeypatch.setattr(sshfs_gui, "read_mount_table", lambda: dict(table))
+    monkeypatch.setattr(sshfs_gui, "mount_profile", mount_profile)
+    return table
+
+
+def test_statuses(tmp_path, mounts):
+    profiles = [
+        profile(tmp_path, "ok"),
+        profile(tmp_path, "busy"),
+        profile(tmp_path, "fail1"),
+        profile(tmp_path, "secret", auth_method="password", server="nopassword.example"),
+    ]
+    batch = BatchMount(profiles, concurrency=2)
+    statuses = {row["name"]: (row["status"], row["error"]) for row in batch.run()}
+    assert statuses == {
+        "ok": ("mounted", ""),
+        "busy": ("already mounted", ""),
+        "fail1": ("failed", "read: Connection reset by peer"),
+        "secret": ("skipped", "password required"),
+    }
+    assert sorted(row["name"] for row in batch.failed()) == ["fail1", "secret"]
+    assert str(tmp_path / "ok") in mounts
+    assert "2/4 mounted" in batch.summary()
+
+
+def test_skipped_counts_as_failed(tmp_path, mounts):
+    batch = BatchMount([profile(tmp_path, "secret", auth_method="password", server="nopassword.example")])
+    batch.run()
+    assert batch.failed()
+
+
+def test_all_mounted(tmp_path, mounts):
+    batch = BatchMount([profile(tmp_path, f"p{i}") for i in range(5)], concurrency=3)
+    batch.run()
+    assert not batch.failed()
+    assert batch.elapsed is not None
+
+
+def test_empty_batch_completes():
+    completed = []
+    batch = BatchMount([], on_complete=completed.append).start()
+    assert batch.done and completed == [batch]
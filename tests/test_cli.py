@@ -0,0 +1,36 @@
+import sshfs_gui
+from sshfs_gui import parse_args
+
+
+def test_profile_option_does_not_clobber_profile_names():
+    args = parse_args(["benchmark", "web"])
+    assert args.profile == "web"
+    assert args.profile_output is None
+
+    args = parse_args(["--profile", "out.prof", "mount", "web"])
+    assert (args.profile, args.profile_output) == ("web", "out.prof")
+
+
+def test_no_command_opens_gui():
+    args = parse_args([])
+    assert args.command is None and args.profile_output is None
+
+
+def test_benchmark_options():
+    args = parse_args(["benchmark", "web", "--dir", "/mnt/test", "--size", "16"])
+    assert (args.profile, args.benchmark_dir, args.bench_size) == ("web", "/mnt/test", 16)
+
+
+def test_supervise_status_table(monkeypatch, capsys):
+    response = {"ok": True, "mounts": [
+        {"profile": "web", "local_dir": "/mnt/web", "status": "running", "pid": 4242,
+         "restarts": 3, "uptime": 75.0, "error": ""},
+        {"profile": "db", "local_dir": "/mnt/db", "status": "backoff", "pid": None,
+         "restarts": 0, "uptime": None, "error": "Connection refused"},
+    ]}
+    monkeypatch.setattr(sshfs_gui, "supervisor_request", lambda command, **kwargs: response)
+    assert sshfs_gui.run_supervise(parse_args(["supervise", "--status"])) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[:4] == ["Profile", "Mount", "point", "Status"]
+    assert lines[1].split() == ["web", "/mnt/web", "running", "4242", "1:15", "3"]
+    assert lines[2].split() == ["db", "/mnt/db", "backoff", "0", "Connection", "refused"]
@@ -0,0 +1,70 @@
+import pytest
+
+import sshfs_gui
+from sshfs_gui import build_sftp_command, build_ssh_command, build_sshfs_command
+
+
+@pytest.fixture(autouse=True)
+def sshfs_3_7(monkeypatch):
+    """Pretend sshfs 3.7 is installed instead of running it"""
+    monkeypatch.setattr(sshfs_gui, "_sshfs_version", (3, 7, 3))
+
+
+def config(**fields):
+    return dict({"server": "web.example", "port": "2222", "username": "deploy",
+                 "remote_dir": "/srv", "local_dir": "/mnt/web", "auth_method": "key",
+                 "key_file": ""}, **fields)
+
+
+def options(cmd):
+    return [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-o"]
+
+
+def test_sshfs_command():
+    cmd = build_sshfs_command(config(additional_options="follow_symlinks idmap=user"))
+    assert cmd[:5] == ["sshfs", "deploy@web.example:/srv", "/mnt/web", "-p", "2222"]
+    assert {"PasswordAuthentication=no", "reconnect", "follow_symlinks", "idmap=user"} <= set(options(cmd))
+
+
+def test_sshfs_tuning_profile():
+    opts = options(build_sshfs_command(config(tuning_profile="LAN bulk throughput")))
+    assert {"kernel_cache", "max_read=1048576", "Ciphers=aes128-gcm@openssh.com"} <= set(opts)
+    assert "kernel_cache" not in options(build_sshfs_command(config(tuning_profile="no such profile")))
+
+
+def test_sshfs_password_uses_stdin():
+    assert "password_stdin" in options(build_sshfs_command(config(auth_method="password")))
+
+
+def test_sshfs_connections_use_max_conns():
+    opts = options(build_sshfs_command(config(tuning_profile="LAN bulk throughput", connections=3)))
+    assert [opt for opt in opts if opt.startswith("max_conns=")] == ["max_conns=3"]
+
+
+def test_sshfs_old_version_drops_max_conns(monkeypatch):
+    monkeypatch.setattr(sshfs_gui, "_sshfs_version", (3, 5, 0))
+    opts = options(build_sshfs_command(config(tuning_profile="LAN bulk throughput")))
+    assert not [opt for opt in opts if opt.startswith("max_conns")]
+    assert "Ciphers=aes128-gcm@openssh.com" in opts
+
+
+def test_ssh_command():
+    cmd = build_ssh_command(config(), ["-o", "ControlPath=/c"], "true")
+    assert cmd[:3] == ["ssh", "-p", "2222"]
+    assert "BatchMode=yes" in options(cmd)
+    assert cmd[-3:] == ["ControlPath=/c", "deploy@web.example", "true"]
+
+
+def test_ssh_command_with_known_password():
+    opts = options(build_ssh_command(config(auth_method="password", password="pw")))
+    assert "BatchMode=no" in opts and "BatchMode=yes" not in opts
+
+
+def test_sftp_command():
+    cmd = build_sftp_command(config(), ["-o", "ControlPath=/c"])
+    assert cmd[:3] == ["sftp", "-P", "2222"]
+    assert cmd[-3:] == ["-b", "-", "deploy@web.example"]
+    assert "-p" not in cmd
+    # ssh options come before -b so our BatchMode wins
+    assert cmd.index("ControlPath=/c") < cmd.index("-b")
+    assert "BatchMode=yes" in options(cmd)
@@ -0,0 +1,49 @@
+import os
+import subprocess
+
+import pytest
+
+import sshfs_gui
+from sshfs_gui import SSHFSError, ensure_private_dir, ssh_environment
+
+
+def profile(**fields):
+    return dict({"name": "web", "server": "web.example", "port": "22", "username": "deploy",
+                 "auth_method": "password"}, **fields)
+
+
+@pytest.fixture
+def askpass(monkeypatch, tmp_path):
+    path = tmp_path / "control" / "askpass"
+    monkeypatch.setattr(sshfs_gui, "ASKPASS_SCRIPT", path)
+    return path
+
+
+def test_key_profiles_inherit_environment(askpass):
+    assert ssh_environment(profile(auth_method="key")) is None
+    assert ssh_environment(profile()) is None
+    assert not askpass.exists()
+
+
+def test_askpass_answers_password_prompts_only(askpass, monkeypatch):
+    monkeypatch.delenv("DISPLAY", raising=False)
+    env = ssh_environment(profile(password="s3cret"))
+    assert env["SSH_ASKPASS"] == str(askpass) and "DISPLAY" not in env
+    assert (askpass.parent.stat().st_mode & 0o777) == 0o700
+
+    def ask(prompt):
+        return subprocess.run([str(askpass), prompt], env=env, capture_output=True, text=True)
+
+    assert ask("deploy@web.example's password: ").stdout == "s3cret\n"
+    assert ask("Are you sure you want to continue connecting (yes/no)?").returncode != 0
+
+
+def test_private_dir_checks(tmp_path):
+    path = ensure_private_dir(tmp_path / "a" / "b")
+    assert path.is_dir()
+    path.chmod(0o750)
+    with pytest.raises(SSHFSError):
+        ensure_private_dir(path)
+    os.symlink(tmp_path / "a", tmp_path / "link")
+    with pytest.raises(SSHFSError):
+        ensure_private_dir(tmp_path / "link")
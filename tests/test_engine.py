@@ -0,0 +1,39 @@
+import sshfs_gui
+from sshfs_gui import OperationEngine
+
+
+def test_dispatch_survives_failing_callback(capsys):
+    engine = OperationEngine(max_workers=1)
+    handled = []
+
+    def broken():
+        raise ValueError("boom")
+
+    engine.post(broken)
+    engine.post(handled.append, "after")
+    assert engine.dispatch() == 2
+    assert handled == ["after"]
+    assert "boom" in capsys.readouterr().err
+    engine.shutdown()
+
+
+def test_dispatch_logs_callback_errors():
+    engine = OperationEngine(max_workers=1)
+    engine.logs = sshfs_gui.LogPipeline(log_file=None)
+    engine.post(lambda: 1 / 0)
+    engine.dispatch()
+    records = engine.logs.drain()
+    assert records[0][1] == "ERROR" and "division by zero" in records[0][3]
+    engine.shutdown()
+
+
+def test_operation_results_reach_callbacks():
+    engine = OperationEngine(max_workers=2)
+    results, errors = [], []
+    engine.submit("ok", lambda op, value: value * 2, 21, on_done=results.append)
+    engine.submit("fail", lambda op: 1 / 0, on_error=errors.append)
+    while len(results) + len(errors) < 2:
+        engine.dispatch(block=True, timeout=1)
+    assert results == [42]
+    assert isinstance(errors[0], ZeroDivisionError)
+    engine.shutdown()
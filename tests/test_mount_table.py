@@ -0,0 +1,50 @@
+import os
+
+from sshfs_gui import mount_key, parse_mount_output, parse_mountinfo
+
+MOUNTINFO = """\
+22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw
+87 22 0:52 / /home/u/mnt/web rw,nosuid,nodev,relatime shared:50 - fuse.sshfs deploy@web:/srv rw,user_id=1000
+88 22 0:53 / /home/u/my\\040files rw,nosuid,nodev - fuse.sshfs u@h:/a\\040b rw,user_id=1000
+89 22 0:54 / /home/u/other rw - fuse.other x rw
+broken line
+"""
+
+
+def test_parse_mountinfo_keeps_sshfs_only():
+    mounts = parse_mountinfo(MOUNTINFO)
+    assert sorted(mounts) == ["/home/u/mnt/web", "/home/u/my files"]
+    web = mounts["/home/u/mnt/web"]
+    assert (web["mount_id"], web["device"], web["source"]) == (87, "0:52", "deploy@web:/srv")
+    assert web["options"] == "rw,nosuid,nodev,relatime"
+
+
+def test_parse_mountinfo_unescapes_spaces():
+    assert parse_mountinfo(MOUNTINFO)["/home/u/my files"]["source"] == "u@h:/a b"
+
+
+def test_parse_mount_output():
+    text = ("/dev/disk1s1 on / (apfs, local, journaled)\n"
+            "u@web:/srv on /Users/u/mnt/web (macfuse, nodev, nosuid, synchronous, mounted by u)\n")
+    mounts = parse_mount_output(text)
+    assert list(mounts) == ["/Users/u/mnt/web"]
+    assert mounts["/Users/u/mnt/web"]["source"] == "u@web:/srv"
+
+
+def test_mount_key_normalises(tmp_path):
+    assert mount_key(f" {tmp_path}/a/../b/ ") == os.path.join(os.path.realpath(tmp_path), "b")
+    assert mount_key("/") == "/"
+
+
+def test_mount_key_resolves_symlinked_parent(tmp_path):
+    real = tmp_path / "data" / "mnt"
+    real.mkdir(parents=True)
+    (tmp_path / "link").symlink_to(real)
+    assert mount_key(str(tmp_path / "link" / "web")) == os.path.join(os.path.realpath(real), "web")
+
+
+def test_mount_key_leaves_mount_point_itself_alone(tmp_path):
+    # Resolving the mount point would stat() it, which hangs on a dead mount
+    (tmp_path / "target").mkdir()
+    (tmp_path / "point").symlink_to(tmp_path / "target")
+    assert mount_key(str(tmp_path / "point")).endswith("/point")
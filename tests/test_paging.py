@@ -0,0 +1,17 @@
+from sshfs_gui import LISTING_PAGE, listing_page_limit
+
+
+def test_first_page_while_streaming():
+    # More entries arriving never grows the view past the first page
+    assert listing_page_limit(10, 0) == 10
+    assert listing_page_limit(LISTING_PAGE * 3, 10) == LISTING_PAGE
+    assert listing_page_limit(LISTING_PAGE * 3, LISTING_PAGE) == LISTING_PAGE
+
+
+def test_show_more_adds_one_page():
+    assert listing_page_limit(LISTING_PAGE * 3, LISTING_PAGE, advance=True) == LISTING_PAGE * 2
+    assert listing_page_limit(LISTING_PAGE + 5, LISTING_PAGE, advance=True) == LISTING_PAGE + 5
+
+
+def test_keeps_pages_already_shown():
+    assert listing_page_limit(LISTING_PAGE * 3, LISTING_PAGE * 2) == LISTING_PAGE * 2
@@ -0,0 +1,61 @@
+from sshfs_gui import parse_ssh_config
+
+
+def write_config(tmp_path, text, name="config"):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def by_name(hosts):
+    return {host["name"]: host for host in hosts}
+
+
+def test_space_separated(tmp_path):
+    path = write_config(tmp_path, "Host web\n    HostName example.com\n    User deploy\n    Port 2222\n")
+    host = by_name(parse_ssh_config(path))["web"]
+    assert (host["server"], host["username"], host["port"]) == ("example.com", "deploy", "2222")
+
+
+def test_tab_separated(tmp_path):
+    path = write_config(tmp_path, "Host\tweb\n\tHostName\texample.com\n\tUser\t\tdeploy\n")
+    host = by_name(parse_ssh_config(path))["web"]
+    assert (host["server"], host["username"]) == ("example.com", "deploy")
+
+
+def test_equals_separated(tmp_path):
+    path = write_config(tmp_path, "Host=web\nHostName = example.com\nPort=2222\nUser =deploy\n")
+    host = by_name(parse_ssh_config(path))["web"]
+    assert (host["server"], host["port"], host["username"]) == ("example.com", "2222", "deploy")
+
+
+def test_quoted_value_and_comments(tmp_path):
+    path = write_config(tmp_path, '# servers\nHost web # main\n  IdentityFile "/keys/web key"\n')
+    assert by_name(parse_ssh_config(path))["web"]["key_file"] == "/keys/web key"
+
+
+def test_patterns_skipped_and_aliases_kept(tmp_path):
+    path = write_config(tmp_path, "Host *\n  User everyone\nHost a b !c d?\n  HostName shared.example\n")
+    hosts = by_name(parse_ssh_config(path))
+    assert sorted(hosts) == ["a", "b"]
+    assert hosts["a"]["server"] == hosts["b"]["server"] == "shared.example"
+
+
+def test_first_value_wins(tmp_path):
+    path = write_config(tmp_path, "Host web\n  Port 1\n  Port 2\n")
+    assert by_name(parse_ssh_config(path))["web"]["port"] == "1"
+
+
+def test_match_ends_host_block(tmp_path):
+    path = write_config(tmp_path, "Host web\n  HostName web.example\nMatch user root\n  HostName other\n")
+    assert by_name(parse_ssh_config(path))["web"]["server"] == "web.example"
+
+
+def test_include(tmp_path):
+    write_config(tmp_path, "Host db\n\tHostName db.example\n", name="included")
+    path = write_config(tmp_path, f"Include {tmp_path}/included\nHost web\n")
+    assert sorted(by_name(parse_ssh_config(path))) == ["db", "web"]
+
+
+def test_missing_file(tmp_path):
+    assert parse_ssh_config(tmp_path / "nope") == []
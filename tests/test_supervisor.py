@@ -0,0 +1,63 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from sshfs_gui import SSHFSError, ensure_private_dir, is_private_dir, supervisor_request
+
+
+@pytest.fixture
+def socket_dir(tmp_path):
+    path = tmp_path / "control"
+    path.mkdir(mode=0o700)
+    path.chmod(0o700)
+    return path
+
+
+def listen(path, reply=None):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen()
+    if reply is not None:
+        def answer():
+            conn, _ = server.accept()
+            with conn, conn.makefile("rb") as f:
+                request = json.loads(f.readline())
+                conn.sendall((json.dumps(dict(reply, echo=request)) + "\n").encode())
+        threading.Thread(target=answer, daemon=True).start()
+    return server
+
+
+def test_no_supervisor(socket_dir):
+    assert supervisor_request("status", socket_dir / "missing.sock") is None
+
+
+def test_request_and_reply(socket_dir):
+    with listen(socket_dir / "s.sock", {"ok": True}):
+        response = supervisor_request("stop", socket_dir / "s.sock", local_dir="/mnt/a")
+    assert response["ok"]
+    assert response["echo"] == {"command": "stop", "local_dir": "/mnt/a"}
+
+
+def test_timeout_is_not_reported_as_missing(socket_dir):
+    with listen(socket_dir / "s.sock"):
+        with pytest.raises(SSHFSError, match="did not answer"):
+            supervisor_request("status", socket_dir / "s.sock", timeout=0.2)
+
+
+def test_socket_in_shared_directory_is_ignored(socket_dir):
+    socket_dir.chmod(0o755)
+    with listen(socket_dir / "s.sock"):
+        assert supervisor_request("status", socket_dir / "s.sock", timeout=0.5) is None
+
+
+def test_private_dir_checks(tmp_path):
+    path = ensure_private_dir(tmp_path / "a" / "b")
+    assert is_private_dir(path)
+    path.chmod(0o750)
+    with pytest.raises(SSHFSError):
+        ensure_private_dir(path)
+    os.symlink(tmp_path / "a", tmp_path / "link")
+    assert not is_private_dir(tmp_path / "link")
@@ -0,0 +1,40 @@
+from sshfs_gui import split_phases, trace_tree
+
+PHASES = [
+    ("dns", ["Connecting to"]),
+    ("connect", ["Connection established"]),
+    ("auth", ["Authenticated to"]),
+]
+
+
+def test_split_phases():
+    lines = [(0.1, "debug1: Connecting to web [1.2.3.4] port 22."),
+             (0.3, "debug1: Connection established."),
+             (0.35, "debug1: unrelated"),
+             (0.9, "debug1: Authenticated to web using publickey")]
+    phases = split_phases(lines, PHASES, end=1.5)
+    assert [name for name, _, _ in phases] == ["dns", "connect", "auth", "session"]
+    assert [round(offset, 3) for _, offset, _ in phases] == [0.0, 0.1, 0.3, 0.9]
+    assert [round(ms) for _, _, ms in phases] == [100, 200, 600, 600]
+
+
+def test_split_phases_skips_missing_markers():
+    lines = [(0.2, "debug1: Connecting to web"), (0.5, "debug1: Authenticated to web")]
+    phases = split_phases(lines, PHASES, end=None)
+    assert [(name, round(ms)) for name, _, ms in phases] == [("dns", 200), ("auth", 300)]
+
+
+def test_split_phases_only_moves_forward():
+    lines = [(0.2, "Connection established"), (0.4, "Connecting to"), (0.6, "Connection established")]
+    phases = split_phases(lines, PHASES, end=0.6, rest="rest")
+    assert [name for name, _, _ in phases] == ["connect", "rest"]
+
+
+def test_trace_tree():
+    spans = [{"span": "c", "parent": "a", "start": 3},
+             {"span": "b", "parent": "a", "start": 2},
+             {"span": "a", "parent": None, "start": 1},
+             {"span": "d", "parent": "gone", "start": 0}]
+    roots, children = trace_tree(spans)
+    assert [span["span"] for span in roots] == ["d", "a"]
+    assert [span["span"] for span in children["a"]] == ["b", "c"]
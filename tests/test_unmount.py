@@ -0,0 +1,68 @@
+import subprocess
+
+import pytest
+
+import sshfs_gui
+from sshfs_gui import SSHFSError, mount_responds, unmount_path
+
+
+class FakeOperation:
+    """Records commands; unmounting a mount point listed in busy fails"""
+
+    def __init__(self, busy=()):
+        self.busy = set(busy)
+        self.commands = []
+
+    def run(self, cmd, timeout):
+        self.commands.append(cmd)
+        failed = cmd[-1] in self.busy
+        return subprocess.CompletedProcess(cmd, 1 if failed else 0, "", "Device or resource busy" if failed else "")
+
+    def report(self, message):
+        pass
+
+
+@pytest.fixture
+def striped(monkeypatch, tmp_path):
+    local_dir = str(tmp_path / "web")
+    table = [local_dir, local_dir + ".stripe1", local_dir + ".stripe2", local_dir + ".stripes", str(tmp_path / "other")]
+    monkeypatch.setattr(sshfs_gui, "read_mount_table", lambda: {m: {"mount_point": m} for m in table})
+    monkeypatch.setattr(sshfs_gui.sys, "platform", "linux")
+    return local_dir
+
+
+def test_unmount_walks_stripes(striped):
+    op = FakeOperation()
+    unmount_path(op, striped)
+    assert [cmd[-1] for cmd in op.commands] == [striped, striped + ".stripe1", striped + ".stripe2"]
+
+
+def test_busy_main_mount_still_unmounts_stripes(striped):
+    op = FakeOperation(busy=[striped])
+    with pytest.raises(SSHFSError, match="busy"):
+        unmount_path(op, striped)
+    unmounted = [cmd[-1] for cmd in op.commands if cmd[-1] != striped]
+    assert unmounted == [striped + ".stripe1", striped + ".stripe2"]
+
+
+def test_lazy_unmount_detaches_stripes(striped):
+    op = FakeOperation()
+    unmount_path(op, striped, lazy=True)
+    assert op.commands == [["fusermount", "-uz", d] for d in (striped, striped + ".stripe1", striped + ".stripe2")]
+
+
+def test_mount_responds(tmp_path):
+    assert mount_responds(str(tmp_path))
+    assert not mount_responds(str(tmp_path / "missing"))
+
+
+def test_mount_replaces_hung_stripe(monkeypatch, striped):
+    started = []
+    monkeypatch.setattr(sshfs_gui, "_sshfs_version", (3, 5, 0))
+    monkeypatch.setattr(sshfs_gui, "_run_sshfs", lambda op, config, opts, local_dir, *rest: started.append(local_dir))
+    monkeypatch.setattr(sshfs_gui, "mount_responds", lambda local_dir, timeout=None: local_dir.endswith("1"))
+    op = FakeOperation()
+    sshfs_gui.mount_profile(op, {"name": "web", "local_dir": striped, "connections": 3})
+    # stripe1 answers and is kept; stripe2 is hung, so it is detached and mounted again
+    assert started == [striped, striped + ".stripe2"]
+    assert op.commands == [["fusermount", "-uz", striped + ".stripe2"]]